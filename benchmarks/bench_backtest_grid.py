@@ -0,0 +1,49 @@
+"""
+Parameter sweep cost: one pandas `simulate` + `_compute_metrics` pass per
+config against `Backtester.run_grid` over the whole grid.
+
+    python -m benchmarks.bench_backtest_grid --bars 1500 --side 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.backtester import Backtester, config_grid
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=1500)
+    parser.add_argument("--side", type=int, default=20, help="values per threshold; costs x4")
+    parser.add_argument("--loop-sample", type=int, default=200, help="configs timed on the per-config path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2015-01-01", periods=args.bars)
+    df = pd.DataFrame({"target": rng.normal(0, 0.01, args.bars)}, index=index)
+    preds = pd.Series(df["target"].to_numpy() + rng.normal(0, 0.01, args.bars), index=index)
+
+    thresholds = np.linspace(-5e-3, 5e-3, args.side)
+    grid = config_grid(threshold_long=thresholds, threshold_short=thresholds, cost_bps=[0, 5, 10, 20])
+
+    sample = grid[: args.loop_sample]
+    started = time.perf_counter()
+    for config in sample:
+        backtester = Backtester(config)
+        backtester._compute_metrics(backtester.simulate(df, preds))
+    per_config = (time.perf_counter() - started) / len(sample)
+
+    started = time.perf_counter()
+    table = Backtester().run_grid(df, preds, grid)
+    grid_seconds = time.perf_counter() - started
+
+    print(f"{len(grid)} configs x {args.bars} bars")
+    print(f"{'per-config pandas loop (est.)':<32}{per_config * len(grid):>10.2f}s")
+    print(f"{'run_grid':<32}{grid_seconds:>10.2f}s")
+    print(table.sort_values("sharpe", ascending=False).head(5).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Model artifact load time and per-worker memory for each registry format.
+
+Each format is loaded by `--workers` processes that stay alive together, so
+PSS (proportional set size) shows how much of a worker's memory is shared
+with its siblings. PSS comes from /proc/self/smaps_rollup and is only
+reported on Linux.
+
+    python -m benchmarks.bench_model_load --workers 4 --trees 200
+"""
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.models.registry import ARTIFACT_FORMATS, ModelRegistry
+from src.models.trainer import ModelTrainer
+
+
+def _memory_mb() -> dict:
+    values = {}
+    rollup = Path("/proc/self/smaps_rollup")
+    if rollup.exists():
+        for line in rollup.read_text().splitlines():
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0]) / 1024
+    return values
+
+
+def _worker(model_dir, path, barrier, results):
+    registry = ModelRegistry(model_dir)
+    before = _memory_mb()
+    started = time.perf_counter()
+    model = registry.load_model(path=path)
+    seconds = time.perf_counter() - started
+
+    # Measure once every worker holds the model, so shared pages are split
+    barrier.wait()
+    after = _memory_mb()
+    results.put({
+        "seconds": seconds,
+        "rss": after.get("rss", np.nan) - before.get("rss", np.nan),
+        "pss": after.get("pss", np.nan) - before.get("pss", np.nan),
+    })
+    barrier.wait()
+    del model
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--model-config", default="config/model.yaml")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(args.samples, args.features)),
+                     columns=[f"f{i}" for i in range(args.features)])
+    y = X.iloc[:, 0] + rng.normal(scale=0.5, size=args.samples)
+
+    trainer = ModelTrainer(args.model_config)
+    model = trainer._build_model()
+    model.set_params(model__n_estimators=args.trees)
+    model.fit(X, y)
+
+    ctx = mp.get_context("spawn")
+    print(f"{'format':<12}{'size MB':>10}{'load ms':>10}{'RSS MB':>10}{'PSS MB':>10}  per worker, {args.workers} workers")
+    with tempfile.TemporaryDirectory() as model_dir:
+        registry = ModelRegistry(model_dir)
+        for fmt in ARTIFACT_FORMATS:
+            path = registry.save_model(model, f"bench_{fmt}.pkl", with_timestamp=False, artifact_format=fmt)
+
+            barrier = ctx.Barrier(args.workers)
+            results = ctx.Queue()
+            workers = [ctx.Process(target=_worker, args=(model_dir, str(path), barrier, results))
+                       for _ in range(args.workers)]
+            for w in workers:
+                w.start()
+            stats = [results.get() for _ in workers]
+            for w in workers:
+                w.join()
+
+            print(
+                f"{fmt:<12}{path.stat().st_size / 2**20:>10.1f}"
+                f"{np.mean([s['seconds'] for s in stats]) * 1000:>10.1f}"
+                f"{np.mean([s['rss'] for s in stats]):>10.1f}"
+                f"{np.mean([s['pss'] for s in stats]):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Realtime engine throughput and per-bar latency: many symbols replayed as
+fast as possible through incremental features and a compiled forest.
+
+    python -m benchmarks.bench_realtime --symbols 300 --bars 250
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.features.incremental import IncrementalFeatureEngine
+from src.models.predictor import ModelPredictor
+from src.models.registry import ModelRegistry
+from src.models.trainer import ModelTrainer
+from src.pipeline.realtime_pipeline import RealtimeEngine, ReplaySource
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--format", default="compiled")
+    parser.add_argument("--feature-config", default="config/features.yaml")
+    parser.add_argument("--model-config", default="config/model.yaml")
+    args = parser.parse_args()
+
+    with open(args.feature_config) as f:
+        config = yaml.safe_load(f)
+
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2015-01-01", periods=args.bars)
+    frames = {
+        f"S{i:04d}": pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, args.bars)))}, index=index)
+        for i in range(args.symbols)
+    }
+
+    features = IncrementalFeatureEngine(config).update(frames["S0000"]).dropna()
+    target = pd.Series(rng.normal(0, 0.01, len(features)), index=features.index)
+    model, _ = ModelTrainer(args.model_config).train(features, target)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ModelRegistry(tmp, artifact_format=args.format).save_model(model, "bench.pkl")
+        engine = RealtimeEngine(ModelPredictor(tmp, ticker="bench"), config, max_batch=args.max_batch)
+
+        started = time.perf_counter()
+        emitted = asyncio.run(engine.run(ReplaySource(frames)))
+        seconds = time.perf_counter() - started
+
+    print(f"{engine.bars} bars, {emitted} signals in {seconds:.2f}s ({engine.bars / seconds:,.0f} bars/s)")
+    print(engine.summary())
+
+
+if __name__ == "__main__":
+    main()
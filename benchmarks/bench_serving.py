@@ -0,0 +1,106 @@
+"""
+Single-row inference latency: the original per-call pandas path against the
+warm-cache array path, the compiled forest and the micro-batcher under
+concurrent load.
+
+    python -m benchmarks.bench_serving --features 20 --requests 2000
+"""
+import argparse
+import tempfile
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.models.predictor import ModelPredictor
+from src.models.registry import ModelRegistry
+from src.models.trainer import ModelTrainer
+from src.utils.latency import LatencyRecorder
+
+
+def _row(stats: dict, label: str) -> str:
+    return f"{label:<28}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}"
+
+
+def _time_calls(fn, rows) -> dict:
+    recorder = LatencyRecorder(len(rows))
+    for row in rows:
+        with recorder.time():
+            fn(row)
+    return recorder.percentiles()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--model-config", default="config/model.yaml")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = [f"f{i}" for i in range(args.features)]
+    X = pd.DataFrame(rng.normal(size=(args.samples, args.features)), columns=columns)
+    y = X.iloc[:, 0] + rng.normal(scale=0.5, size=args.samples)
+
+    model, _ = ModelTrainer(args.model_config).train(X, y)
+    rows = X.iloc[: args.requests]
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        path = ModelRegistry(model_dir).save_model(model, "bench.pkl")
+
+        # Original path: load per predictor, one-row DataFrame per call
+        started = time.perf_counter()
+        legacy = joblib.load(path)
+        cold_load = time.perf_counter() - started
+        legacy_stats = _time_calls(lambda r: legacy.predict(r.to_frame().T), [r for _, r in rows.iterrows()])
+
+        predictor = ModelPredictor(model_dir)
+        started = time.perf_counter()
+        ModelPredictor(model_dir)
+        warm_load = time.perf_counter() - started
+
+        series_stats = _time_calls(predictor.predict, [r for _, r in rows.iterrows()])
+        array_stats = _time_calls(predictor.predict, rows.to_numpy())
+
+        ModelRegistry(model_dir).save_model(model, "compiled.pkl", artifact_format="compiled")
+        compiled = ModelPredictor(model_dir, ticker="compiled")
+        compiled.predict(rows.to_numpy()[:1])  # JIT warm-up
+        compiled_stats = _time_calls(compiled.predict, rows.to_numpy())
+
+        # Concurrent single-row clients sharing one micro-batcher
+        recorder = LatencyRecorder(args.requests)
+        arrays = rows.to_numpy()
+        with predictor.batcher() as batcher:
+            def client(start):
+                for i in range(start, len(arrays), args.threads):
+                    with recorder.time():
+                        batcher.predict(arrays[i])
+
+            threads = [threading.Thread(target=client, args=(s,)) for s in range(args.threads)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            batched_wall = time.perf_counter() - started
+        batched_stats = recorder.percentiles()
+
+    print(f"model load: cold {cold_load * 1000:.1f} ms, warm cache {warm_load * 1000:.3f} ms")
+    print(f"{'path':<28}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print(_row(legacy_stats, "legacy Series → DataFrame"))
+    print(_row(series_stats, "warm, Series"))
+    print(_row(array_stats, "warm, ndarray"))
+    print(_row(compiled_stats, "compiled, ndarray"))
+    print(_row(batched_stats, f"micro-batched x{args.threads}"))
+    print(
+        f"micro-batched throughput: {args.requests / batched_wall:,.0f} req/s "
+        f"in {batcher.batches} batches (sequential ndarray: {1000 / array_stats['p50_ms']:,.0f} req/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
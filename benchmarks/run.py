@@ -0,0 +1,269 @@
+"""
+Offline benchmark suite: every pipeline stage on synthetic bars, compared
+against a saved baseline.
+
+    python -m benchmarks.run --tickers 20 --bars 2500
+    python -m benchmarks.run --save-baseline            # record benchmarks/baseline.json
+    python -m benchmarks.run --threshold 0.25           # exit 1 on >25% slowdowns
+
+The suite runs in a temporary workspace (the pipeline classes read and
+write `data/...` relative to the working directory) with the repo configs,
+data fetched from `SyntheticProvider`, feature caching and incremental
+state turned off so every repeat does the full work. Each stage is timed
+`--repeat` times and the fastest run is kept. A stage regresses when it is
+more than `--threshold` slower than the baseline and by more than
+`--min-delta` seconds; baselines recorded with different sizes are not
+compared.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import sklearn
+import yaml
+
+from src.backtest.backtester import Backtester
+from src.data.fetcher import DataFetcher
+from src.data.preprocess import DataPreprocessor
+from src.data.storage import FrameStore
+from src.features.builder import FeatureBuilder
+from src.features.fused import FeaturePlan, spec_columns, specs_from_config
+from src.features.panel import pack
+from src.models.predictor import ModelPredictor
+from src.models.registry import ModelRegistry
+from src.models.trainer import ModelTrainer
+from src.pipeline.train_dataset import TrainingDatasetBuilder
+from src.utils.latency import LatencyRecorder
+from src.utils.tracking import tracking_sink
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = ROOT / "benchmarks" / "baseline.json"
+OUTPUT = ROOT / "benchmarks" / "results" / "latest.json"
+
+
+@dataclass
+class BenchSettings:
+    tickers: int = 10
+    bars: int = 2000
+    freq: str = "B"
+    repeat: int = 3
+    n_estimators: int = 100
+    single_rows: int = 500
+    storage_format: str = "parquet"
+
+
+def _load(name: str) -> dict:
+    with open(ROOT / "config" / name) as f:
+        return yaml.safe_load(f) or {}
+
+
+def _dump(path: Path, config: dict):
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+
+
+@contextmanager
+def workspace(settings: BenchSettings):
+    """Temporary working directory with the repo configs pointed at synthetic data."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        data = _load("data.yaml")
+        data.update(
+            tickers=[f"SYN{i:04d}" for i in range(settings.tickers)],
+            start_date=None,
+            end_date=None,
+            output_dir="data/raw",
+            incremental=False,
+            provider="synthetic",
+            synthetic={"n_tickers": settings.tickers, "n_bars": settings.bars, "freq": settings.freq},
+            storage={"format": settings.storage_format},
+        )
+        features = _load("features.yaml")
+        features.update(incremental=False, cache={"enabled": False})
+        model = _load("model.yaml")
+        model.update(n_estimators=settings.n_estimators, walk_forward={"enabled": False}, pooled={"enabled": False})
+
+        _dump(Path(tmp) / "data.yaml", data)
+        _dump(Path(tmp) / "features.yaml", features)
+        _dump(Path(tmp) / "model.yaml", model)
+        _dump(Path(tmp) / "training.yaml", _load("training.yaml"))
+
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            os.chdir(previous)
+
+
+class Suite:
+    def __init__(self, settings: BenchSettings):
+        self.settings = settings
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def time(self, name: str, fn: Callable, rows: int, warm_up: bool = False):
+        """Best of `repeat` runs of `fn()`; returns its last result. The stages' progress prints are muted."""
+        with redirect_stdout(io.StringIO()):
+            if warm_up:
+                fn()
+            best = float("inf")
+            for _ in range(self.settings.repeat):
+                started = time.perf_counter()
+                result = fn()
+                best = min(best, time.perf_counter() - started)
+        self.record(name, best, rows)
+        return result
+
+    def record(self, name: str, seconds: float, rows: int, **extra):
+        self.results[name] = {"seconds": seconds, "rows": rows,
+                              "rows_per_s": rows / seconds if seconds > 0 else float("inf"), **extra}
+        print(f"{name:<32}{seconds:>10.4f}s{self.results[name]['rows_per_s']:>16,.0f} rows/s")
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        s = self.settings
+        bars = s.tickers * s.bars
+        fmt = s.storage_format
+
+        self.time("ingestion", lambda: DataFetcher("data.yaml").fetch_data(incremental=False), bars)
+        self.time("preprocess", lambda: DataPreprocessor("data.yaml").process_all(), bars)
+
+        processed = FrameStore("data/processed", fmt)
+        closes = {t: processed.read(t, columns=["Close"])["Close"] for t in processed.names()}
+        panel, _ = pack(closes)
+        config = yaml.safe_load(Path("features.yaml").read_text())
+        for spec in specs_from_config(config):
+            plan = FeaturePlan([spec], use_numba=config.get("jit", True))
+            name = "indicator." + "+".join(spec_columns(spec))
+            self.time(name, lambda: plan.compute(panel), bars, warm_up=True)
+        plan = FeaturePlan.from_config(config)
+        self.time("indicators.fused", lambda: plan.compute(panel), bars, warm_up=True)
+        self.time("features.build", lambda: FeatureBuilder("features.yaml", fmt).process_all(), bars)
+
+        builder = TrainingDatasetBuilder("training.yaml", fmt)
+        self.time("dataset.build", builder.build_all, bars)
+
+        datasets = {t: builder.dataset_store.read(t) for t in builder.dataset_store.names()}
+        ticker, df = next(iter(datasets.items()))
+        X, y = df.drop("target", axis=1), df["target"]
+        trainer = ModelTrainer("model.yaml")
+        model, _ = self.time("train", lambda: trainer.train(X, y), len(X))
+
+        ModelRegistry("models", artifact_format=_load("model.yaml").get("artifact_format", "pickle")).save_model(
+            model, f"{ticker}.pkl"
+        )
+        predictor = ModelPredictor("models", ticker=ticker)
+        self._single_row(predictor, X)
+        frame = pd.concat(datasets.values())
+        X_all = frame.drop("target", axis=1)
+        self.time("predict.batch", lambda: predictor.predict(X_all), len(X_all), warm_up=True)
+
+        preds = {t: pd.Series(predictor.predict(d.drop("target", axis=1)), index=d.index) for t, d in datasets.items()}
+        backtester = Backtester(tracking=tracking_sink("off"))
+        self.time("backtest", lambda: [backtester.run(d, preds[t], t) for t, d in datasets.items()], len(frame))
+        return self.results
+
+    def _single_row(self, predictor: ModelPredictor, X: pd.DataFrame):
+        rows = X.to_numpy(dtype=float)[: self.settings.single_rows]
+        predictor.predict(rows[:1])
+        recorder = LatencyRecorder(len(rows))
+        started = time.perf_counter()
+        for row in rows:
+            with recorder.time():
+                predictor.predict(row)
+        seconds = time.perf_counter() - started
+        stats = recorder.percentiles()
+        self.record("predict.single", seconds, len(rows), p50_ms=stats["p50_ms"], p99_ms=stats["p99_ms"])
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": str(os.cpu_count()),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def run_suite(settings: BenchSettings) -> dict:
+    with workspace(settings):
+        results = Suite(settings).run()
+    return {"settings": asdict(settings), "environment": environment(), "results": results}
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2, min_delta: float = 0.002) -> List[dict]:
+    """Stages more than `threshold` (relative) and `min_delta` seconds slower than the baseline."""
+    if current["settings"] != baseline["settings"]:
+        raise ValueError("Baseline was recorded with different settings; re-record it with --save-baseline.")
+
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] > 0 else float("inf")
+        if ratio > 1 + threshold and result["seconds"] - base["seconds"] > min_delta:
+            regressions.append({"stage": name, "baseline_s": base["seconds"],
+                                "current_s": result["seconds"], "ratio": ratio})
+    return regressions
+
+
+def _save(path: Path, report: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic data.")
+    parser.add_argument("--tickers", type=int, default=BenchSettings.tickers)
+    parser.add_argument("--bars", type=int, default=BenchSettings.bars)
+    parser.add_argument("--freq", default=BenchSettings.freq, help="bar frequency, e.g. B or 1min")
+    parser.add_argument("--repeat", type=int, default=BenchSettings.repeat)
+    parser.add_argument("--n-estimators", type=int, default=BenchSettings.n_estimators)
+    parser.add_argument("--single-rows", type=int, default=BenchSettings.single_rows)
+    parser.add_argument("--format", default=BenchSettings.storage_format)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--output", type=Path, default=OUTPUT)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.002, help="ignore slowdowns smaller than this (s)")
+    args = parser.parse_args()
+
+    settings = BenchSettings(args.tickers, args.bars, args.freq, args.repeat, args.n_estimators,
+                             args.single_rows, args.format)
+    report = run_suite(settings)
+    _save(args.output, report)
+    print(f"Results saved: {args.output}")
+
+    if args.save_baseline:
+        _save(args.baseline, report)
+        print(f"Baseline saved: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold, args.min_delta)
+    for r in regressions:
+        print(f"REGRESSION {r['stage']}: {r['baseline_s']:.4f}s -> {r['current_s']:.4f}s ({r['ratio']:.2f}x)")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
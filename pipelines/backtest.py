@@ -0,0 +1,19 @@
+import argparse
+
+from src.pipeline.backtest_pipeline import BacktestPipeline
+from src.utils import profiling
+from src.utils.tracking import MODES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the registry models on the stored datasets.")
+    parser.add_argument("--pooled", action="store_true", help="score every ticker with the pooled model")
+    parser.add_argument("--tracking", default="async", choices=MODES, help="how backtest runs are logged to MLflow")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    profiling.run_with_profile(args, lambda: BacktestPipeline(pooled=args.pooled, tracking=args.tracking).run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import argparse
+
+from src.features.engineer import FeatureEngineeringPipeline
+from src.utils import profiling
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch, preprocess and build features for the configured tickers.")
+    parser.add_argument("--data-config", default="config/data.yaml")
+    parser.add_argument("--feature-config", default="config/features.yaml")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    pipeline = FeatureEngineeringPipeline(args.data_config, args.feature_config)
+    profiling.run_with_profile(args, pipeline.run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import logging
+
+from src.pipeline.realtime_pipeline import RealtimePipeline
+from src.utils.logger import get_logger
+from src.utils import profiling
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay stored bars through the realtime engine.")
+    parser.add_argument("--symbols", nargs="*", default=None)
+    parser.add_argument("--start", default=None, help="first replayed bar; earlier bars warm up features")
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--speed", type=float, default=None, help="multiple of real time; default as fast as possible")
+    profiling.add_arguments(parser)
+    parser.add_argument("--verbose", action="store_true", help="log per-batch debug events (rate limited)")
+    parser.add_argument("--log-json", action="store_true", help="structured JSON log lines")
+    args = parser.parse_args()
+
+    get_logger("src", json_format=args.log_json, console_level=logging.DEBUG if args.verbose else logging.INFO,
+               level=logging.DEBUG if args.verbose else logging.INFO)
+
+    profiling.run_with_profile(args, lambda: run(args))
+
+
+def run(args):
+    pipeline = RealtimePipeline()
+    signals = pipeline.replay(args.symbols, start=args.start, end=args.end, speed=args.speed)
+    print(f"{len(signals)} signals emitted")
+
+
+if __name__ == "__main__":
+    main()
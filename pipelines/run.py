@@ -0,0 +1,21 @@
+import argparse
+
+from src.pipeline.executor import PipelineExecutor
+from src.utils import profiling
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the per-ticker pipeline DAG (fetch through backtest).")
+    parser.add_argument("--tickers", nargs="*", default=None)
+    parser.add_argument("--only", nargs="*", default=None, help="run only these stages")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", action="store_true", help="use a thread pool instead of worker processes")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    executor = PipelineExecutor(max_workers=args.workers, use_processes=not args.threads)
+    profiling.run_with_profile(args, lambda: executor.run(args.tickers, only=args.only))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import argparse
+
+from src.pipeline.train_pipeline import TrainPipeline
+from src.utils import profiling
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a model per ticker (or the pooled model) from the datasets.")
+    parser.add_argument("--model-config", default="config/model.yaml")
+    parser.add_argument("--ticker", default=None, help="train only this ticker")
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+
+    profiling.run_with_profile(args, lambda: run(args))
+
+
+def run(args):
+    pipeline = TrainPipeline(model_config=args.model_config)
+    if args.ticker is None:
+        pipeline.run_all()
+    else:
+        pipeline.run_for_ticker(args.ticker)
+
+
+if __name__ == "__main__":
+    main()
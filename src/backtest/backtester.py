@@ -1,9 +1,12 @@
-from dataclasses import dataclass, asdict
-from typing import Tuple, Dict
+from dataclasses import dataclass, asdict, fields
+from itertools import product
+from typing import Tuple, Dict, Iterable, List, Mapping, Sequence, Union
 
 import numpy as np
 import pandas as pd
-import mlflow
+
+from src.utils.profiling import stage
+from src.utils.tracking import TrackingSink, tracking_sink
 
 
 @dataclass
@@ -14,9 +17,54 @@ class BacktestConfig:
     max_leverage: float = 1.0
 
 
+METRICS = ("total_return", "sharpe", "max_drawdown", "win_rate", "avg_daily_return", "std_daily_return")
+
+
+def config_grid(base: BacktestConfig | None = None, **values: Iterable) -> List[BacktestConfig]:
+    """Cartesian product of the given field values, e.g. `config_grid(cost_bps=[5, 10], threshold_long=[0, 1e-3])`."""
+    base = asdict(base or BacktestConfig())
+    names = list(values)
+    return [BacktestConfig(**{**base, **dict(zip(names, combo))}) for combo in product(*values.values())]
+
+
+def positions(preds: np.ndarray, threshold_long: float, threshold_short: float) -> np.ndarray:
+    """Vectorized `Backtester._generate_signals`: short overrides long, NaN stays flat."""
+    return np.where(preds < threshold_short, -1, np.where(preds > threshold_long, 1, 0)).astype(np.int8)
+
+
+def returns_metrics(net: np.ndarray) -> Dict[str, np.ndarray]:
+    """`_compute_metrics` for every column of a (time, configs) array of net returns."""
+    mean = np.nanmean(net, axis=0)
+    std = np.nanstd(net, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(252), 0.0)
+
+    # NaN returns are skipped by the running product but stay NaN in the curve, as in pandas
+    missing = np.isnan(net)
+    equity = np.cumprod(np.where(missing, 1.0, 1.0 + net), axis=0)
+    roll_max = np.maximum.accumulate(equity, axis=0)
+    equity[missing] = np.nan
+    drawdown = equity / roll_max - 1.0
+
+    wins = (net > 0).sum(axis=0)
+    losses = (net < 0).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(wins + losses > 0, wins / (wins + losses), 0.0)
+
+    return {
+        "total_return": equity[-1] - 1.0,
+        "sharpe": sharpe,
+        "max_drawdown": np.nanmin(drawdown, axis=0),
+        "win_rate": win_rate,
+        "avg_daily_return": mean,
+        "std_daily_return": std,
+    }
+
+
 class Backtester:
-    def __init__(self, config: BacktestConfig | None = None):
+    def __init__(self, config: BacktestConfig | None = None, tracking: TrackingSink | None = None):
         self.config = config or BacktestConfig()
+        self.tracking = tracking if tracking is not None else tracking_sink("sync")
 
     def _generate_signals(self, preds: pd.Series) -> pd.Series:
         s = pd.Series(0, index=preds.index, dtype=int)
@@ -29,7 +77,8 @@ class Backtester:
         cost_rate = self.config.cost_bps / 10000.0
         return pos_change * cost_rate
 
-    def run(self, df: pd.DataFrame, preds: pd.Series, ticker: str) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    def simulate(self, df: pd.DataFrame, preds: pd.Series) -> pd.DataFrame:
+        """Positions, costs and equity for the configured strategy, without logging."""
         df = df.copy()
         df["pred"] = preds
 
@@ -39,25 +88,65 @@ class Backtester:
         df["cost"] = self._compute_transaction_costs(df["position"])
         df["strategy_net"] = df["strategy_gross"] - df["cost"]
         df["equity"] = (1 + df["strategy_net"]).cumprod()
+        return df
 
-        metrics = self._compute_metrics(df)
-
-        # MLflow logging
-        with mlflow.start_run(run_name=f"backtest_{ticker}"):
-            mlflow.log_params(asdict(self.config))
-            mlflow.log_metrics(metrics)
-
-            # Save artifacts
-            equity_path = f"equity_{ticker}.csv"
-            df[["equity"]].to_csv(equity_path)
-            mlflow.log_artifact(equity_path)
-
-            full_log_path = f"backtest_full_{ticker}.csv"
-            df.to_csv(full_log_path)
-            mlflow.log_artifact(full_log_path)
-
+    def run(self, df: pd.DataFrame, preds: pd.Series, ticker: str) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        with stage("Backtester.run") as s:
+            s.count(rows=len(df))
+            df = self.simulate(df, preds)
+            metrics = self._compute_metrics(df)
+        with stage("Backtester.log_run"):
+            self._log_run(df, metrics, ticker)
         return df, metrics
 
+    def _log_run(self, df: pd.DataFrame, metrics: Dict[str, float], ticker: str):
+        self.tracking.log_run(
+            f"backtest_{ticker}",
+            params=asdict(self.config),
+            metrics=metrics,
+            artifacts={f"equity_{ticker}": df[["equity"]], f"backtest_full_{ticker}": df},
+        )
+
+    def run_grid(
+        self,
+        df: pd.DataFrame,
+        preds: pd.Series,
+        grid: Union[Sequence[BacktestConfig], Mapping[str, Iterable]],
+        chunk_size: int = 1024,
+    ) -> pd.DataFrame:
+        """
+        Backtests every config in `grid` (a list of configs, or field -> values
+        for their cartesian product) in one vectorized pass over (time, configs)
+        arrays, `chunk_size` configs at a time. Returns one row per config with
+        its parameters and the `_compute_metrics` outputs; nothing is logged.
+        """
+        with stage("Backtester.run_grid") as s:
+            s.count(rows=len(df))
+            return self._run_grid(df, preds, grid, chunk_size)
+
+    def _run_grid(self, df, preds, grid, chunk_size):
+        configs = config_grid(self.config, **grid) if isinstance(grid, Mapping) else list(grid)
+        params = pd.DataFrame([asdict(c) for c in configs], columns=[f.name for f in fields(BacktestConfig)])
+
+        pred = pd.Series(preds).reindex(df.index).to_numpy(dtype=float)[:, None]
+        ret = df["target"].to_numpy(dtype=float)[:, None]
+
+        columns = {m: np.empty(len(configs)) for m in METRICS}
+        for start in range(0, len(configs), chunk_size):
+            chunk = params.iloc[start:start + chunk_size]
+            long = chunk["threshold_long"].to_numpy(dtype=float)[None, :]
+            short = chunk["threshold_short"].to_numpy(dtype=float)[None, :]
+            cost_rate = chunk["cost_bps"].to_numpy(dtype=float)[None, :] / 10000.0
+
+            position = positions(pred, long, short)
+            change = np.abs(np.diff(position, axis=0, prepend=position[:1]))
+            net = position * ret - change * cost_rate
+
+            for name, values in returns_metrics(net).items():
+                columns[name][start:start + len(chunk)] = values
+
+        return params.assign(**columns)
+
     def _compute_metrics(self, df: pd.DataFrame) -> Dict[str, float]:
         strat = df["strategy_net"]
         daily_ret = strat
@@ -84,4 +173,4 @@ class Backtester:
             "win_rate": float(win_rate),
             "avg_daily_return": float(mean_daily),
             "std_daily_return": float(std_daily),
-        }
\ No newline at end of file
+        }
@@ -1,33 +1,253 @@
-import yfinance as yf
+import datetime
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
 import pandas as pd
 from pathlib import Path
-import yaml
+
+from src.utils.config_loader import DataConfig, load_config, load_typed
+from src.utils.locks import file_lock
+from src.utils.profiling import stage
+from .storage import FrameStore
+
+MANIFEST_NAME = "_manifest.json"
+
+
+@dataclass
+class FetchResult:
+    ticker: str
+    rows: int = 0
+    attempts: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
 
 class DataFetcher:
-    def __init__(self, config_path: str):
-        with open(config_path, 'r') as file:
-            self.config = yaml.safe_load(file)
+    def __init__(self, config_path: str, provider=None):
+        self.config = load_config(config_path)
+        self.settings = load_typed(config_path, DataConfig)
 
-        self.output_dir = Path(self.config['output_dir'])
+        self.output_dir = Path(self.settings.output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def fetch_data(self):
-        tickers = self.config.get('tickers', [])
-        start = self.config.get('start_date')
-        end = self.config.get('end_date')
+        self.store = FrameStore(self.output_dir, self.settings.storage_format)
+
+        if provider is None:
+            if self.settings.provider == 'synthetic':
+                from .synthetic import SyntheticConfig, SyntheticProvider
+                provider = SyntheticProvider(SyntheticConfig(**self.settings.synthetic))
+            else:
+                from .providers import YFinanceProvider
+                provider = YFinanceProvider()
+        self.provider = provider
+
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.manifest = self._load_manifest()
+        self._manifest_lock = threading.Lock()
+
+        fetch = self.settings.fetch
+        self.workers = fetch.workers
+        self.retries = fetch.retries
+        self.backoff = fetch.backoff
+        self.batch_size = fetch.batch_size
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _last_timestamp(self, ticker: str):
+        entry = self.manifest.get(ticker)
+        if entry is not None:
+            return pd.Timestamp(entry['last'])
+        if not self.store.exists(ticker):
+            return None
+        # No manifest entry yet (e.g. data from an older full download)
+        index = self.store.read(ticker, columns=[]).index
+        return index.max() if len(index) else None
+
+    def _update_manifest(self, ticker: str, data: pd.DataFrame, appended: bool):
+        lock_path = self.manifest_path.with_name(self.manifest_path.name + ".lock")
+        with self._manifest_lock, file_lock(lock_path):
+            # Other processes may have recorded their tickers since we loaded it
+            self.manifest.update(self._load_manifest())
+            self._update_manifest_locked(ticker, data, appended)
+
+    def _update_manifest_locked(self, ticker: str, data: pd.DataFrame, appended: bool):
+        entry = self.manifest.get(ticker)
+        first = data.index.min()
+        rows = len(data)
+        if appended and entry is not None:
+            first = min(first, pd.Timestamp(entry['first']))
+            rows += entry['rows']
+        elif appended:
+            # No entry for an older file: the stored frame (already appended to) has the full history
+            index = self.store.read(ticker, columns=[]).index
+            first, rows = index.min(), len(index)
+
+        self.manifest[ticker] = {
+            'first': first.isoformat(),
+            'last': data.index.max().isoformat(),
+            'rows': int(rows),
+            'updated': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        }
+        self._save_manifest()
+
+    def fetch_data(self, incremental: bool | None = None, workers: int | None = None) -> List[FetchResult]:
+        if incremental is None:
+            incremental = self.settings.incremental
+        if workers is None:
+            workers = self.workers
+
+        tickers = list(self.settings.tickers)
+        started = time.perf_counter()
+        with stage("DataFetcher.fetch_data") as s:
+            results = self._fetch_concurrent(tickers, incremental, max(1, workers))
+            s.count(rows=sum(r.rows for r in results))
+        elapsed = time.perf_counter() - started
+
+        failed = [r for r in results if r.error is not None]
+        for r in failed:
+            print(f"Error fetching {r.ticker}: {r.error}")
+        print(f"Fetched {len(results) - len(failed)}/{len(results)} tickers in {elapsed:.2f}s")
+        return results
+
+    def fetch_ticker(self, ticker: str, incremental: bool = False) -> int:
+        """Downloads bars for one ticker and returns the number of rows stored."""
+        plan = self._plan(ticker, incremental)
+        if plan is None:
+            return 0
+
+        start, end, last = plan
+        df = self.provider.download(ticker, start=start, end=end)
+        return self._store(ticker, df, last)
+
+    def _plan(self, ticker: str, incremental: bool):
+        """Returns the (start, end, last stored bar) to request, or None if up to date."""
+        start = self.settings.start_date
+        end = self.settings.end_date
+
+        last = self._last_timestamp(ticker) if incremental else None
+        if last is not None:
+            start = (last + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            if end is not None and pd.Timestamp(start) >= pd.Timestamp(end):
+                print(f"{ticker} is up to date (last bar {last.date()})")
+                return None
+
+        return start, end, last
+
+    def _store(self, ticker: str, df: Optional[pd.DataFrame], last) -> int:
+        if df is None or df.empty:
+            print(f"Warning: No data returned for {ticker}")
+            return 0
+
+        if last is None:
+            self.save_data(ticker, df)
+            return len(df)
+
+        new_rows = df[df.index > last]
+        if new_rows.empty:
+            print(f"{ticker} is up to date (last bar {last.date()})")
+            return 0
+
+        self.save_data(ticker, new_rows, append=True)
+        return len(new_rows)
+
+    def _batches(self, tickers: List[str], incremental: bool):
+        """Groups tickers that need the same date range into provider-sized batches."""
+        batch_size = self.batch_size if hasattr(self.provider, 'download_many') else 1
+        by_range: Dict[tuple, list] = {}
+        skipped = []
 
         for ticker in tickers:
-            try:
-                df = yf.download(ticker, start=start, end=end)
-                if df.empty:
-                    print(f"Warning: No data returned for {ticker}")
-                    continue
+            plan = self._plan(ticker, incremental)
+            if plan is None:
+                skipped.append(ticker)
+                continue
+            start, end, last = plan
+            by_range.setdefault((start, end), []).append((ticker, last))
+
+        batches = []
+        for (start, end), group in by_range.items():
+            for i in range(0, len(group), max(1, batch_size)):
+                batches.append((start, end, group[i:i + batch_size]))
+        return batches, skipped
 
-                self.save_data(ticker, df)
+    def _download(self, tickers: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        if len(tickers) == 1:
+            return {tickers[0]: self.provider.download(tickers[0], start=start, end=end)}
+        return self.provider.download_many(tickers, start=start, end=end)
+
+    def _run_batch(self, start, end, group) -> List[FetchResult]:
+        pending = [ticker for ticker, _ in group]
+        started = time.perf_counter()
+        attempts = 0
+        error = None
+        frames: Dict[str, pd.DataFrame] = {}
+
+        # Tickers a batch response leaves out are requested again with the retries left
+        while pending and attempts <= self.retries:
+            attempts += 1
+            try:
+                received = self._download(pending, start, end)
+                error = None
             except Exception as e:
-                print(f"Error fetching {ticker}: {e}")
+                error = str(e)
+            else:
+                frames.update((ticker, received[ticker]) for ticker in pending if ticker in received)
+                pending = [ticker for ticker in pending if ticker not in frames]
+            if pending and attempts <= self.retries:
+                time.sleep(self.backoff * 2 ** (attempts - 1))
+
+        elapsed = time.perf_counter() - started
+        results = []
+        for ticker, last in group:
+            result = FetchResult(ticker, attempts=attempts, seconds=elapsed)
+            if ticker not in frames:
+                result.error = error or "missing from batch response"
+            else:
+                try:
+                    result.rows = self._store(ticker, frames[ticker], last)
+                except Exception as e:
+                    result.error = str(e)
+            results.append(result)
+        return results
+
+    def _fetch_concurrent(self, tickers: List[str], incremental: bool, workers: int) -> List[FetchResult]:
+        batches, skipped = self._batches(tickers, incremental)
+        results = [FetchResult(ticker) for ticker in skipped]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._run_batch, *batch) for batch in batches]
+            for future in as_completed(futures):
+                results.extend(future.result())
+
+        order = {ticker: i for i, ticker in enumerate(tickers)}
+        return sorted(results, key=lambda r: order.get(r.ticker, len(order)))
+
+    def save_data(self, ticker: str, data: pd.DataFrame, append: bool = False):
+        if isinstance(data.columns, pd.MultiIndex):
+            # yfinance returns (Price, Ticker) columns; columnar formats need flat names
+            data = data.copy()
+            data.columns = data.columns.get_level_values(0)
+
+        if append:
+            file_path = self.store.append(ticker, data)
+            print(f"Appended {len(data)} bars for {ticker} to {file_path}")
+        else:
+            file_path = self.store.write(ticker, data)
+            print(f"Data for {ticker} saved to {file_path}")
 
-    def save_data(self, ticker: str, data: pd.DataFrame):
-        file_path = self.output_dir / f"{ticker}.csv"
-        data.to_csv(file_path)
-        print(f"Data for {ticker} saved to {file_path}")
\ No newline at end of file
+        self._update_manifest(ticker, data, appended=append)
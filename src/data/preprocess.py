@@ -1,23 +1,116 @@
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
-import yaml
+
+from src.utils.config_loader import DataConfig, load_config, load_typed
+from src.utils.profiling import stage
+from .storage import FrameStore
+
+
+def _to_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index, format="%Y-%m-%d", errors="coerce")
+    return df
+
+
+def _time_ordered(df: pd.DataFrame) -> pd.DataFrame:
+    """Sorts `df` by time; rows whose timestamp can't be parsed have no place in the series and are dropped."""
+    df = _to_datetime_index(df)
+    if df.index.hasnans:
+        df = df[df.index.notna()]
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="mergesort")
+    return df
+
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    floats = {c: np.float32 for c, dtype in df.dtypes.items() if dtype == np.float64}
+    return df.astype(floats) if floats else df
+
+
+class ChunkCleaner:
+    """
+    `DataPreprocessor.clean` for a file arriving as consecutive chunks.
+
+    Only the boundary state is kept between chunks: the last timestamp (to
+    drop duplicates that straddle a boundary and to check ordering) and the
+    last valid value of each column (to forward-fill into the next chunk).
+    Rows may be unordered within a chunk, but a chunk must not start before
+    the previous one ended. Rows with unparseable timestamps are dropped, as
+    in `clean`.
+    """
+
+    def __init__(self, rules: dict):
+        self.rules = rules
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self.last_valid: Optional[pd.Series] = None
+        self.rows = 0
+
+    def push(self, df: pd.DataFrame) -> pd.DataFrame:
+        rules = self.rules
+        df = _time_ordered(df)
+        if not len(df):
+            return df
+
+        if self.last_timestamp is not None:
+            if df.index[0] < self.last_timestamp:
+                raise ValueError(
+                    f"Chunk starting at {df.index[0]} is older than the previous chunk's last bar "
+                    f"{self.last_timestamp}; streamed input must be in time order."
+                )
+            if rules.get("remove_duplicates", True) and df.index[0] == self.last_timestamp:
+                df = df[df.index != self.last_timestamp]
+        if rules.get("remove_duplicates", True) and not df.index.is_unique:
+            df = df[~df.index.duplicated(keep="first")]
+        if not len(df):
+            return df
+        self.last_timestamp = df.index[-1]
+
+        if rules.get("dropna", False):
+            df = df.dropna()
+
+        if rules.get("forward_fill", False) and len(df):
+            df = df.ffill()
+            if self.last_valid is not None:
+                # Only leading gaps are left after ffill; they continue the previous chunk
+                df = df.fillna(self.last_valid)
+            last = df.iloc[-1]
+            self.last_valid = last if self.last_valid is None else last.fillna(self.last_valid)
+
+        if rules.get("float32", False):
+            df = _downcast(df)
+        self.rows += len(df)
+        return df
+
 
 class DataPreprocessor:
     def __init__(self, config_path="config/data.yaml"):
-        with open(config_path, "r") as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
+        self.settings = load_typed(config_path, DataConfig)
 
         self.raw_dir = Path("data/raw")
         self.processed_dir = Path("data/processed")
         self.processed_dir.mkdir(parents=True, exist_ok=True)
 
+        self.raw_store = FrameStore(self.raw_dir, self.settings.storage_format)
+        self.processed_store = FrameStore(self.processed_dir, self.settings.storage_format)
+        # Stream raw files in chunks of this many rows instead of loading them whole
+        self.chunk_rows = self.settings.chunk_rows
+
     def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        with stage("DataPreprocessor.clean") as s:
+            s.count(df)
+            return self._clean(df)
+
+    def _clean(self, df: pd.DataFrame) -> pd.DataFrame:
         rules = self.config.get("cleaning", {})
 
-        df.index = pd.to_datetime(df.index, format="%Y-%m-%d", errors="coerce")
-        df = df.sort_index()
+        # Each step is skipped when the input already satisfies it
+        df = _time_ordered(df)
 
-        if rules.get("remove_duplicates", True):
+        if rules.get("remove_duplicates", True) and not df.index.is_unique:
             df = df[~df.index.duplicated(keep="first")]
 
         if rules.get("dropna", False):
@@ -26,18 +119,42 @@ class DataPreprocessor:
         if rules.get("forward_fill", False):
             df = df.ffill()
 
+        if rules.get("float32", False):
+            df = _downcast(df)
+
         return df
 
+    def clean_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Cleans consecutive chunks of one series with bounded memory; see `ChunkCleaner`."""
+        cleaner = ChunkCleaner(self.config.get("cleaning", {}))
+        for chunk in chunks:
+            with stage("DataPreprocessor.clean_chunk") as s:
+                s.count(chunk)
+                out = cleaner.push(chunk)
+            if len(out):
+                yield out
+
     def process_all(self):
-        for file in self.raw_dir.glob("*.csv"):
-            df = pd.read_csv(
-                file,
-                index_col=0,
-                parse_dates=[0],
-                date_format="%Y-%m-%d"
-            )
-
-            df_clean = self.clean(df)
-            output_path = self.processed_dir / file.name
-            df_clean.to_csv(output_path)
-            print(f"Processed: {file.name} → {output_path}")
\ No newline at end of file
+        for ticker in self.raw_store.names():
+            self.process_ticker(ticker)
+
+    def process_ticker(self, ticker: str):
+        if self.chunk_rows:
+            return self.process_ticker_chunked(ticker, self.chunk_rows)
+
+        df = self.raw_store.read(ticker)
+
+        df_clean = self.clean(df)
+        output_path = self.processed_store.write(ticker, df_clean)
+        print(f"Processed: {ticker} → {output_path}")
+        return output_path
+
+    def process_ticker_chunked(self, ticker: str, chunk_rows: int):
+        """Streams the raw file through `clean_chunks` into the processed store, one chunk in memory at a time."""
+        with self.processed_store.chunk_writer(ticker) as write:
+            for chunk in self.clean_chunks(self.raw_store.iter_chunks(ticker, chunk_rows)):
+                write(chunk)
+
+        output_path = self.processed_store.path(ticker)
+        print(f"Processed: {ticker} → {output_path} (streamed in chunks of {chunk_rows} rows)")
+        return output_path
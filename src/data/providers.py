@@ -0,0 +1,23 @@
+from typing import Dict, List
+
+import pandas as pd
+import yfinance as yf
+
+
+class YFinanceProvider:
+    """Downloads daily bars from Yahoo Finance."""
+
+    def download(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        return yf.download(ticker, start=start, end=end)
+
+    def download_many(self, tickers: List[str], start=None, end=None) -> Dict[str, pd.DataFrame]:
+        data = yf.download(tickers, start=start, end=end, group_by="ticker", threads=False)
+        if data.empty:
+            return {}
+
+        frames = {}
+        available = set(data.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker in available:
+                frames[ticker] = data[ticker].dropna(how="all")
+        return frames
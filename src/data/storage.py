@@ -0,0 +1,266 @@
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+SUFFIXES = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "csv": ".csv",
+}
+
+DEFAULT_FORMAT = "parquet"
+
+# Columnar appends go to numbered part files next to the frame; past this
+# many parts the next append folds them back into a single file
+MAX_PARTS = 32
+
+
+def _index_columns(schema) -> List[str]:
+    meta = schema.pandas_metadata or {}
+    return [c for c in meta.get("index_columns", []) if isinstance(c, str)]
+
+
+def _read_schema(path: Path):
+    if path.suffix == ".parquet":
+        return pq.read_schema(path, memory_map=True)
+    return feather.read_table(path, columns=[], memory_map=True).schema
+
+
+def _read_table(path: Path, columns: Optional[Sequence[str]] = None):
+    if path.suffix == ".parquet":
+        return pq.read_table(
+            path,
+            columns=list(columns) if columns is not None else None,
+            memory_map=True,
+            use_pandas_metadata=True,
+        )
+    if columns is not None:
+        columns = _index_columns(_read_schema(path)) + list(columns)
+    return feather.read_table(path, columns=columns, memory_map=True)
+
+
+def _iter_file(path: Path, chunksize: int, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    if path.suffix == ".parquet":
+        reader = pq.ParquetFile(path, memory_map=True)
+        for batch in reader.iter_batches(batch_size=chunksize, columns=list(columns) if columns else None,
+                                         use_pandas_metadata=True):
+            yield batch.to_pandas()
+        return
+
+    if path.suffix == ".feather":
+        # Feather record batches are fixed at write time; slice the large ones
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for start in range(0, batch.num_rows, chunksize):
+                    df = batch.slice(start, chunksize).to_pandas()
+                    yield df[list(columns)] if columns is not None else df
+        return
+
+    for df in pd.read_csv(path, index_col=0, parse_dates=True, chunksize=chunksize):
+        yield df[list(columns)] if columns is not None else df
+
+
+class FrameStore:
+    """
+    Stores one DataFrame per name (usually a ticker) in a directory.
+
+    Columnar formats (Parquet/Feather) keep dtypes and the DatetimeIndex, are
+    read memory-mapped and support column pruning. CSV is kept as a fallback
+    when pyarrow is missing, and existing CSV files are still readable when a
+    columnar format is configured.
+
+    Columnar files can't be extended in place, so `append` writes the new rows
+    to `<name>.parts/` and readers stitch the parts back on in order.
+    """
+
+    def __init__(self, directory, fmt: str = DEFAULT_FORMAT):
+        fmt = (fmt or DEFAULT_FORMAT).lower()
+        if fmt not in SUFFIXES:
+            raise ValueError(f"Unsupported storage format: {fmt}")
+        if fmt != "csv" and pa is None:
+            print(f"Warning: pyarrow not installed, falling back to CSV storage for {directory}")
+            fmt = "csv"
+
+        self.fmt = fmt
+        self.suffix = SUFFIXES[fmt]
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}{self.suffix}"
+
+    def _existing_path(self, name: str) -> Optional[Path]:
+        path = self.path(name)
+        if path.exists():
+            return path
+        legacy = self.directory / f"{name}.csv"
+        if legacy.exists():
+            return legacy
+        return None
+
+    def _parts_dir(self, name: str) -> Path:
+        return self.directory / f"{name}.parts"
+
+    def _parts(self, name: str) -> List[Path]:
+        return sorted(self._parts_dir(name).glob(f"*{self.suffix}"))
+
+    def _files(self, name: str) -> List[Path]:
+        path = self._existing_path(name)
+        if path is None:
+            raise FileNotFoundError(f"No stored frame for {name} in {self.directory}")
+        # Parts always share the store's format; a legacy CSV never has any
+        return [path, *self._parts(name)] if path.suffix == self.suffix else [path]
+
+    def exists(self, name: str) -> bool:
+        return self._existing_path(name) is not None
+
+    def names(self) -> List[str]:
+        stems = {p.stem for p in self.directory.glob(f"*{self.suffix}")}
+        stems.update(p.stem for p in self.directory.glob("*.csv"))
+        return sorted(stems)
+
+    def read(self, name: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        files = self._files(name)
+
+        if files[0].suffix == ".csv":
+            df = pd.read_csv(files[0], index_col=0, parse_dates=True)
+            if columns is not None:
+                df = df[list(columns)]
+            return df
+
+        tables = [_read_table(path, columns) for path in files]
+        table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+        return table.to_pandas()
+
+    def iter_chunks(self, name: str, chunksize: int, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+        """Reads a stored frame `chunksize` rows at a time (at most), without loading it whole."""
+        for path in self._files(name):
+            yield from _iter_file(path, chunksize, columns)
+
+    @contextmanager
+    def chunk_writer(self, name: str):
+        """
+        Yields a `write(df)` callable that appends chunks to `name`; the file
+        replaces any existing one atomically once the block exits cleanly.
+        Every chunk must have the first chunk's columns and dtypes.
+        """
+        path = self.path(name)
+        tmp_path = path.with_name(path.name + ".tmp")
+        state = {"writer": None, "schema": None}
+
+        def write(df: pd.DataFrame):
+            if self.fmt == "csv":
+                df.to_csv(tmp_path, mode="a" if state["schema"] else "w", header=not state["schema"])
+                state["schema"] = True
+                return
+            table = pa.Table.from_pandas(df, preserve_index=True, schema=state["schema"])
+            if state["writer"] is None:
+                state["schema"] = table.schema
+                if self.fmt == "parquet":
+                    state["writer"] = pq.ParquetWriter(tmp_path, table.schema)
+                else:
+                    state["writer"] = pa.ipc.new_file(str(tmp_path), table.schema)
+            if self.fmt == "parquet":
+                state["writer"].write_table(table)
+            else:
+                for batch in table.to_batches():
+                    state["writer"].write_batch(batch)
+
+        try:
+            yield write
+        except BaseException:
+            if state["writer"] is not None:
+                state["writer"].close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if state["writer"] is not None:
+            state["writer"].close()
+        if state["schema"] is None:
+            # Nothing written: store an empty frame so the name still exists
+            self.write(name, pd.DataFrame())
+            return
+        self._drop_parts(name)
+        os.replace(tmp_path, path)
+
+    def write(self, name: str, df: pd.DataFrame) -> Path:
+        path = self.path(name)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        if self.fmt == "parquet":
+            df.to_parquet(tmp_path)
+        elif self.fmt == "feather":
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+        else:
+            df.to_csv(tmp_path)
+
+        # Atomic swap so concurrent readers never see a half-written file
+        self._drop_parts(name)
+        os.replace(tmp_path, path)
+        return path
+
+    def _drop_parts(self, name: str):
+        # Dropped before the new file lands: a reader in between sees the old
+        # frame without its latest appends, never rows twice
+        shutil.rmtree(self._parts_dir(name), ignore_errors=True)
+
+    def _append_part(self, name: str, path: Path, df: pd.DataFrame) -> bool:
+        parts = self._parts(name)
+        if len(parts) >= MAX_PARTS:
+            return False
+        schema = _read_schema(path)
+        index = _index_columns(schema)
+        # New columns, or an index the file doesn't store (a RangeIndex): the
+        # caller rewrites with the merged frame
+        if not index or {str(c) for c in df.columns} != set(schema.names) - set(index):
+            return False
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True, schema=schema)
+        except (pa.ArrowException, KeyError, ValueError, TypeError):
+            return False
+
+        part = self._parts_dir(name) / f"{len(parts):06d}{self.suffix}"
+        part.parent.mkdir(exist_ok=True)
+        tmp_path = part.with_name(part.name + ".tmp")
+        if self.fmt == "parquet":
+            pq.write_table(table, tmp_path)
+        else:
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, part)
+        return True
+
+    def append(self, name: str, df: pd.DataFrame) -> Path:
+        """Appends rows to a stored frame, creating it if needed."""
+        path = self._existing_path(name)
+        if path is None:
+            return self.write(name, df)
+
+        if path.suffix == ".csv" and self.fmt == "csv":
+            df.to_csv(path, mode="a", header=False)
+            return path
+
+        if path.suffix == self.suffix and self._append_part(name, path, df):
+            return path
+
+        # Legacy CSVs, schema changes and long part chains are merged into one file
+        existing = self.read(name)
+        return self.write(name, pd.concat([existing, df]))
+
+    def delete(self, name: str):
+        """Removes `name` in the store's format and any legacy CSV copy."""
+        self._drop_parts(name)
+        self.path(name).unlink(missing_ok=True)
+        (self.directory / f"{name}{SUFFIXES['csv']}").unlink(missing_ok=True)
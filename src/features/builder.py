@@ -1,72 +1,170 @@
 import pandas as pd
 from pathlib import Path
-import yaml
 
-from .indicators import (
-    sma, ema, rsi, bollinger_bands,
-    returns, log_returns, rolling_volatility
-)
+from src.data.storage import FrameStore, DEFAULT_FORMAT
+from src.utils.config_loader import FeatureConfig, load_config, load_typed
+from src.utils.profiling import stage
+from .cache import FeatureCache, compute_with_cache
+from .fused import FeaturePlan, specs_from_config
+from .incremental import IncrementalFeatureEngine
+from .indicators import _close
+from .panel import pack, unpack
 
 class FeatureBuilder:
-    def __init__(self, config_path="config/features.yaml"):
-        with open(config_path, "r") as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config_path="config/features.yaml", storage_format=DEFAULT_FORMAT):
+        self.config = load_config(config_path)
+        # Validates the indicator settings; `self.config` stays the dict the feature code consumes
+        self.settings = load_typed(config_path, FeatureConfig)
 
         self.processed_dir = Path("data/processed")
         self.features_dir = Path("data/features")
         self.features_dir.mkdir(parents=True, exist_ok=True)
 
+        self.processed_store = FrameStore(self.processed_dir, storage_format)
+        self.features_store = FrameStore(self.features_dir, storage_format)
+        self.state_dir = self.features_dir / "_state"
+        self.cache = FeatureCache.from_config(self.config, storage_format)
+
     def build_features(self, df: pd.DataFrame):
+        with stage("FeatureBuilder.build_features") as s:
+            s.count(df)
+            return self._build_features(df)
+
+    def _build_features(self, df: pd.DataFrame):
         # Ensure numeric types
         for col in df.columns:
+            if pd.api.types.is_numeric_dtype(df[col]):
+                continue
             try:
                 df[col] = pd.to_numeric(df[col])
             except Exception:
                 pass
 
-        features = pd.DataFrame(index=df.index)
-
-        # Trend indicators
-        for window in self.config["sma"]:
-            features[f"SMA_{window}"] = sma(df, window)
-
-        for window in self.config["ema"]:
-            features[f"EMA_{window}"] = ema(df, window)
-
-        # Momentum
-        if self.config["rsi"]["enabled"]:
-            w = self.config["rsi"]["window"]
-            features[f"RSI_{w}"] = rsi(df, w)
-
-        # Volatility
-        if self.config["bollinger"]["enabled"]:
-            bb = bollinger_bands(
-                df,
-                window=self.config["bollinger"]["window"],
-                num_std=self.config["bollinger"]["num_std"]
-            )
-            features = features.join(bb)
-
-        # Price‑action features
-        if self.config["returns"]["enabled"]:
-            features["returns"] = returns(df)
-
-        if self.config["log_returns"]["enabled"]:
-            features["log_returns"] = log_returns(df)
-
-        if self.config["rolling_volatility"]["enabled"]:
-            w = self.config["rolling_volatility"]["window"]
-            features[f"volatility_{w}"] = rolling_volatility(df, w)
-
-        return features
+        # All indicators come out of one fused pass that shares rolling sums,
+        # diffs and returns between indicators using the same window
+        plan = FeaturePlan.from_config(self.config)
+        values = plan.compute(_close(df).to_numpy(dtype=float))
+        return pd.DataFrame({name: v[:, 0] for name, v in values.items()}, index=df.index)
+
+    def _state_path(self, ticker):
+        return self.state_dir / f"{ticker}.pkl"
+
+    def _load_state(self, ticker):
+        state_path = self._state_path(ticker)
+        if not state_path.exists() or not self.features_store.exists(ticker):
+            return None
+
+        engine = IncrementalFeatureEngine.load(state_path)
+        # An indicator config change invalidates the state and forces a full rebuild
+        if specs_from_config(engine.config) != specs_from_config(self.config):
+            return None
+        return engine
+
+    def _append(self, ticker, engine, df: pd.DataFrame):
+        new_features = engine.update(df)
+        if new_features.empty:
+            return None
+
+        output_path = self.features_store.append(ticker, new_features)
+        engine.save(self._state_path(ticker))
+        return output_path
+
+    def _save(self, ticker, df: pd.DataFrame, features: pd.DataFrame):
+        output_path = self.features_store.write(ticker, features)
+
+        if self.config.get("incremental", False):
+            engine = IncrementalFeatureEngine(self.config)
+            engine.prime(df, features)
+            engine.save(self._state_path(ticker))
+        return output_path
+
+    def update_ticker(self, ticker, df: pd.DataFrame):
+        """
+        Appends features for bars newer than the saved indicator state.
+        Returns the path written, or None when there was nothing new.
+        """
+        engine = self._load_state(ticker)
+        if engine is None:
+            return self.rebuild_ticker(ticker, df)
+        return self._append(ticker, engine, df)
+
+    def rebuild_ticker(self, ticker, df: pd.DataFrame):
+        return self._save(ticker, df, self.build_features(df))
+
+    def _compute(self, specs, closes):
+        """One feature frame per ticker for `specs`, panel-wide or ticker by ticker."""
+        plan = FeaturePlan(specs, use_numba=self.config.get("jit", True))
+
+        with stage("FeatureBuilder.compute") as s:
+            s.count(rows=sum(len(c) for c in closes.values()))
+            if self.config.get("panel", False):
+                panel, _ = pack(closes)
+                return unpack(plan.compute(panel), closes)
+
+            frames = {}
+            for ticker, close in closes.items():
+                values = plan.compute(pd.to_numeric(close, errors="coerce").to_numpy(dtype=float))
+                frames[ticker] = pd.DataFrame({name: v[:, 0] for name, v in values.items()}, index=close.index)
+            return frames
+
+    def compute_features(self, closes):
+        """Features for in-memory close series keyed by ticker, without touching disk."""
+        return self._compute(specs_from_config(self.config), closes)
+
+    def _rebuild(self, tickers):
+        prices = {t: self.processed_store.read(t, columns=["Close"]) for t in tickers}
+        closes = {t: df["Close"] for t, df in prices.items()}
+        specs = specs_from_config(self.config)
+
+        if self.cache is None:
+            features, keys = self._compute(specs, closes), {}
+        else:
+            for ticker in tickers:
+                if not self.features_store.exists(ticker):
+                    self.cache.forget(ticker)
+            features, keys = compute_with_cache(self.cache, specs, closes, self._compute)
+
+        for ticker in tickers:
+            if ticker not in features:
+                print(f"Features up to date: {ticker}")
+                continue
+
+            output_path = self._save(ticker, prices[ticker], features[ticker])
+            if ticker in keys:
+                self.cache.mark(ticker, keys[ticker])
+            print(f"Features saved: {output_path}")
+
+    def process_ticker(self, ticker):
+        engine = self._load_state(ticker) if self.config.get("incremental", False) else None
+        if engine is None:
+            self._rebuild([ticker])
+            return
+
+        output_path = self._append(ticker, engine, self.processed_store.read(ticker))
+        if output_path is None:
+            print(f"Features up to date: {ticker}")
+        else:
+            print(f"Features saved: {output_path}")
 
     def process_all(self):
-        for file in self.processed_dir.glob("*.csv"):
-            df = pd.read_csv(file, index_col=0, parse_dates=True)
-
-            features = self.build_features(df)
-
-            output_path = self.features_dir / file.name
-            features.to_csv(output_path)
-
-            print(f"Features saved: {output_path}")
\ No newline at end of file
+        incremental = self.config.get("incremental", False)
+        rebuild = []
+
+        for ticker in self.processed_store.names():
+            engine = self._load_state(ticker) if incremental else None
+            if engine is None:
+                rebuild.append(ticker)
+                continue
+
+            output_path = self._append(ticker, engine, self.processed_store.read(ticker))
+            if output_path is None:
+                print(f"Features up to date: {ticker}")
+            else:
+                print(f"Features saved: {output_path}")
+
+        if rebuild:
+            self._rebuild(rebuild)
+
+        if self.cache is not None:
+            self.cache.evict()
+            print(self.cache.summary())
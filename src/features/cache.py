@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.data.storage import FrameStore, DEFAULT_FORMAT
+from . import fused, kernels
+
+
+def _source_version(*modules) -> str:
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+# Changes to the indicator code invalidate every cached column
+INDICATOR_VERSION = _source_version(fused, kernels)
+
+
+def fingerprint(close: pd.Series) -> str:
+    """Content hash of a close series and its index."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(close.index, index=False).to_numpy().tobytes())
+    digest.update(pd.to_numeric(close, errors="coerce").to_numpy(dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Content-addressed cache of computed feature columns.
+
+    Each indicator spec's columns are stored under a key combining the input
+    fingerprint, the spec and the indicator code version, so a config change
+    only recomputes the specs that changed. A small manifest per ticker
+    records which keys its feature file was written from, so unchanged
+    tickers can be skipped without touching their data.
+
+    There is no shared index: recency is the file mtime (touched on every
+    hit), which keeps the cache safe to use from several processes.
+    """
+
+    def __init__(self, cache_dir, max_bytes: Optional[int] = None,
+                 max_age_days: Optional[float] = None, storage_format=DEFAULT_FORMAT):
+        self.store = FrameStore(cache_dir, storage_format)
+        self.outputs_dir = Path(cache_dir) / "outputs"
+        self.outputs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0, "evicted": 0}
+
+    @classmethod
+    def from_config(cls, config: dict, storage_format=DEFAULT_FORMAT) -> Optional["FeatureCache"]:
+        cfg = config.get("cache", {})
+        if not cfg.get("enabled", False):
+            return None
+        max_mb = cfg.get("max_size_mb")
+        return cls(
+            cfg.get("dir", "data/features/_cache"),
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb is not None else None,
+            max_age_days=cfg.get("max_age_days"),
+            storage_format=storage_format,
+        )
+
+    @staticmethod
+    def key(fp: str, spec) -> str:
+        raw = f"{fp}|{spec!r}|{INDICATOR_VERSION}"
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        if not self.store.exists(key):
+            self.stats["misses"] += 1
+            return None
+        try:
+            frame = self.store.read(key)
+            os.utime(self.store.path(key))
+        except (OSError, FileNotFoundError):
+            # Evicted by another process between the check and the read
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return frame
+
+    def put(self, key: str, frame: pd.DataFrame):
+        self.store.write(key, frame)
+
+    def _output_path(self, ticker: str) -> Path:
+        return self.outputs_dir / f"{ticker}.json"
+
+    def is_current(self, ticker: str, keys: List[str]) -> bool:
+        path = self._output_path(ticker)
+        if not path.exists():
+            return False
+        with open(path, "r") as f:
+            current = json.load(f) == keys
+        if current:
+            self.stats["skipped"] += 1
+        return current
+
+    def forget(self, ticker: str):
+        self._output_path(ticker).unlink(missing_ok=True)
+
+    def mark(self, ticker: str, keys: List[str]):
+        path = self._output_path(ticker)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(keys, f)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Drops entries older than `max_age_days`, then the least recently used until under `max_bytes`."""
+        entries = []
+        for path in self.store.directory.glob(f"*{self.store.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            too_old = self.max_age_days is not None and now - mtime > self.max_age_days * 86400
+            too_big = self.max_bytes is not None and total > self.max_bytes
+            if not (too_old or too_big):
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats["evicted"] += 1
+
+    def summary(self) -> str:
+        s = self.stats
+        return f"Feature cache: {s['skipped']} tickers unchanged, {s['hits']} hits, {s['misses']} misses, {s['evicted']} evicted"
+
+
+def compute_with_cache(cache: FeatureCache, specs, closes: Dict[str, pd.Series], compute):
+    """
+    Returns `(frames, keys)` for the tickers whose output is stale, computing
+    only the specs missing from the cache. `compute(specs, closes)` must
+    return one frame per ticker holding the columns of `specs`. Callers
+    should `cache.mark(ticker, keys[ticker])` once the output is written.
+    """
+    columns = [c for spec in specs for c in fused.spec_columns(spec)]
+    pending: Dict[str, tuple] = {}
+    groups: Dict[tuple, List[str]] = {}
+
+    for ticker, close in closes.items():
+        fp = fingerprint(close)
+        keys = [cache.key(fp, spec) for spec in specs]
+        if cache.is_current(ticker, keys):
+            continue
+
+        cached = {}
+        for spec, key in zip(specs, keys):
+            frame = cache.get(key)
+            if frame is not None:
+                cached[spec] = frame
+        missing = tuple(spec for spec in specs if spec not in cached)
+        pending[ticker] = (keys, cached)
+        groups.setdefault(missing, []).append(ticker)
+
+    results: Dict[str, pd.DataFrame] = {}
+    for missing, tickers in groups.items():
+        computed = compute(list(missing), {t: closes[t] for t in tickers}) if missing else {}
+
+        for ticker in tickers:
+            keys, cached = pending[ticker]
+            parts = dict(cached)
+            for spec in missing:
+                part = computed[ticker][fused.spec_columns(spec)]
+                cache.put(keys[specs.index(spec)], part)
+                parts[spec] = part
+
+            frame = pd.concat([parts[spec] for spec in specs], axis=1) if specs else pd.DataFrame(index=closes[ticker].index)
+            frame.index = closes[ticker].index
+            results[ticker] = frame[columns]
+
+    return results, {ticker: pending[ticker][0] for ticker in results}
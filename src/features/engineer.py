@@ -1,6 +1,7 @@
 from src.data.fetcher import DataFetcher
 from src.data.preprocess import DataPreprocessor
 from src.features.builder import FeatureBuilder
+from src.utils.profiling import stage
 
 class FeatureEngineeringPipeline:
     def __init__(self,
@@ -8,16 +9,20 @@ class FeatureEngineeringPipeline:
                  feature_config="config/features.yaml"):
         self.fetcher = DataFetcher(data_config)
         self.preprocessor = DataPreprocessor(data_config)
-        self.builder = FeatureBuilder(feature_config)
+        storage_format = self.fetcher.store.fmt
+        self.builder = FeatureBuilder(feature_config, storage_format=storage_format)
 
     def run(self):
         print("=== Fetching raw data ===")
-        self.fetcher.fetch_data()
+        with stage("FeatureEngineeringPipeline.fetch"):
+            self.fetcher.fetch_data()
 
         print("\n=== Preprocessing data ===")
-        self.preprocessor.process_all()
+        with stage("FeatureEngineeringPipeline.preprocess"):
+            self.preprocessor.process_all()
 
         print("\n=== Building features ===")
-        self.builder.process_all()
+        with stage("FeatureEngineeringPipeline.features"):
+            self.builder.process_all()
 
         print("\n=== Feature engineering complete ===")
\ No newline at end of file
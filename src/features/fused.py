@@ -0,0 +1,159 @@
+"""
+Planned, fused computation of every configured indicator.
+
+`FeaturePlan` turns a features config into a list of indicator specs and
+works out which intermediate results they share: one diff, one
+pct_change, and one rolling sum / sum of squares per distinct window. It
+then computes them in a single pass over contiguous float64 arrays, using
+the Numba kernel when available and shared NumPy kernels otherwise.
+
+Under an enabled profiler the NumPy path times each shared intermediate
+(`features.<kernel>_<window>`); the Numba pass is timed as one stage.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.utils.profiling import stage
+from . import kernels
+
+Spec = Tuple
+
+
+def specs_from_config(config: dict) -> List[Spec]:
+    """Indicator specs in `build_features` column order."""
+    specs: List[Spec] = []
+    specs += [("sma", w) for w in config.get("sma", [])]
+    specs += [("ema", w) for w in config.get("ema", [])]
+
+    if config.get("rsi", {}).get("enabled"):
+        specs.append(("rsi", config["rsi"]["window"]))
+    if config.get("bollinger", {}).get("enabled"):
+        bb = config["bollinger"]
+        specs.append(("bollinger", bb["window"], bb["num_std"]))
+    if config.get("returns", {}).get("enabled"):
+        specs.append(("returns",))
+    if config.get("log_returns", {}).get("enabled"):
+        specs.append(("log_returns",))
+    if config.get("rolling_volatility", {}).get("enabled"):
+        specs.append(("volatility", config["rolling_volatility"]["window"]))
+    return specs
+
+
+def spec_columns(spec: Spec) -> List[str]:
+    kind = spec[0]
+    if kind == "sma":
+        return [f"SMA_{spec[1]}"]
+    if kind == "ema":
+        return [f"EMA_{spec[1]}"]
+    if kind == "rsi":
+        return [f"RSI_{spec[1]}"]
+    if kind == "bollinger":
+        return [f"BB_upper_{spec[1]}", f"BB_lower_{spec[1]}"]
+    if kind == "returns":
+        return ["returns"]
+    if kind == "log_returns":
+        return ["log_returns"]
+    if kind == "volatility":
+        return [f"volatility_{spec[1]}"]
+    raise ValueError(f"Unknown indicator spec: {spec}")
+
+
+class FeaturePlan:
+    def __init__(self, specs: List[Spec], use_numba: bool | None = None):
+        self.specs = list(specs)
+        self.columns = [c for spec in self.specs for c in spec_columns(spec)]
+        if use_numba is None:
+            use_numba = kernels.numba is not None
+        self.use_numba = use_numba and kernels.numba is not None
+
+        # Shared intermediates
+        roll: Dict[int, bool] = {}
+        for spec in self.specs:
+            if spec[0] == "sma":
+                roll.setdefault(spec[1], False)
+            elif spec[0] == "bollinger":
+                roll[spec[1]] = True
+        self.roll_windows = sorted(roll)
+        self.roll_squares = [roll[w] for w in self.roll_windows]
+        self.ema_spans = sorted({s[1] for s in self.specs if s[0] == "ema"})
+        self.rsi_windows = sorted({s[1] for s in self.specs if s[0] == "rsi"})
+        self.vol_windows = sorted({s[1] for s in self.specs if s[0] == "volatility"})
+
+    @classmethod
+    def from_config(cls, config: dict, use_numba: bool | None = None) -> "FeaturePlan":
+        if use_numba is None:
+            use_numba = config.get("jit", True)
+        return cls(specs_from_config(config), use_numba=use_numba)
+
+    def _intermediates_numba(self, close):
+        with stage("features.fused_pass"):
+            mean, std, ema, rsi, ret, vol = kernels.fused_pass(
+                close, self.roll_windows, self.roll_squares,
+                self.ema_spans, self.rsi_windows, self.vol_windows,
+            )
+        means = {w: mean[:, :, k] for k, w in enumerate(self.roll_windows)}
+        stds = {w: std[:, :, k] for k, w in enumerate(self.roll_windows)}
+        emas = {w: ema[:, :, k] for k, w in enumerate(self.ema_spans)}
+        rsis = {w: rsi[:, :, k] for k, w in enumerate(self.rsi_windows)}
+        vols = {w: vol[:, :, k] for k, w in enumerate(self.vol_windows)}
+        return means, stds, emas, rsis, ret, vols
+
+    def _intermediates_numpy(self, close):
+        means, stds, emas, rsis, vols = {}, {}, {}, {}, {}
+        for w, squares in zip(self.roll_windows, self.roll_squares):
+            if squares:
+                with stage(f"features.rolling_mean_std_{w}"):
+                    means[w], stds[w] = kernels.rolling_mean_std(close, w)
+            else:
+                with stage(f"features.rolling_mean_{w}"):
+                    means[w] = kernels.rolling_mean(close, w)
+
+        for w in self.ema_spans:
+            with stage(f"features.ema_{w}"):
+                emas[w] = kernels.ewm_mean(close, w)
+        for w in self.rsi_windows:
+            with stage(f"features.rsi_{w}"):
+                rsis[w] = kernels.rsi(close, w)
+        with stage("features.pct_change"):
+            ret = kernels.pct_change(close)
+        for w in self.vol_windows:
+            with stage(f"features.volatility_{w}"):
+                vols[w] = kernels.rolling_mean_std(ret, w)[1]
+        return means, stds, emas, rsis, ret, vols
+
+    def compute(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Computes every planned column for a (time, series) close array.
+        Returns a dict keyed by column name in plan order.
+        """
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        if close.ndim == 1:
+            close = close[:, None]
+
+        if self.use_numba:
+            means, stds, emas, rsis, ret, vols = self._intermediates_numba(close)
+        else:
+            means, stds, emas, rsis, ret, vols = self._intermediates_numpy(close)
+
+        out: Dict[str, np.ndarray] = {}
+        for spec in self.specs:
+            kind = spec[0]
+            if kind == "sma":
+                out[f"SMA_{spec[1]}"] = means[spec[1]]
+            elif kind == "ema":
+                out[f"EMA_{spec[1]}"] = emas[spec[1]]
+            elif kind == "rsi":
+                out[f"RSI_{spec[1]}"] = rsis[spec[1]]
+            elif kind == "bollinger":
+                w, num_std = spec[1], spec[2]
+                out[f"BB_upper_{w}"] = means[w] + num_std * stds[w]
+                out[f"BB_lower_{w}"] = means[w] - num_std * stds[w]
+            elif kind == "returns":
+                out["returns"] = ret
+            elif kind == "log_returns":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    out["log_returns"] = np.log(close / kernels.shift(close))
+            elif kind == "volatility":
+                out[f"volatility_{spec[1]}"] = vols[spec[1]]
+        return out
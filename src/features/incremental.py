@@ -0,0 +1,327 @@
+import math
+import pickle
+from collections import deque
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .fused import specs_from_config
+
+
+class RollingWindow:
+    """
+    Fixed-size window with running sum, sum of squares and NaN count.
+
+    Mirrors pandas `rolling(window)` with the default `min_periods=window`:
+    a statistic is only defined once the window is full of valid values.
+    Like `kernels.rolling_sums`, the sums are of values centred on an anchor
+    close to the window, so the variance of large prices with small moves
+    does not cancel away. Every `window` pushes the sums are recomputed from
+    the buffer around a fresh anchor, so neither rounding error nor a drift
+    of the price away from the anchor accumulates over long histories.
+    """
+
+    # States saved before centring kept raw sums, i.e. an anchor of 0
+    anchor = 0.0
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer = deque(maxlen=window)
+        self.anchor = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self._since_resync = 0
+
+    def push(self, x: float):
+        if len(self.buffer) == self.window:
+            old = self.buffer[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                d = old - self.anchor
+                self.total -= d
+                self.total_sq -= d * d
+
+        self.buffer.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            if self.anchor is None:
+                self.anchor = x
+            d = x - self.anchor
+            self.total += d
+            self.total_sq += d * d
+
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+
+    def _resync(self):
+        valid = [v for v in self.buffer if not math.isnan(v)]
+        if valid:
+            self.anchor = math.fsum(valid) / len(valid)
+        self.total = math.fsum(v - self.anchor for v in valid)
+        self.total_sq = math.fsum((v - self.anchor) ** 2 for v in valid)
+        self._since_resync = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.buffer) == self.window and self.nan_count == 0
+
+    def mean(self) -> float:
+        return self.anchor + self.total / self.window if self.ready else np.nan
+
+    def std(self) -> float:
+        if not self.ready or self.window < 2:
+            return np.nan
+        var = (self.total_sq - self.total * self.total / self.window) / (self.window - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class IndicatorState:
+    columns: List[str] = []
+
+    def update(self, close: np.ndarray) -> np.ndarray:
+        """Consumes new closes and returns an (n, len(columns)) array."""
+        raise NotImplementedError
+
+
+class SMAState(IndicatorState):
+    def __init__(self, window: int):
+        self.columns = [f"SMA_{window}"]
+        self.roll = RollingWindow(window)
+
+    def update(self, close):
+        out = np.empty((len(close), 1))
+        for i, x in enumerate(close):
+            self.roll.push(x)
+            out[i, 0] = self.roll.mean()
+        return out
+
+
+class EMAState(IndicatorState):
+    """Same recursion as pandas `ewm(span=window, adjust=False).mean()`."""
+
+    def __init__(self, window: int):
+        self.columns = [f"EMA_{window}"]
+        self.alpha = 2.0 / (window + 1.0)
+        self.weighted = np.nan
+        self.old_wt = 1.0
+        self.started = False
+
+    def update(self, close):
+        alpha = self.alpha
+        old_wt_factor = 1.0 - alpha
+        out = np.empty((len(close), 1))
+
+        for i, cur in enumerate(close):
+            is_obs = not math.isnan(cur)
+            if not self.started:
+                self.weighted = cur
+                self.old_wt = 1.0
+                self.started = True
+            elif not math.isnan(self.weighted):
+                self.old_wt *= old_wt_factor
+                if is_obs:
+                    if self.weighted != cur:
+                        self.weighted = (self.old_wt * self.weighted + alpha * cur) / (self.old_wt + alpha)
+                    self.old_wt = 1.0
+            elif is_obs:
+                self.weighted = cur
+            out[i, 0] = self.weighted
+        return out
+
+
+class PriceChangeState(IndicatorState):
+    """Keeps the previous close for returns-style indicators."""
+
+    def __init__(self):
+        self.prev = np.nan
+
+    def _shifted(self, close):
+        prev = np.empty(len(close))
+        if len(close):
+            prev[0] = self.prev
+            prev[1:] = close[:-1]
+            self.prev = close[-1]
+        return prev
+
+
+class ReturnsState(PriceChangeState):
+    columns = ["returns"]
+
+    def update(self, close):
+        prev = self._shifted(close)
+        return (close / prev - 1).reshape(-1, 1)
+
+
+class LogReturnsState(PriceChangeState):
+    columns = ["log_returns"]
+
+    def update(self, close):
+        prev = self._shifted(close)
+        return np.log(close / prev).reshape(-1, 1)
+
+
+class RSIState(PriceChangeState):
+    def __init__(self, window: int):
+        super().__init__()
+        self.columns = [f"RSI_{window}"]
+        self.gains = RollingWindow(window)
+        self.losses = RollingWindow(window)
+
+    def update(self, close):
+        delta = close - self._shifted(close)
+        avg_gain = np.empty(len(close))
+        avg_loss = np.empty(len(close))
+
+        for i, d in enumerate(delta):
+            if math.isnan(d):
+                self.gains.push(d)
+                self.losses.push(d)
+            else:
+                self.gains.push(d if d > 0 else 0.0)
+                self.losses.push(-d if d < 0 else 0.0)
+            avg_gain[i] = self.gains.mean()
+            avg_loss[i] = self.losses.mean()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = avg_gain / avg_loss
+            return (100 - (100 / (1 + rs))).reshape(-1, 1)
+
+
+class BollingerState(IndicatorState):
+    def __init__(self, window: int, num_std: float):
+        self.columns = [f"BB_upper_{window}", f"BB_lower_{window}"]
+        self.num_std = num_std
+        self.roll = RollingWindow(window)
+
+    def update(self, close):
+        out = np.empty((len(close), 2))
+        for i, x in enumerate(close):
+            self.roll.push(x)
+            mean = self.roll.mean()
+            std = self.roll.std()
+            out[i, 0] = mean + self.num_std * std
+            out[i, 1] = mean - self.num_std * std
+        return out
+
+
+class VolatilityState(PriceChangeState):
+    def __init__(self, window: int):
+        super().__init__()
+        self.columns = [f"volatility_{window}"]
+        self.roll = RollingWindow(window)
+
+    def update(self, close):
+        ret = close / self._shifted(close) - 1
+        out = np.empty((len(close), 1))
+        for i, r in enumerate(ret):
+            self.roll.push(r)
+            out[i, 0] = self.roll.std()
+        return out
+
+
+def _build_states(config: dict) -> List[IndicatorState]:
+    states: List[IndicatorState] = []
+    for spec in specs_from_config(config):
+        kind = spec[0]
+        if kind == "sma":
+            states.append(SMAState(spec[1]))
+        elif kind == "ema":
+            states.append(EMAState(spec[1]))
+        elif kind == "rsi":
+            states.append(RSIState(spec[1]))
+        elif kind == "bollinger":
+            states.append(BollingerState(spec[1], spec[2]))
+        elif kind == "returns":
+            states.append(ReturnsState())
+        elif kind == "log_returns":
+            states.append(LogReturnsState())
+        elif kind == "volatility":
+            states.append(VolatilityState(spec[1]))
+    return states
+
+
+def _lookback(state: IndicatorState) -> int:
+    for attr in ("roll", "gains"):
+        if hasattr(state, attr):
+            # +1 because diff/returns consume one extra bar
+            return getattr(state, attr).window + 1
+    return 1
+
+
+class IncrementalFeatureEngine:
+    """
+    Keeps per-indicator state so appending N bars costs O(N) instead of
+    recomputing every indicator over the full history.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.states = _build_states(config)
+        self.columns = [c for s in self.states for c in s.columns]
+        self.last_timestamp = None
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Returns features for the new bars in `df` and advances the state."""
+        if self.last_timestamp is not None:
+            df = df[df.index > self.last_timestamp]
+
+        close = pd.to_numeric(df["Close"], errors="coerce").to_numpy(dtype=float)
+        blocks = [s.update(close) for s in self.states]
+        values = np.hstack(blocks) if blocks else np.empty((len(df), 0))
+
+        if len(df):
+            self.last_timestamp = df.index[-1]
+        return pd.DataFrame(values, index=df.index, columns=self.columns)
+
+    def step(self, timestamp, close: float) -> np.ndarray | None:
+        """
+        `update` for a single bar without building frames, for streaming.
+        Returns the bar's feature row, or None when it is not newer than
+        the last bar seen.
+        """
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return None
+        bar = np.array([close], dtype=float)
+        row = np.hstack([s.update(bar)[0] for s in self.states]) if self.states else np.empty(0)
+        self.last_timestamp = timestamp
+        return row
+
+    def prime(self, df: pd.DataFrame, features: pd.DataFrame):
+        """
+        Warms the state from a history whose features were already built in
+        full, replaying only the lookback tail each indicator needs.
+        """
+        close = pd.to_numeric(df["Close"], errors="coerce").to_numpy(dtype=float)
+
+        for state in self.states:
+            if isinstance(state, EMAState):
+                if not len(close):
+                    continue
+                # pandas carries the last weighted value through NaN closes,
+                # decaying its weight once per missing bar
+                trailing_nans = len(close) - len(np.trim_zeros(~np.isnan(close), "b"))
+                state.started = True
+                state.weighted = float(features[state.columns[0]].iloc[-1])
+                state.old_wt = (1.0 - state.alpha) ** trailing_nans
+            else:
+                state.update(close[-_lookback(state):])
+
+        if len(df):
+            self.last_timestamp = df.index[-1]
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path) -> "IncrementalFeatureEngine":
+        with open(path, "rb") as f:
+            return pickle.load(f)
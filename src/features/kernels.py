@@ -0,0 +1,299 @@
+"""
+Array kernels shared by the feature engines.
+
+Inputs are 2-D float64 arrays of shape (time, series). The NumPy kernels
+compute one statistic per call; `fused_pass` computes every rolling
+statistic a feature plan needs in a single Numba-compiled pass over each
+series and is only available when Numba is installed.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def shift(a: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full_like(a, np.nan)
+    out[periods:] = a[:-periods]
+    return out
+
+
+def _first_valid(a: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(a)
+    idx = valid.argmax(axis=0)
+    anchor = a[idx, np.arange(a.shape[1])]
+    anchor[~valid.any(axis=0)] = 0.0
+    return anchor
+
+
+def rolling_sums(a: np.ndarray, window: int, squares: bool = False):
+    """
+    Window sums (and optionally sums of squares) via cumulative sums.
+
+    Windows that are not full or contain a NaN are NaN, matching pandas'
+    default `min_periods=window`. For squares, values are centred on each
+    column's first valid value first, which keeps the cumulative sum small
+    and the variance free of cancellation error.
+    """
+    valid = ~np.isnan(a)
+    anchor = _first_valid(a) if squares else np.zeros(a.shape[1])
+    x = np.where(valid, a - anchor, 0.0)
+
+    def windowed(c):
+        c = np.cumsum(c, axis=0)
+        out = c.copy()
+        out[window:] -= c[:-window]
+        return out
+
+    n_valid = windowed(valid.astype(np.int64))
+    full = n_valid == window
+
+    s1 = np.where(full, windowed(x), np.nan)
+    if not squares:
+        return s1, None, anchor
+    s2 = np.where(full, windowed(x * x), np.nan)
+    return s1, s2, anchor
+
+
+def rolling_mean(a: np.ndarray, window: int) -> np.ndarray:
+    s1, _, _ = rolling_sums(a, window)
+    return s1 / window
+
+
+def rolling_mean_std(a: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    s1, s2, anchor = rolling_sums(a, window, squares=True)
+    mean = s1 / window + anchor
+    if window < 2:
+        return mean, np.full_like(a, np.nan)
+    var = (s2 - s1 * s1 / window) / (window - 1)
+    return mean, np.sqrt(np.maximum(var, 0.0))
+
+
+def ewm_mean(a: np.ndarray, span: int) -> np.ndarray:
+    """pandas `ewm(span=span, adjust=False).mean()` applied to every column."""
+    # pandas' Cython recursion already runs column by column over a 2-D frame
+    return pd.DataFrame(a).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def pct_change(a: np.ndarray) -> np.ndarray:
+    return a / shift(a) - 1
+
+
+def rsi(a: np.ndarray, window: int) -> np.ndarray:
+    delta = a - shift(a)
+    gain = np.clip(delta, 0, None)
+    loss = -np.clip(delta, None, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = rolling_mean(gain, window) / rolling_mean(loss, window)
+        return 100 - (100 / (1 + rs))
+
+
+def _fused_column(x, roll_w, roll_sq, alphas, rsi_w, vol_w,
+                  mean_out, std_out, ema_out, rsi_out, ret_out, vol_out):
+    n = x.shape[0]
+    nan = np.nan
+
+    anchor = 0.0
+    for t in range(n):
+        if x[t] == x[t]:
+            anchor = x[t]
+            break
+
+    n_roll = roll_w.shape[0]
+    s = np.zeros(n_roll)
+    s2 = np.zeros(n_roll)
+    nans = np.zeros(n_roll, np.int64)
+
+    n_rsi = rsi_w.shape[0]
+    gs = np.zeros(n_rsi)
+    ls = np.zeros(n_rsi)
+    rnans = np.zeros(n_rsi, np.int64)
+
+    n_vol = vol_w.shape[0]
+    vs = np.zeros(n_vol)
+    vs2 = np.zeros(n_vol)
+    vnans = np.zeros(n_vol, np.int64)
+
+    n_ema = alphas.shape[0]
+    weighted = np.empty(n_ema)
+    old_wt = np.ones(n_ema)
+
+    for t in range(n):
+        xt = x[t]
+        prev = x[t - 1] if t > 0 else nan
+        delta = xt - prev
+        r = xt / prev - 1.0
+        ret_out[t] = r
+
+        # Close windows: SMA and Bollinger share sum / sum of squares
+        for k in range(n_roll):
+            w = roll_w[k]
+            if xt == xt:
+                v = xt - anchor
+                s[k] += v
+                s2[k] += v * v
+            else:
+                nans[k] += 1
+            if t >= w:
+                old = x[t - w]
+                if old == old:
+                    v = old - anchor
+                    s[k] -= v
+                    s2[k] -= v * v
+                else:
+                    nans[k] -= 1
+            if (t + 1) % w == 0:
+                # Resync from the window so rounding error cannot drift
+                a = 0.0
+                b = 0.0
+                for i in range(t - w + 1, t + 1):
+                    if x[i] == x[i]:
+                        v = x[i] - anchor
+                        a += v
+                        b += v * v
+                s[k] = a
+                s2[k] = b
+            if t >= w - 1 and nans[k] == 0:
+                mean_out[t, k] = s[k] / w + anchor
+                if roll_sq[k] and w > 1:
+                    var = (s2[k] - s[k] * s[k] / w) / (w - 1)
+                    std_out[t, k] = np.sqrt(var) if var > 0 else 0.0
+                else:
+                    std_out[t, k] = nan
+            else:
+                mean_out[t, k] = nan
+                std_out[t, k] = nan
+
+        # RSI gain / loss windows over close-to-close deltas
+        for k in range(n_rsi):
+            w = rsi_w[k]
+            if delta == delta:
+                gs[k] += delta if delta > 0 else 0.0
+                ls[k] += -delta if delta < 0 else 0.0
+            else:
+                rnans[k] += 1
+            if t >= w:
+                old = x[t - w] - x[t - w - 1] if t - w >= 1 else nan
+                if old == old:
+                    gs[k] -= old if old > 0 else 0.0
+                    ls[k] -= -old if old < 0 else 0.0
+                else:
+                    rnans[k] -= 1
+            if (t + 1) % w == 0:
+                a = 0.0
+                b = 0.0
+                for i in range(t - w + 1, t + 1):
+                    d = x[i] - x[i - 1] if i >= 1 else nan
+                    if d == d:
+                        a += d if d > 0 else 0.0
+                        b += -d if d < 0 else 0.0
+                gs[k] = a
+                ls[k] = b
+            if t >= w - 1 and rnans[k] == 0:
+                rs = (gs[k] / w) / (ls[k] / w) if ls[k] != 0 else (np.inf if gs[k] > 0 else nan)
+                rsi_out[t, k] = 100.0 - 100.0 / (1.0 + rs)
+            else:
+                rsi_out[t, k] = nan
+
+        # Rolling volatility of simple returns
+        for k in range(n_vol):
+            w = vol_w[k]
+            if r == r:
+                vs[k] += r
+                vs2[k] += r * r
+            else:
+                vnans[k] += 1
+            if t >= w:
+                old = x[t - w] / x[t - w - 1] - 1.0 if t - w >= 1 else nan
+                if old == old:
+                    vs[k] -= old
+                    vs2[k] -= old * old
+                else:
+                    vnans[k] -= 1
+            if (t + 1) % w == 0:
+                a = 0.0
+                b = 0.0
+                for i in range(t - w + 1, t + 1):
+                    q = x[i] / x[i - 1] - 1.0 if i >= 1 else nan
+                    if q == q:
+                        a += q
+                        b += q * q
+                vs[k] = a
+                vs2[k] = b
+            if t >= w - 1 and vnans[k] == 0 and w > 1:
+                var = (vs2[k] - vs[k] * vs[k] / w) / (w - 1)
+                vol_out[t, k] = np.sqrt(var) if var > 0 else 0.0
+            else:
+                vol_out[t, k] = nan
+
+        # EMA with pandas' adjust=False recursion
+        for k in range(n_ema):
+            alpha = alphas[k]
+            if t == 0:
+                weighted[k] = xt
+            elif weighted[k] == weighted[k]:
+                old_wt[k] *= 1.0 - alpha
+                if xt == xt:
+                    if weighted[k] != xt:
+                        weighted[k] = (old_wt[k] * weighted[k] + alpha * xt) / (old_wt[k] + alpha)
+                    old_wt[k] = 1.0
+            elif xt == xt:
+                weighted[k] = xt
+            ema_out[t, k] = weighted[k]
+
+
+def _fused_panel(x, roll_w, roll_sq, alphas, rsi_w, vol_w,
+                 mean_out, std_out, ema_out, rsi_out, ret_out, vol_out):
+    for j in range(x.shape[0]):
+        _fused_column(x[j], roll_w, roll_sq, alphas, rsi_w, vol_w,
+                      mean_out[j], std_out[j], ema_out[j], rsi_out[j], ret_out[j], vol_out[j])
+
+
+if numba is not None:
+    _fused_column = numba.njit(cache=True, nogil=True)(_fused_column)
+    _fused_panel = numba.njit(cache=True, nogil=True)(_fused_panel)
+
+
+def fused_pass(close: np.ndarray, roll_w, roll_sq, ema_spans, rsi_w, vol_w):
+    """
+    Single pass over every series computing rolling means/stds for each
+    close window, EMAs, RSIs, simple returns and return volatilities.
+    Outputs are (time, series, k) arrays, except returns which is (time, series).
+    """
+    if numba is None:
+        raise RuntimeError("fused_pass requires numba")
+
+    x = np.ascontiguousarray(np.asarray(close, dtype=np.float64).T)
+    n_series, n = x.shape
+    roll_w = np.asarray(roll_w, dtype=np.int64)
+    roll_sq = np.asarray(roll_sq, dtype=np.bool_)
+    alphas = 2.0 / (np.asarray(ema_spans, dtype=np.float64) + 1.0)
+    rsi_w = np.asarray(rsi_w, dtype=np.int64)
+    vol_w = np.asarray(vol_w, dtype=np.int64)
+
+    mean_out = np.empty((n_series, n, len(roll_w)))
+    std_out = np.empty((n_series, n, len(roll_w)))
+    ema_out = np.empty((n_series, n, len(alphas)))
+    rsi_out = np.empty((n_series, n, len(rsi_w)))
+    ret_out = np.empty((n_series, n))
+    vol_out = np.empty((n_series, n, len(vol_w)))
+
+    _fused_panel(x, roll_w, roll_sq, alphas, rsi_w, vol_w,
+                 mean_out, std_out, ema_out, rsi_out, ret_out, vol_out)
+
+    def to_time_major(a):
+        return np.moveaxis(a, 0, 1)
+
+    return (
+        to_time_major(mean_out),
+        to_time_major(std_out),
+        to_time_major(ema_out),
+        to_time_major(rsi_out),
+        ret_out.T,
+        to_time_major(vol_out),
+    )
@@ -0,0 +1,72 @@
+"""
+Panel-wide indicator computation.
+
+Closes for the whole universe are packed into one (time, tickers) array so
+each indicator is computed for every ticker in a single vectorized pass,
+with the same semantics as the per-ticker functions in `indicators.py`.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .fused import FeaturePlan
+
+
+def compute_panel(close: np.ndarray, config: dict) -> Dict[str, np.ndarray]:
+    """Computes every configured indicator, keyed in `build_features` column order."""
+    return FeaturePlan.from_config(config).compute(close)
+
+
+def pack(closes: Dict[str, pd.Series]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Packs per-ticker close series into a (time, tickers) array, right-aligned
+    by row position so each column sees exactly its own history.
+    """
+    tickers = list(closes)
+    length = max((len(s) for s in closes.values()), default=0)
+    panel = np.full((length, len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        values = pd.to_numeric(closes[ticker], errors="coerce").to_numpy(dtype=float)
+        if len(values):
+            panel[length - len(values):, j] = values
+    return panel, tickers
+
+
+def unpack(features: Dict[str, np.ndarray], closes: Dict[str, pd.Series]) -> Dict[str, pd.DataFrame]:
+    """Splits packed panel features back into one frame per ticker."""
+    frames = {}
+    columns = list(features)
+    stacked = np.stack([features[c] for c in columns], axis=-1) if columns else None
+
+    for j, (ticker, close) in enumerate(closes.items()):
+        n = len(close)
+        values = stacked[len(stacked) - n:, j, :] if stacked is not None and n else np.empty((n, len(columns)))
+        frames[ticker] = pd.DataFrame(values, index=close.index, columns=columns)
+    return frames
+
+
+def build_panel_features(prices: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """
+    Computes features for a whole universe at once.
+
+    `prices` is either a wide frame of closes (dates x tickers) or a long
+    frame indexed by (date, ticker) with a `Close` column. The result is a
+    long frame indexed by (date, ticker). In a wide frame a missing close
+    means the ticker has no bar that day, so each column is packed from its
+    observed rows only and a date gap does not break its rolling windows.
+    """
+    if isinstance(prices.index, pd.MultiIndex):
+        closes = {
+            ticker: group["Close"].droplevel(1)
+            for ticker, group in prices.groupby(level=1, sort=False)
+        }
+        names = ["ticker", prices.index.names[0]]
+    else:
+        wide = prices.apply(pd.to_numeric, errors="coerce")
+        closes = {ticker: wide[ticker].dropna() for ticker in wide.columns}
+        names = ["ticker", wide.index.name or "Date"]
+
+    frames = unpack(compute_panel(pack(closes)[0], config), closes)
+    long = pd.concat(frames, names=names).swaplevel(0, 1)
+    return long.sort_index()
@@ -0,0 +1,221 @@
+"""
+Array-backed inference for the trained tree-ensemble pipelines.
+
+`compile_model` flattens every tree of a fitted forest (optionally behind a
+StandardScaler) into a handful of contiguous node arrays. The scaler is
+folded into the split thresholds, so prediction works on raw features and
+needs no sklearn dispatch at all. Results are bit-identical to sklearn's
+sequential (`n_jobs=1`) predictions for float64 inputs:
+
+* sklearn compares `float32((x - mean) / scale) <= threshold` (mean 0 and
+  scale 1 for a bare forest). That map is monotone in x, so each split is equivalent to `x <= T` for the largest
+  float64 T that still satisfies it; T is found by bisection over the
+  ordered bit patterns of float64.
+* Leaf outputs are summed tree by tree in estimator order and divided by the
+  number of trees, exactly as the forests accumulate them.
+
+The arrays are plain numpy, so a compiled model saved uncompressed can be
+memory-mapped and shared read-only between workers.
+"""
+from typing import Optional
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+_TREE_LEAF = -1
+_SIGN = np.int64(-0x8000000000000000)
+
+
+def _ordered(x: np.ndarray) -> np.ndarray:
+    """Maps float64 values to int64 keys with the same ordering."""
+    bits = x.view(np.int64)
+    return np.where(bits < 0, -(bits & ~_SIGN), bits)
+
+
+def _from_ordered(keys: np.ndarray) -> np.ndarray:
+    bits = np.where(keys < 0, (-keys) | _SIGN, keys)
+    return bits.view(np.float64)
+
+
+def fold_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Largest raw float64 T per split with `float32((T - mean) / scale) <= threshold`,
+    replicating StandardScaler's float64 arithmetic and the float32 cast
+    sklearn's trees apply to their input.
+    """
+    def passes(keys):
+        x = _from_ordered(keys)
+        with np.errstate(over="ignore", invalid="ignore"):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    # -inf always passes and +inf never does, so the boundary lies between
+    lo = np.full(len(threshold), _ordered(np.array([-np.inf]))[0])
+    hi = np.full(len(threshold), _ordered(np.array([np.inf]))[0])
+    for _ in range(64):
+        # Overflow-free midpoint of two int64 keys
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        ok = passes(mid)
+        lo = np.where(ok, mid, lo)
+        hi = np.where(ok, hi, mid)
+    return _from_ordered(lo)
+
+
+def _predict_rows(X, feature, threshold, left, right, missing_left, roots, leaf_out):
+    n_rows = X.shape[0]
+    out = np.zeros((n_rows, leaf_out.shape[1]))
+    for i in range(n_rows):
+        for t in range(roots.shape[0]):
+            node = roots[t]
+            while left[node] != node:
+                x = X[i, feature[node]]
+                if np.isnan(x):
+                    node = left[node] if missing_left[node] else right[node]
+                elif x <= threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            for k in range(leaf_out.shape[1]):
+                out[i, k] += leaf_out[node, k]
+    return out
+
+
+if numba is not None:
+    _predict_rows = numba.njit(cache=True, nogil=True)(_predict_rows)
+
+
+class CompiledForest:
+    """
+    Flattened forest. Node `i` splits on `feature[i]` at `threshold[i]`
+    (already in raw feature units); leaves point to themselves. `leaf_out`
+    holds each leaf's prediction, one column for regression or one per
+    class for classification.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, roots, leaf_out, max_depth,
+                 n_features, classes=None, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.roots = roots
+        self.leaf_out = leaf_out
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+        self.classes_ = classes
+        if feature_names is not None:
+            self.feature_names_in_ = feature_names
+        self.use_numba = numba is not None
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, n_trees) leaf index reached by each row in each tree."""
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _accumulate(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in_}.")
+
+        if self.use_numba and numba is not None:
+            total = _predict_rows(
+                np.ascontiguousarray(X), self.feature, self.threshold, self.left, self.right,
+                self.missing_left, self.roots, self.leaf_out,
+            )
+        else:
+            # cumsum adds strictly left to right, matching the forest's tree-by-tree `+=`
+            total = np.cumsum(self.leaf_out[self._leaves(X)], axis=1)[:, -1]
+        return total / self.n_trees
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.classes_ is None:
+            raise AttributeError("Regression models do not support predict_proba.")
+        return self._accumulate(X)
+
+    def predict(self, X) -> np.ndarray:
+        out = self._accumulate(X)
+        if self.classes_ is None:
+            return out[:, 0]
+        return self.classes_.take(np.argmax(out, axis=1), axis=0)
+
+
+def compile_model(model, use_numba: Optional[bool] = None) -> CompiledForest:
+    """
+    Compiles a fitted forest, or a Pipeline of an optional StandardScaler
+    followed by a forest, into a CompiledForest.
+    """
+    steps = [step for _, step in model.steps] if hasattr(model, "steps") else [model]
+    *transforms, estimator = steps
+    feature_names = getattr(model, "feature_names_in_", None)
+
+    mean = scale = None
+    if transforms:
+        if len(transforms) > 1 or type(transforms[0]).__name__ != "StandardScaler":
+            raise ValueError("Only a single StandardScaler may precede the forest.")
+        scaler = transforms[0]
+        mean = scaler.mean_ if scaler.with_mean else None
+        scale = scaler.scale_ if scaler.with_std else None
+
+    trees = [e.tree_ for e in getattr(estimator, "estimators_", [estimator])]
+    if any(t.n_outputs != 1 for t in trees):
+        raise ValueError("Multi-output forests are not supported.")
+    classes = getattr(estimator, "classes_", None)
+    n_features = estimator.n_features_in_
+
+    offsets = np.cumsum([0] + [t.node_count for t in trees])
+    feature, threshold, left, right, missing_left, leaf_out = [], [], [], [], [], []
+    for offset, tree in zip(offsets, trees):
+        is_leaf = tree.children_left == _TREE_LEAF
+        own = np.arange(tree.node_count) + offset
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left.append(np.where(is_leaf, own, tree.children_left + offset))
+        right.append(np.where(is_leaf, own, tree.children_right + offset))
+        missing_left.append(tree.missing_go_to_left.astype(bool))
+        value = tree.value[:, 0, :]
+        leaf_out.append(value[:, : len(classes)] if classes is not None else value[:, :1])
+
+    feature = np.concatenate(feature).astype(np.intp)
+    threshold = np.concatenate(threshold).astype(np.float64)
+    left = np.concatenate(left).astype(np.intp)
+
+    # Folded even without a scaler: the trees still cast x to float32 before comparing
+    internal = left != np.arange(len(left))
+    f = feature[internal]
+    threshold[internal] = fold_thresholds(
+        threshold[internal],
+        mean[f] if mean is not None else 0.0,
+        scale[f] if scale is not None else 1.0,
+    )
+
+    compiled = CompiledForest(
+        feature=feature,
+        threshold=threshold,
+        left=left,
+        right=np.concatenate(right).astype(np.intp),
+        missing_left=np.concatenate(missing_left),
+        roots=offsets[:-1].astype(np.intp),
+        leaf_out=np.ascontiguousarray(np.concatenate(leaf_out), dtype=np.float64),
+        max_depth=max(t.max_depth for t in trees),
+        n_features=n_features,
+        classes=classes,
+        feature_names=feature_names,
+    )
+    if use_numba is not None:
+        compiled.use_numba = use_numba
+    return compiled
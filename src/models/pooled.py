@@ -0,0 +1,149 @@
+"""
+Cross-ticker pooled models.
+
+Every ticker's dataset is stacked into one (date, ticker) panel and a single
+model is trained on it, instead of one small model per ticker. Rows are
+written straight into a preallocated float32 design matrix in date order,
+so an unshuffled split is a time split (pooled training always splits
+unshuffled, whatever `shuffle` says in the model config) and the forest
+(which works in float32) does not copy its input again.
+
+Tickers and sectors are appended as integer code columns; trees split on
+them directly, which keeps the matrix narrow where one-hot columns would
+grow with the universe. The encoding is stored in the model's registry
+record so serving rebuilds exactly the same columns.
+"""
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .predictor import ModelPredictor
+from .registry import ModelRegistry
+from .serving import ModelCache
+
+# Registry name of the pooled model
+POOLED_NAME = "__pooled__"
+
+
+@dataclass
+class PanelEncoder:
+    tickers: List[str]
+    sectors: Dict[str, str] = field(default_factory=dict)  # ticker -> sector
+    encode_ticker: bool = True
+    encode_sector: bool = True
+
+    def __post_init__(self):
+        self._ticker_codes = {t: i for i, t in enumerate(self.tickers)}
+        self._sector_codes = {s: i for i, s in enumerate(sorted(set(self.sectors.values())))}
+
+    @property
+    def columns(self) -> List[str]:
+        return (["ticker_code"] if self.encode_ticker else []) + (["sector_code"] if self.encode_sector else [])
+
+    def codes(self, tickers: Sequence[str]) -> np.ndarray:
+        """(len(tickers), len(columns)) float32 codes; unknown tickers and sectors get -1."""
+        codes = []
+        if self.encode_ticker:
+            codes.append([self._ticker_codes.get(t, -1) for t in tickers])
+        if self.encode_sector:
+            codes.append([self._sector_codes.get(self.sectors.get(t), -1) for t in tickers])
+        return np.array(codes, dtype=np.float32).T.reshape(len(tickers), len(codes))
+
+    def to_meta(self) -> dict:
+        return {
+            "tickers": self.tickers,
+            "sectors": self.sectors,
+            "encode_ticker": self.encode_ticker,
+            "encode_sector": self.encode_sector,
+        }
+
+    @classmethod
+    def from_meta(cls, meta: dict) -> "PanelEncoder":
+        # The registry meta also holds other keys, e.g. the config hash
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in meta.items() if k in names})
+
+
+@dataclass
+class PanelDataset:
+    X: np.ndarray  # float32 (rows, features + codes)
+    y: np.ndarray
+    index: pd.MultiIndex  # (date, ticker), date-major
+    columns: List[str]
+    encoder: PanelEncoder
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.X, index=self.index, columns=self.columns).assign(target=self.y)
+
+
+def stack_panel(frames: Mapping[str, pd.DataFrame], encoder: Optional[PanelEncoder] = None,
+                dtype=np.float32) -> PanelDataset:
+    """Stacks per-ticker datasets (features + `target`) into one date-ordered panel."""
+    if not frames:
+        raise ValueError("No datasets to stack.")
+    tickers = list(frames)
+    encoder = encoder or PanelEncoder(tickers)
+
+    features = [c for c in next(iter(frames.values())).columns if c != "target"]
+    for ticker, df in frames.items():
+        missing = set(features) - set(df.columns)
+        if missing:
+            raise ValueError(f"Dataset for {ticker} is missing features: {sorted(missing)}")
+
+    lengths = [len(df) for df in frames.values()]
+    dates = np.concatenate([df.index.to_numpy() for df in frames.values()])
+    owners = np.repeat(np.arange(len(tickers)), lengths)
+
+    # Each ticker's rows are scattered straight to their date-ordered position
+    order = np.argsort(dates, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    n_features = len(features)
+    X = np.empty((len(dates), n_features + len(encoder.columns)), dtype=dtype)
+    y = np.empty(len(dates), dtype=next(iter(frames.values()))["target"].dtype)
+    start = 0
+    for ticker, df, n in zip(tickers, frames.values(), lengths):
+        rows = rank[start:start + n]
+        X[rows, :n_features] = df[features].to_numpy(dtype=dtype)
+        X[rows, n_features:] = encoder.codes([ticker])
+        y[rows] = df["target"].to_numpy()
+        start += n
+
+    index = pd.MultiIndex.from_arrays(
+        [dates[order], np.asarray(tickers, dtype=object)[owners[order]]], names=["date", "ticker"]
+    )
+    return PanelDataset(X=X, y=y, index=index, columns=features + encoder.columns, encoder=encoder)
+
+
+class PooledPredictor:
+    """Scores many tickers with the pooled model in one batched call."""
+
+    def __init__(self, model_dir: str = "models", cache: Optional[ModelCache] = None,
+                 n_jobs: Optional[int] = None):
+        record = ModelRegistry(model_dir).latest(POOLED_NAME)
+        if not record.meta:
+            raise ValueError(f"{record.path} has no panel encoding; was it saved by pooled training?")
+        self.encoder = PanelEncoder.from_meta(record.meta)
+        self.features = record.features[:len(record.features) - len(self.encoder.columns)]
+        self.predictor = ModelPredictor(model_dir, model_path=str(record.path), cache=cache, n_jobs=n_jobs)
+
+    def _design(self, features: pd.DataFrame, tickers: Sequence[str]) -> np.ndarray:
+        n_features = len(self.features)
+        X = np.empty((len(features), n_features + len(self.encoder.columns)), dtype=np.float32)
+        X[:, :n_features] = features[self.features].to_numpy(dtype=np.float32)
+        X[:, n_features:] = self.encoder.codes(tickers)
+        return X
+
+    def predict_cross_section(self, features: pd.DataFrame) -> pd.Series:
+        """`features` holds one row per ticker (indexed by ticker) for a single timestamp."""
+        preds = self.predictor.predict(self._design(features, features.index))
+        return pd.Series(preds, index=features.index, name="pred")
+
+    def predict_panel(self, features: pd.DataFrame) -> pd.Series:
+        """`features` is indexed by (date, ticker), e.g. a whole backtest universe."""
+        tickers = features.index.get_level_values("ticker")
+        preds = self.predictor.predict(self._design(features, tickers))
+        return pd.Series(preds, index=features.index, name="pred")
@@ -1,25 +1,76 @@
-from typing import Union
+from typing import Optional, Union
+
+import numpy as np
 import pandas as pd
 
+from src.utils.latency import LatencyRecorder
+from src.utils.profiling import stage
 from .registry import ModelRegistry
+from .serving import MODEL_CACHE, MicroBatcher, ModelCache, prepare_for_serving
 
 
 class ModelPredictor:
-    def __init__(self, model_dir: str = "models", model_path: str | None = None):
+    """
+    Predicts with a registry model kept warm in a shared LRU cache: an
+    explicit `model_path`, else the newest model for `ticker`, else the
+    newest model overall.
+
+    `n_jobs=1` (the default) tunes the model for single-row latency;
+    pass `None` to keep the trained parallelism for large batch scoring.
+    """
+
+    def __init__(
+        self,
+        model_dir: str = "models",
+        model_path: str | None = None,
+        cache: Optional[ModelCache] = None,
+        n_jobs: Optional[int] = 1,
+        ticker: str | None = None,
+    ):
         self.registry = ModelRegistry(model_dir)
-        if model_path is not None:
-            self.model = self.registry.load_model(path=model_path)
-        else:
-            self.model = self.registry.load_model(latest=True)
+        path = self.registry.resolve(model_path, latest=model_path is None, ticker=ticker)
+        self.version = self.registry.version(path)
+
+        cache = cache if cache is not None else MODEL_CACHE
+        self.model, names = cache.get(
+            (self.version, n_jobs),
+            lambda: prepare_for_serving(self.registry.load_model(path=path), n_jobs),
+            nbytes=path.stat().st_size,
+        )
+        self.feature_names = pd.Index(names) if names is not None else None
+        self.latency = LatencyRecorder()
 
-    def predict(self, X: Union[pd.DataFrame, pd.Series]):
+    def _to_array(self, X: Union[pd.DataFrame, pd.Series, np.ndarray]) -> np.ndarray:
         if isinstance(X, pd.Series):
-            X = X.to_frame().T
-        return self.model.predict(X)
+            if self.feature_names is not None and not X.index.equals(self.feature_names):
+                X = X.loc[self.feature_names]
+            return X.to_numpy(dtype=float).reshape(1, -1)
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None and not X.columns.equals(self.feature_names):
+                X = X[self.feature_names]
+            return X.to_numpy(dtype=float)
+        X = np.asarray(X)
+        if X.dtype != np.float32:
+            X = X.astype(float, copy=False)
+        return X.reshape(1, -1) if X.ndim == 1 else X
 
-    def predict_proba(self, X: Union[pd.DataFrame, pd.Series]):
+    def predict(self, X: Union[pd.DataFrame, pd.Series, np.ndarray]):
+        """
+        Arrays must already be in training column order; frames are reordered
+        by name. float32 arrays are passed through as is, which is what the
+        forest works in anyway.
+        """
+        with self.latency.time(), stage("ModelPredictor.predict") as s:
+            X = self._to_array(X)
+            s.count(X)
+            return self.model.predict(X)
+
+    def predict_proba(self, X: Union[pd.DataFrame, pd.Series, np.ndarray]):
         if not hasattr(self.model, "predict_proba"):
             raise AttributeError("Underlying model does not support predict_proba.")
-        if isinstance(X, pd.Series):
-            X = X.to_frame().T
-        return self.model.predict_proba(X)
\ No newline at end of file
+        with self.latency.time():
+            return self.model.predict_proba(self._to_array(X))
+
+    def batcher(self, max_batch: int = 64, max_wait_ms: float = 0.5) -> MicroBatcher:
+        """Micro-batches concurrent single-row `predict` calls; close it when done."""
+        return MicroBatcher(self.predict, max_batch=max_batch, max_wait_ms=max_wait_ms)
@@ -1,38 +1,273 @@
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
-import joblib
+from typing import Any, Dict, List, Optional
 import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+import joblib
+
+from .compiled import compile_model
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticker TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    metrics TEXT,
+    features TEXT,
+    size INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    format TEXT NOT NULL DEFAULT 'pickle',
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS models_ticker_latest ON models (ticker, id);
+"""
+
+# joblib.dump / joblib.load options per artifact format. "mmap" artifacts are
+# stored uncompressed so numpy arrays inside them can be memory-mapped
+# read-only and shared through the page cache by every worker loading them.
+# "compiled" stores the array-backed CompiledForest the same way.
+ARTIFACT_FORMATS = {
+    "pickle": ({}, {}),
+    "mmap": ({"compress": 0}, {"mmap_mode": "r"}),
+    "compressed": ({"compress": ("zlib", 3)}, {}),
+    "compiled": ({"compress": 0}, {"mmap_mode": "r"}),
+}
+
+# `<ticker>_<YYYYmmdd_HHMMSS>.pkl`, as written by save_model
+_VERSIONED_NAME = re.compile(r"^(?P<ticker>.+)_(?P<ts>\d{8}_\d{6})$")
+
+
+@dataclass
+class ModelRecord:
+    id: int
+    ticker: str
+    path: Path
+    created_at: str
+    metrics: Optional[Dict[str, float]]
+    features: Optional[List[str]]
+    size: int
+    checksum: str
+    format: str = "pickle"
+    meta: Optional[Dict[str, Any]] = None
+
+
+def _checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 class ModelRegistry:
-    def __init__(self, model_dir: str = "models"):
+    """
+    Model artifacts plus a SQLite index (`registry.db`) of ticker, creation
+    time, metrics, feature schema, size and checksum for each one.
+
+    Lookups go through the index, so finding the latest model for a ticker
+    is a single indexed query however many versions are on disk. Publishing
+    writes the artifact to a temporary file, renames it into place and only
+    then inserts its row, so a reader never sees a half-written model.
+    """
+
+    INDEX_NAME = "registry.db"
+
+    def __init__(self, model_dir: str = "models", artifact_format: str = "pickle"):
+        if artifact_format not in ARTIFACT_FORMATS:
+            raise ValueError(f"Unknown artifact format: {artifact_format}")
+        self.artifact_format = artifact_format
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.model_dir / self.INDEX_NAME
+
+        created = not self.index_path.exists()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(models)")}
+            if "format" not in columns:
+                conn.execute("ALTER TABLE models ADD COLUMN format TEXT NOT NULL DEFAULT 'pickle'")
+            if "meta" not in columns:
+                conn.execute("ALTER TABLE models ADD COLUMN meta TEXT")
+        if created:
+            # Adopt artifacts saved before the registry had an index
+            self.reindex()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
 
     def _timestamp(self) -> str:
         return datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
 
-    def save_model(self, model: Any, name: str, with_timestamp: bool = True) -> Path:
+    def _relative(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            return str(path.resolve().relative_to(self.model_dir.resolve()))
+        except ValueError:
+            return str(path.resolve())
+
+    def _record(self, row) -> ModelRecord:
+        id_, ticker, path, created_at, metrics, features, size, checksum, fmt, meta = row
+        return ModelRecord(
+            id=id_,
+            ticker=ticker,
+            path=self.model_dir / path,
+            created_at=created_at,
+            metrics=json.loads(metrics) if metrics else None,
+            features=json.loads(features) if features else None,
+            size=size,
+            checksum=checksum,
+            format=fmt,
+            meta=json.loads(meta) if meta else None,
+        )
+
+    def _insert(self, conn, ticker: str, path: Path, created_at: str,
+                metrics=None, features=None, fmt: str = "pickle", meta=None):
+        rel = self._relative(path)
+        # Re-publishing the same file name replaces its row and makes it the newest
+        conn.execute("DELETE FROM models WHERE path = ?", (rel,))
+        conn.execute(
+            "INSERT INTO models (ticker, path, created_at, metrics, features, size, checksum, format, meta)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                ticker,
+                rel,
+                created_at,
+                json.dumps(metrics) if metrics is not None else None,
+                json.dumps(list(features)) if features is not None else None,
+                path.stat().st_size,
+                _checksum(path),
+                fmt,
+                json.dumps(meta) if meta is not None else None,
+            ),
+        )
+
+    def save_model(
+        self,
+        model: Any,
+        name: str,
+        with_timestamp: bool = True,
+        metrics: Optional[Dict[str, float]] = None,
+        features: Optional[List[str]] = None,
+        artifact_format: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """`meta` is free-form JSON kept with the record (e.g. a pooled model's ticker encoding)."""
+        fmt = artifact_format or self.artifact_format
+        if fmt not in ARTIFACT_FORMATS:
+            raise ValueError(f"Unknown artifact format: {fmt}")
+
+        stem = Path(name).stem
+        timestamp = self._timestamp()
         if with_timestamp:
-            stem = Path(name).stem
             suffix = Path(name).suffix or ".pkl"
-            filename = f"{stem}_{self._timestamp()}{suffix}"
+            filename = f"{stem}_{timestamp}{suffix}"
         else:
             filename = name
 
+        if features is None and hasattr(model, "feature_names_in_"):
+            features = [str(c) for c in model.feature_names_in_]
+        if fmt == "compiled":
+            model = compile_model(model)
+
         path = self.model_dir / filename
-        joblib.dump(model, path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        joblib.dump(model, tmp_path, **ARTIFACT_FORMATS[fmt][0])
+        os.replace(tmp_path, path)
+
+        with self._connect() as conn:
+            self._insert(conn, stem, path, timestamp, metrics, features, fmt, meta)
         return path
 
-    def load_model(self, path: Optional[str] = None, latest: bool = False) -> Any:
-        if latest:
-            candidates = sorted(self.model_dir.glob("*.pkl"))
-            if not candidates:
-                raise FileNotFoundError("No models found in registry.")
-            path = candidates[-1]
-        elif path is not None:
-            path = Path(path)
-        else:
-            raise ValueError("Either `path` must be provided or `latest=True`.")
+    def latest(self, ticker: Optional[str] = None) -> ModelRecord:
+        """Newest published model for `ticker`, or overall when `ticker` is None."""
+        with self._connect() as conn:
+            if ticker is None:
+                row = conn.execute("SELECT * FROM models ORDER BY id DESC LIMIT 1").fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM models WHERE ticker = ? ORDER BY id DESC LIMIT 1", (ticker,)
+                ).fetchone()
+        if row is None:
+            target = f" for {ticker}" if ticker is not None else ""
+            raise FileNotFoundError(f"No models found in registry{target}.")
+        return self._record(row)
+
+    def find(self, path) -> Optional[ModelRecord]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM models WHERE path = ?", (self._relative(path),)).fetchone()
+        return self._record(row) if row is not None else None
+
+    def records(self, ticker: Optional[str] = None) -> List[ModelRecord]:
+        with self._connect() as conn:
+            if ticker is None:
+                rows = conn.execute("SELECT * FROM models ORDER BY id").fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM models WHERE ticker = ? ORDER BY id", (ticker,)).fetchall()
+        return [self._record(row) for row in rows]
+
+    def reindex(self) -> int:
+        """
+        Indexes artifacts present on disk but missing from the index (oldest
+        first by file name timestamp) and drops rows whose file is gone.
+        Returns the number of artifacts added.
+        """
+        with self._connect() as conn:
+            known = {row[0] for row in conn.execute("SELECT path FROM models")}
+            for rel in known:
+                if not (self.model_dir / rel).exists():
+                    conn.execute("DELETE FROM models WHERE path = ?", (rel,))
+
+            found = []
+            for path in self.model_dir.glob("*.pkl"):
+                if self._relative(path) in known:
+                    continue
+                match = _VERSIONED_NAME.match(path.stem)
+                if match:
+                    found.append((match["ts"], match["ticker"], path))
+                else:
+                    mtime = datetime.datetime.fromtimestamp(path.stat().st_mtime, datetime.timezone.utc)
+                    found.append((mtime.strftime("%Y%m%d_%H%M%S"), path.stem, path))
+
+            for created_at, ticker, path in sorted(found):
+                self._insert(conn, ticker, path, created_at)
+        return len(found)
+
+    def resolve(self, path: Optional[str] = None, latest: bool = False,
+                ticker: Optional[str] = None) -> Path:
+        # An explicit path wins over the latest lookups
+        if path is not None:
+            return Path(path)
+        if latest or ticker is not None:
+            return self.latest(ticker).path
+        raise ValueError("Either `path`, `ticker` or `latest=True` must be provided.")
+
+    def version(self, path) -> str:
+        """Identifies one saved artifact: its checksum when indexed, else its file stat."""
+        record = self.find(path)
+        if record is not None:
+            return record.checksum
+        stat = Path(path).stat()
+        return f"{Path(path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
 
-        return joblib.load(path)
\ No newline at end of file
+    def load_model(self, path: Optional[str] = None, latest: bool = False,
+                   ticker: Optional[str] = None) -> Any:
+        path = self.resolve(path, latest, ticker)
+        record = self.find(path)
+        # Unindexed files load as plain pickles; joblib detects compression itself
+        fmt = record.format if record is not None else "pickle"
+        return joblib.load(path, **ARTIFACT_FORMATS[fmt][1])
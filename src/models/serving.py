@@ -0,0 +1,174 @@
+"""
+Serving helpers for low-latency inference.
+
+Loaded models are kept warm in an LRU cache keyed by registry version, so
+constructing a predictor is a dictionary lookup once a model has been seen.
+Models are prepared for serving on load: forests predict on a single
+thread (thread dispatch dominates single-row latency) and feature names are
+stripped, because the predictor orders columns itself and then hands plain
+arrays to the model.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class ModelCache:
+    """LRU cache of loaded models, bounded by entry count and/or total artifact bytes."""
+
+    def __init__(self, max_models: Optional[int] = 8, max_bytes: Optional[int] = None):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key: Hashable, loader: Callable[[], Any], nbytes: int = 0) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._entries[key][0]
+            self.stats["misses"] += 1
+
+        # Loading happens outside the lock so a slow load does not stall hits
+        value = loader()
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][0]
+            self._entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            self._evict()
+        return value
+
+    def _evict(self):
+        # The newest entry always stays, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (
+            (self.max_models is not None and len(self._entries) > self.max_models)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.total_bytes -= nbytes
+            self.stats["evicted"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+# Shared by every predictor in the process
+MODEL_CACHE = ModelCache()
+
+
+def _estimators(model):
+    return [step for _, step in model.steps] if hasattr(model, "steps") else [model]
+
+
+def prepare_for_serving(model, n_jobs: Optional[int] = 1):
+    """
+    Returns `(model, feature_names)`. Feature names are removed from every
+    step so array inputs skip sklearn's name validation (and its warning);
+    `n_jobs=None` keeps the parallelism the model was trained with.
+    """
+    feature_names = getattr(model, "feature_names_in_", None)
+    for step in _estimators(model):
+        if "feature_names_in_" in vars(step):
+            del step.feature_names_in_
+        if n_jobs is not None and hasattr(step, "n_jobs"):
+            step.n_jobs = n_jobs
+    return model, feature_names
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row requests into one `predict_fn` call.
+
+    A background thread takes the first queued row, then keeps collecting
+    for at most `max_wait_ms` or until `max_batch` rows are waiting. Callers
+    get a Future per row, so many request threads share one model call.
+    """
+
+    _STOP = object()
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch: int = 64, max_wait_ms: float = 0.5):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, row) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed.")
+        future: Future = Future()
+        self._queue.put((np.asarray(row, dtype=float).ravel(), future))
+        return future
+
+    def predict(self, row, timeout: Optional[float] = None):
+        return self.submit(row).result(timeout)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is self._STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _loop(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+            if not batch:
+                continue
+            self.batches += 1
+            futures = [f for _, f in batch]
+            try:
+                out = self.predict_fn(np.vstack([row for row, _ in batch]))
+            except Exception as e:
+                for f in futures:
+                    f.set_exception(e)
+                continue
+            for f, y in zip(futures, out):
+                f.set_result(y)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Tuple, Dict, Any
 
 import numpy as np
@@ -6,9 +6,15 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
 from sklearn.metrics import accuracy_score, f1_score, mean_squared_error, r2_score
-import yaml
+from src.utils.config_loader import ModelConfig, load_typed, plain
+from src.utils.profiling import stage
 
 
 @dataclass
@@ -18,38 +24,52 @@ class TrainConfig:
     test_size: float
     shuffle: bool
     random_state: int
+    n_jobs: int = -1
+    n_estimators: int = 200
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+# (model type, task) -> estimator class
+ESTIMATORS = {
+    ("RandomForest", "classification"): RandomForestClassifier,
+    ("RandomForest", "regression"): RandomForestRegressor,
+    ("ExtraTrees", "classification"): ExtraTreesClassifier,
+    ("ExtraTrees", "regression"): ExtraTreesRegressor,
+}
 
 
 class ModelTrainer:
-    def __init__(self, config_path: str = "config/model.yaml"):
-        with open(config_path, "r") as f:
-            cfg = yaml.safe_load(f)
+    def __init__(self, config_path: str = "config/model.yaml", n_jobs: int | None = None):
+        self.settings = load_typed(config_path, ModelConfig)
+        cfg = self.settings
 
         self.config = TrainConfig(
-            model_type=cfg.get("model", "RandomForest"),
-            task_type=cfg.get("task", "classification"),  # "classification" or "regression"
-            test_size=cfg.get("test_size", 0.2),
-            shuffle=cfg.get("shuffle", True),
-            random_state=cfg.get("random_state", 42),
+            model_type=cfg.model,
+            task_type=cfg.task,  # "classification" or "regression"
+            test_size=cfg.test_size,
+            shuffle=cfg.shuffle,
+            random_state=cfg.random_state,
+            n_jobs=n_jobs if n_jobs is not None else cfg.n_jobs,
+            n_estimators=cfg.n_estimators,
+            params=plain(cfg.params),  # estimators reject read-only views
         )
 
-    def _build_model(self):
-        if self.config.model_type == "RandomForest":
-            if self.config.task_type == "classification":
-                base_model = RandomForestClassifier(
-                    n_estimators=200,
-                    random_state=self.config.random_state,
-                    n_jobs=-1,
-                )
-            else:
-                base_model = RandomForestRegressor(
-                    n_estimators=200,
-                    random_state=self.config.random_state,
-                    n_jobs=-1,
-                )
-        else:
+    def _build_model(self, params: Dict[str, Any] | None = None):
+        """`params` override the estimator arguments from the config (e.g. tuned values)."""
+        task = "classification" if self.config.task_type == "classification" else "regression"
+        estimator = ESTIMATORS.get((self.config.model_type, task))
+        if estimator is None:
             raise ValueError(f"Unsupported model type: {self.config.model_type}")
 
+        kwargs = {
+            "n_estimators": self.config.n_estimators,
+            "random_state": self.config.random_state,
+            "n_jobs": self.config.n_jobs,
+            **self.config.params,
+            **(params or {}),
+        }
+        base_model = estimator(**kwargs)
+
         pipeline = Pipeline(
             steps=[
                 ("scaler", StandardScaler()),
@@ -58,20 +78,27 @@ class ModelTrainer:
         )
         return pipeline
 
-    def train(self, X: pd.DataFrame, y: pd.Series) -> Tuple[Any, Dict[str, float]]:
+    def train(self, X: pd.DataFrame, y: pd.Series,
+              params: Dict[str, Any] | None = None,
+              shuffle: bool | None = None) -> Tuple[Any, Dict[str, float]]:
+        """`shuffle` overrides the configured split, e.g. False to force a time split."""
         X_train, X_test, y_train, y_test = train_test_split(
             X,
             y,
             test_size=self.config.test_size,
-            shuffle=self.config.shuffle,
+            shuffle=self.config.shuffle if shuffle is None else shuffle,
             random_state=self.config.random_state,
         )
 
-        model = self._build_model()
-        model.fit(X_train, y_train)
+        model = self._build_model(params)
+        with stage("ModelTrainer.train") as s:
+            s.count(X_train)
+            model.fit(X_train, y_train)
 
         y_pred = model.predict(X_test)
+        return model, self.evaluate(y_test, y_pred)
 
+    def evaluate(self, y_test, y_pred) -> Dict[str, float]:
         if self.config.task_type == "classification":
             metrics = {
                 "accuracy": float(accuracy_score(y_test, y_pred)),
@@ -84,5 +111,4 @@ class ModelTrainer:
                 "rmse": float(np.sqrt(mse)),
                 "r2": float(r2_score(y_test, y_pred)),
             }
-
-        return model, metrics
\ No newline at end of file
+        return metrics
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""
+Hyperparameter search: random search or successive halving.
+
+The dataset is read once and copied into shared memory; trial workers
+attach to it by name instead of re-reading or unpickling it. Each worker
+caps its estimator's `n_jobs` and native thread pools (BLAS/OpenMP) to its
+share of the cores, so `max_workers` trials never oversubscribe the
+machine.
+
+With successive halving the resource is the number of trees: every trial
+is scored at `min_resource` trees, only the best 1/eta go on to the next
+rung with eta times more trees, and the rest are pruned, up to
+`max_resource`. Scores are time-series cross-validated.
+"""
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import mlflow
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+from threadpoolctl import threadpool_limits
+
+from src.data.storage import FrameStore, DEFAULT_FORMAT
+from src.utils.config_loader import load_config
+from .trainer import ModelTrainer
+
+# Error metrics are minimised, everything else is maximised
+_LOWER_IS_BETTER = {"mse", "rmse"}
+
+
+@dataclass
+class SearchConfig:
+    method: str = "halving"  # "halving" or "random"
+    n_trials: int = 27
+    min_resource: int = 25  # trees per trial in the first halving rung
+    max_resource: int = 200  # trees in the last rung, and for every random-search trial
+    eta: int = 3
+    cv_folds: int = 3
+    gap: int = 0  # bars between each CV train and test window
+    metric: Optional[str] = None  # defaults to r2 (regression) or f1 (classification)
+    max_workers: Optional[int] = None
+    random_state: int = 42
+    log_mlflow: bool = True
+
+    @classmethod
+    def from_dict(cls, cfg: Optional[dict]) -> "SearchConfig":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (cfg or {}).items() if k in names})
+
+    def budgets(self) -> List[int]:
+        if self.method == "random":
+            return [self.max_resource]
+        if self.method != "halving":
+            raise ValueError(f"Unknown search method: {self.method}")
+        budgets = []
+        resource = self.min_resource
+        while resource < self.max_resource:
+            budgets.append(resource)
+            resource *= self.eta
+        return budgets + [self.max_resource]
+
+
+def sample_params(space: Dict[str, dict], rng: np.random.Generator) -> Dict[str, Any]:
+    """Draws one value per parameter; specs are `choice`, `int` or `float` (optionally `log`)."""
+    params = {}
+    for name, spec in space.items():
+        kind = spec.get("type", "choice")
+        if kind == "choice":
+            values = spec["values"]
+            params[name] = values[int(rng.integers(len(values)))]
+        elif kind in ("int", "float"):
+            low, high = spec["low"], spec["high"]
+            if spec.get("log", False):
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            else:
+                value = rng.uniform(low, high)
+            params[name] = int(round(value)) if kind == "int" else float(value)
+        else:
+            raise ValueError(f"Unknown parameter type for {name}: {kind}")
+    return params
+
+
+class SharedArrays:
+    """Named numpy arrays copied once into shared memory; workers attach via `spec`."""
+
+    def __init__(self, **arrays: np.ndarray):
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.spec: Dict[str, Tuple[str, tuple, str]] = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self.blocks[name] = block
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Per-worker state set up by _init_worker
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(spec: Dict[str, Tuple[str, tuple, str]], n_jobs: int):
+    blocks = {name: shared_memory.SharedMemory(name=block) for name, (block, _, _) in spec.items()}
+    _WORKER["blocks"] = blocks
+    _WORKER["arrays"] = {
+        name: np.ndarray(shape, np.dtype(dtype), buffer=blocks[name].buf)
+        for name, (_, shape, dtype) in spec.items()
+    }
+    _WORKER["n_jobs"] = n_jobs
+    _WORKER["limits"] = threadpool_limits(limits=n_jobs)
+
+
+def _evaluate(trainer: ModelTrainer, params: Dict[str, Any], resource: int,
+              splits: List[Tuple[slice, slice]], metric: str):
+    started = time.perf_counter()
+    X, y = _WORKER["arrays"]["X"], _WORKER["arrays"]["y"]
+    params = {**params, "n_estimators": resource, "n_jobs": _WORKER["n_jobs"]}
+
+    values = []
+    for train, test in splits:
+        model = trainer._build_model(params)
+        model.fit(X[train], y[train])
+        values.append(trainer.evaluate(y[test], model.predict(X[test]))[metric])
+    return float(np.mean(values)), time.perf_counter() - started
+
+
+@dataclass
+class Trial:
+    id: int
+    params: Dict[str, Any]
+    scores: Dict[int, float] = field(default_factory=dict)  # resource -> mean CV metric
+    pruned_at: Optional[int] = None
+    seconds: float = 0.0
+
+
+@dataclass
+class TuningResult:
+    trials: List[Trial]
+    metric: str
+    best: Trial
+    best_params: Dict[str, Any]
+    seconds: float
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = []
+        for t in self.trials:
+            row = {"trial": t.id, **t.params, "pruned_at": t.pruned_at, "seconds": t.seconds}
+            row.update({f"{self.metric}@{r}": v for r, v in t.scores.items()})
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("trial")
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "metric": self.metric,
+                "best_score": self.best.scores[max(self.best.scores)],
+                "best_params": self.best_params,
+                "trials": [asdict(t) for t in self.trials],
+            }, f, indent=2, default=str)
+        return path
+
+    def summary(self) -> str:
+        pruned = sum(t.pruned_at is not None for t in self.trials)
+        score = self.best.scores[max(self.best.scores)]
+        return (
+            f"{len(self.trials)} trials ({pruned} pruned) in {self.seconds:.1f}s; "
+            f"best {self.metric}={score:.4f} with {self.best_params}"
+        )
+
+
+def load_best_params(path) -> Optional[Dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)["best_params"]
+
+
+class HyperparameterTuner:
+    def __init__(
+        self,
+        config_path: str = "config/tuning.yaml",
+        model_config: str = "config/model.yaml",
+        dataset_dir: str = "data/datasets",
+        output_dir: str = "models/tuning",
+        storage_format: str = DEFAULT_FORMAT,
+    ):
+        cfg = load_config(config_path)
+        self.config = SearchConfig.from_dict(cfg.get("search"))
+        self.space = cfg.get("space") or {}
+
+        self.trainer = ModelTrainer(model_config)
+        self.dataset_store = FrameStore(dataset_dir, storage_format)
+        self.output_dir = Path(output_dir)
+
+    def _metric(self) -> Tuple[str, float]:
+        metric = self.config.metric
+        if metric is None:
+            metric = "f1" if self.trainer.config.task_type == "classification" else "r2"
+        return metric, (-1.0 if metric in _LOWER_IS_BETTER else 1.0)
+
+    def tune_frame(self, df: pd.DataFrame, name: str = "dataset") -> TuningResult:
+        cfg = self.config
+        metric, sign = self._metric()
+        budgets = cfg.budgets()
+
+        X = df.drop("target", axis=1).to_numpy(dtype=np.float64)
+        y = df["target"].to_numpy()
+        splits = [
+            (slice(train[0], train[-1] + 1), slice(test[0], test[-1] + 1))
+            for train, test in TimeSeriesSplit(n_splits=cfg.cv_folds, gap=cfg.gap).split(X)
+        ]
+
+        rng = np.random.default_rng(cfg.random_state)
+        trials = [Trial(i, sample_params(self.space, rng)) for i in range(cfg.n_trials)]
+
+        workers = min(cfg.max_workers or os.cpu_count() or 1, cfg.n_trials)
+        n_jobs = max(1, (os.cpu_count() or 1) // workers)
+
+        started = time.perf_counter()
+        survivors = trials
+        with SharedArrays(X=X, y=y) as shared, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared.spec, n_jobs)
+        ) as pool:
+            for rung, budget in enumerate(budgets):
+                futures = [
+                    pool.submit(_evaluate, self.trainer, t.params, budget, splits, metric)
+                    for t in survivors
+                ]
+                for trial, future in zip(survivors, futures):
+                    score, seconds = future.result()
+                    trial.scores[budget] = score
+                    trial.seconds += seconds
+
+                ranked = sorted(survivors, key=lambda t: sign * t.scores[budget], reverse=True)
+                if rung < len(budgets) - 1:
+                    keep = max(1, math.ceil(len(ranked) / cfg.eta))
+                    for trial in ranked[keep:]:
+                        trial.pruned_at = budget
+                    print(f"[{name}] rung {rung}: {budget} trees, kept {keep}/{len(ranked)} trials")
+                survivors = ranked[:keep] if rung < len(budgets) - 1 else ranked
+
+        best = survivors[0]
+        result = TuningResult(
+            trials=trials,
+            metric=metric,
+            best=best,
+            best_params={**best.params, "n_estimators": budgets[-1]},
+            seconds=time.perf_counter() - started,
+        )
+        if cfg.log_mlflow:
+            self._log(result, name)
+        return result
+
+    def _log(self, result: TuningResult, name: str):
+        with mlflow.start_run(run_name=f"tune_{name}"):
+            mlflow.log_params({f"search_{k}": v for k, v in asdict(self.config).items()})
+            mlflow.log_params({f"best_{k}": v for k, v in result.best_params.items()})
+            mlflow.log_metric(f"best_{result.metric}", result.best.scores[max(result.best.scores)])
+
+            for trial in result.trials:
+                with mlflow.start_run(run_name=f"trial_{trial.id}", nested=True):
+                    mlflow.log_params(trial.params)
+                    for budget, score in trial.scores.items():
+                        mlflow.log_metric(result.metric, score, step=budget)
+                    mlflow.set_tag("pruned_at", trial.pruned_at if trial.pruned_at is not None else "")
+
+    def tune_ticker(self, ticker: str) -> TuningResult:
+        df = self.dataset_store.read(ticker)
+        result = self.tune_frame(df, name=ticker)
+        out_path = result.save(self.output_dir / f"{ticker}.json")
+
+        print(f"\nTuning for {ticker}: {result.summary()}")
+        print("Saved to:", out_path)
+        return result
+
+    def run_all(self):
+        for ticker in self.dataset_store.names():
+            self.tune_ticker(ticker)
+
+
+if __name__ == "__main__":
+    HyperparameterTuner().run_all()
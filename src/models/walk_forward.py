@@ -0,0 +1,232 @@
+"""
+Walk-forward (rolling-origin) training.
+
+The series is cut into consecutive folds: fit on a train window, predict
+the following test window, roll forward by `step` bars. Every prediction is
+out-of-sample, and the stitched predictions are what the backtester should
+trade on.
+
+Independent folds run in parallel on a process pool. With `warm_start`,
+folds run in order and each refit reuses the previous model instead:
+forests grow `trees_per_refit` new trees on the current window and retire
+their oldest trees, learners with `partial_fit` are updated with the rows
+that entered the window.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .trainer import ModelTrainer
+
+
+@dataclass
+class WalkForwardConfig:
+    train_window: int = 504
+    test_window: int = 63
+    step: Optional[int] = None  # defaults to test_window
+    gap: int = 0  # bars between train end and test start; use >= the target horizon
+    expanding: bool = False
+    warm_start: bool = True
+    trees_per_refit: int = 50
+    max_workers: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, cfg: Optional[dict]) -> "WalkForwardConfig":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (cfg or {}).items() if k in names})
+
+
+@dataclass(frozen=True)
+class Fold:
+    index: int
+    train: slice
+    test: slice
+
+
+def walk_forward_folds(n_samples: int, config: WalkForwardConfig) -> List[Fold]:
+    step = config.step or config.test_window
+    folds = []
+    start = config.train_window + config.gap
+    while start < n_samples:
+        train_end = start - config.gap
+        train_start = 0 if config.expanding else train_end - config.train_window
+        folds.append(Fold(
+            len(folds),
+            slice(train_start, train_end),
+            slice(start, min(start + config.test_window, n_samples)),
+        ))
+        start += step
+    return folds
+
+
+@dataclass
+class FoldResult:
+    index: int
+    train_start: Any
+    train_end: Any
+    test_start: Any
+    test_end: Any
+    seconds: float
+    warm: bool
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class WalkForwardResult:
+    predictions: pd.Series
+    fold_ids: pd.Series
+    folds: List[FoldResult]
+    metrics: Dict[str, float]
+    model: Any = None
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"pred": self.predictions, "fold": self.fold_ids})
+
+    def summary(self) -> str:
+        lines = [f"{'fold':>4}  {'train':<23}  {'test':<23}  {'secs':>6}  metrics"]
+        for f in self.folds:
+            metrics = ", ".join(f"{k}={v:.4f}" for k, v in f.metrics.items())
+            warm = " (warm)" if f.warm else ""
+            lines.append(
+                f"{f.index:>4}  {str(f.train_start)[:10]} → {str(f.train_end)[:10]}  "
+                f"{str(f.test_start)[:10]} → {str(f.test_end)[:10]}  {f.seconds:>6.2f}  {metrics}{warm}"
+            )
+        lines.append("out-of-sample: " + ", ".join(f"{k}={v:.4f}" for k, v in self.metrics.items()))
+        return "\n".join(lines)
+
+
+def _final_estimator(model):
+    return model.steps[-1][1] if hasattr(model, "steps") else model
+
+
+def _transform(model, X):
+    return model[:-1].transform(X) if hasattr(model, "steps") and len(model.steps) > 1 else X
+
+
+def _fit_fold(model, X_train, y_train, X_test, n_jobs: Optional[int], keep_model: bool):
+    started = time.perf_counter()
+    estimator = _final_estimator(model)
+    if n_jobs is not None and hasattr(estimator, "n_jobs"):
+        estimator.set_params(n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    preds = model.predict(X_test)
+    return (model if keep_model else None), preds, time.perf_counter() - started
+
+
+class WalkForwardTrainer:
+    def __init__(self, trainer: ModelTrainer, config: WalkForwardConfig,
+                 params: Optional[Dict[str, Any]] = None):
+        self.trainer = trainer
+        self.config = config
+        self.params = params
+
+    def supports_warm_start(self, model) -> bool:
+        estimator = _final_estimator(model)
+        return hasattr(estimator, "partial_fit") or (
+            hasattr(estimator, "warm_start") and hasattr(estimator, "n_estimators")
+        )
+
+    def _refit(self, model, fold: Fold, prev: Fold, X, y):
+        """Updates a fitted model in place for `fold`; transforms stay fitted on the first window."""
+        estimator = _final_estimator(model)
+
+        if hasattr(estimator, "partial_fit"):
+            new_rows = slice(max(prev.train.stop, fold.train.start), fold.train.stop)
+            estimator.partial_fit(_transform(model, X.iloc[new_rows]), y.iloc[new_rows])
+            return
+
+        # Forest: grow new trees on the current window, then retire the oldest
+        size = len(estimator.estimators_)
+        estimator.set_params(
+            warm_start=True,
+            n_estimators=size + self.config.trees_per_refit,
+            # A fresh seed per fold, otherwise the new trees would reuse the same bootstrap draws
+            random_state=self.trainer.config.random_state + fold.index,
+        )
+        estimator.fit(_transform(model, X.iloc[fold.train]), y.iloc[fold.train])
+        estimator.estimators_ = estimator.estimators_[-size:]
+        estimator.set_params(warm_start=False, n_estimators=size)
+
+    def _run_warm(self, X, y, folds):
+        outputs = []
+        model = self.trainer._build_model(self.params)
+        for fold in folds:
+            started = time.perf_counter()
+            if fold.index == 0:
+                model.fit(X.iloc[fold.train], y.iloc[fold.train])
+            else:
+                self._refit(model, fold, folds[fold.index - 1], X, y)
+            preds = model.predict(X.iloc[fold.test])
+            outputs.append((preds, time.perf_counter() - started, fold.index > 0))
+        return model, outputs
+
+    def _run_parallel(self, X, y, folds):
+        workers = self.config.max_workers or os.cpu_count() or 1
+        workers = min(workers, len(folds))
+        n_jobs = max(1, (os.cpu_count() or 1) // workers)
+        last = len(folds) - 1
+
+        def args(fold):
+            return (self.trainer._build_model(self.params), X.iloc[fold.train], y.iloc[fold.train],
+                    X.iloc[fold.test], n_jobs, fold.index == last)
+
+        if workers == 1:
+            results = [_fit_fold(*args(fold)) for fold in folds]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_fit_fold, *args(fold)) for fold in folds]
+                results = [f.result() for f in futures]
+
+        model = results[-1][0]
+        # The returned model trains with the trainer's configured parallelism again
+        estimator = _final_estimator(model)
+        if hasattr(estimator, "n_jobs"):
+            estimator.set_params(n_jobs=self.trainer.config.n_jobs)
+        return model, [(preds, seconds, False) for _, preds, seconds in results]
+
+    def run(self, X: pd.DataFrame, y: pd.Series) -> WalkForwardResult:
+        folds = walk_forward_folds(len(X), self.config)
+        if not folds:
+            raise ValueError(
+                f"Need more than {self.config.train_window + self.config.gap} rows for walk-forward "
+                f"training, got {len(X)}."
+            )
+
+        if self.config.warm_start and self.supports_warm_start(self.trainer._build_model(self.params)):
+            model, outputs = self._run_warm(X, y, folds)
+        else:
+            model, outputs = self._run_parallel(X, y, folds)
+
+        pieces, ids, results = [], [], []
+        for fold, (preds, seconds, warm) in zip(folds, outputs):
+            index = X.index[fold.test]
+            pieces.append(pd.Series(preds, index=index))
+            ids.append(pd.Series(fold.index, index=index))
+            results.append(FoldResult(
+                index=fold.index,
+                train_start=X.index[fold.train.start],
+                train_end=X.index[fold.train.stop - 1],
+                test_start=index[0],
+                test_end=index[-1],
+                seconds=seconds,
+                warm=warm,
+                metrics=self.trainer.evaluate(y.iloc[fold.test], preds),
+            ))
+
+        # With step < test_window the windows overlap; the most recent fold wins
+        predictions = pd.concat(pieces)
+        keep = ~predictions.index.duplicated(keep="last")
+        predictions = predictions[keep].rename("pred")
+        fold_ids = pd.concat(ids)[keep].rename("fold")
+
+        return WalkForwardResult(
+            predictions=predictions,
+            fold_ids=fold_ids,
+            folds=results,
+            metrics=self.trainer.evaluate(y.loc[predictions.index], predictions),
+            model=model,
+        )
@@ -1,8 +1,13 @@
+from dataclasses import asdict
 from pathlib import Path
 import pandas as pd
 
+from src.data.storage import FrameStore, DEFAULT_FORMAT
+from src.models.pooled import PooledPredictor
 from src.models.predictor import ModelPredictor
 from src.backtest.backtester import Backtester, BacktestConfig
+from src.backtest.portfolio import PortfolioBacktester, PortfolioConfig
+from src.utils.tracking import tracking_sink
 
 
 class BacktestPipeline:
@@ -11,36 +16,44 @@ class BacktestPipeline:
         dataset_dir: str = "data/datasets",
         model_dir: str = "models",
         backtest_dir: str = "data/backtests",
+        storage_format: str = DEFAULT_FORMAT,
+        predictions_dir: str = "data/predictions",
+        pooled: bool = False,
+        tracking: str = "async",
     ):
         self.dataset_dir = Path(dataset_dir)
         self.model_dir = Path(model_dir)
         self.backtest_dir = Path(backtest_dir)
         self.backtest_dir.mkdir(parents=True, exist_ok=True)
+        self.dataset_store = FrameStore(self.dataset_dir, storage_format)
+        self.backtest_store = FrameStore(self.backtest_dir, storage_format)
+        self.predictions_store = FrameStore(predictions_dir, storage_format)
+        self.pooled = pooled
+        # Runs are queued and written to MLflow in the background; flushed at the end of run_all
+        self.tracking = tracking_sink(tracking)
 
         cfg = BacktestConfig(
             threshold_long=0.0,
             threshold_short=0.0,
             cost_bps=10.0,
         )
-        self.backtester = Backtester(cfg)
+        self.backtester = Backtester(cfg, tracking=self.tracking)
 
-    def run_for_ticker(self, ticker: str):
-        dataset_path = self.dataset_dir / f"{ticker}.csv"
-        if not dataset_path.exists():
-            print(f"[!] Dataset not found for {ticker}, skipping.")
-            return
+    def run_for_ticker(self, ticker: str, df: pd.DataFrame | None = None, preds: pd.Series | None = None):
+        if df is None:
+            if not self.dataset_store.exists(ticker):
+                print(f"[!] Dataset not found for {ticker}, skipping.")
+                return
+            df = self.dataset_store.read(ticker)
 
-        df = pd.read_csv(dataset_path, index_col=0, parse_dates=True)
-
-        predictor = ModelPredictor(model_dir=str(self.model_dir))
-        X = df.drop("target", axis=1)
-        preds = predictor.predict(X)
-        preds = pd.Series(preds, index=df.index)
+        if preds is not None:
+            preds = preds.reindex(df.index)
+        else:
+            df, preds = self._predictions(ticker, df)
 
         results, metrics = self.backtester.run(df, preds, ticker)
 
-        out_path = self.backtest_dir / f"{ticker}_backtest.csv"
-        results.to_csv(out_path)
+        out_path = self.backtest_store.write(f"{ticker}_backtest", results)
 
         print(f"\nBacktest for {ticker}")
         print("Saved to:", out_path)
@@ -48,10 +61,60 @@ class BacktestPipeline:
         for k, v in metrics.items():
             print(f"  {k}: {v:.4f}")
 
+    def _predictions(self, ticker: str, df: pd.DataFrame):
+        """Returns `(df, preds)`, with `df` restricted to the bars that have a prediction."""
+        if self.predictions_store.exists(ticker):
+            # Walk-forward training left out-of-sample predictions; trade only those bars
+            preds = self.predictions_store.read(ticker, columns=["pred"])["pred"]
+            preds = preds[preds.index.isin(df.index)]
+            return df.loc[preds.index], preds
+
+        # Cheap after the first ticker: the loaded model comes from the warm
+        # cache unless a newer one has been saved. Batch scoring keeps the
+        # forest's trained parallelism.
+        predictor = ModelPredictor(model_dir=str(self.model_dir), ticker=ticker, n_jobs=None)
+        X = df.drop("target", axis=1)
+        return df, pd.Series(predictor.predict(X), index=df.index)
+
+    def run_portfolio(self, config: PortfolioConfig | None = None):
+        """Backtests the whole universe as one portfolio on aligned (dates x assets) matrices."""
+        preds, returns = {}, {}
+        for ticker in self.dataset_store.names():
+            df, preds[ticker] = self._predictions(ticker, self.dataset_store.read(ticker))
+            returns[ticker] = df["target"]
+
+        if config is None:
+            config = PortfolioConfig(**asdict(self.backtester.config))
+        results, metrics = PortfolioBacktester(config, tracking=self.tracking).run(preds, returns)
+        self.tracking.flush()
+
+        out_path = self.backtest_store.write("portfolio_backtest", results)
+
+        print(f"\nPortfolio backtest over {len(preds)} tickers")
+        print("Saved to:", out_path)
+        print("Metrics:")
+        for k, v in metrics.items():
+            print(f"  {k}: {v:.4f}")
+        return results, metrics
+
+    def run_pooled(self):
+        """Scores the whole universe with the pooled model in one batched call."""
+        frames = {t: self.dataset_store.read(t) for t in self.dataset_store.names()}
+        features = pd.concat(
+            {t: df.drop("target", axis=1) for t, df in frames.items()}, names=["ticker", "date"]
+        ).swaplevel()
+        preds = PooledPredictor(model_dir=str(self.model_dir)).predict_panel(features)
+
+        for ticker, df in frames.items():
+            self.run_for_ticker(ticker, df, preds.xs(ticker, level="ticker"))
+
     def run_all(self):
-        for file in self.dataset_dir.glob("*.csv"):
-            ticker = file.stem
-            self.run_for_ticker(ticker)
+        if self.pooled:
+            self.run_pooled()
+        else:
+            for ticker in self.dataset_store.names():
+                self.run_for_ticker(ticker)
+        self.tracking.flush()
 
 
 if __name__ == "__main__":
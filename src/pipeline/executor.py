@@ -0,0 +1,265 @@
+"""
+Per-ticker pipeline executor.
+
+Stages form a DAG (fetch -> preprocess -> features -> dataset -> train ->
+backtest by default). Each ticker walks the DAG on its own worker, so a
+ticker starts training as soon as its own dataset is ready instead of
+waiting for the whole universe to finish the previous stage.
+
+With profiling enabled, stages on a process pool are profiled in each
+worker with the parent's settings and the worker reports are merged into
+the parent's profiler; on a thread pool they record into it directly.
+"""
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils import profiling
+from src.utils.config_loader import DataConfig, file_hash, load_typed
+
+
+@dataclass(frozen=True)
+class StageContext:
+    data_config: str = "config/data.yaml"
+    feature_config: str = "config/features.yaml"
+    training_config: str = "config/training.yaml"
+    model_config: str = "config/model.yaml"
+    model_dir: str = "models"
+    n_jobs: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[[str, StageContext], object]
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageTiming:
+    ticker: str
+    stage: str
+    seconds: float
+    error: Optional[str] = None
+
+
+# Components are built once per worker process and reused across tickers,
+# until one of the config files they were built from changes
+_COMPONENTS: Dict[tuple, Tuple[tuple, object]] = {}
+
+
+def _component(kind: str, ctx: StageContext, factory, *configs: str):
+    hashes = tuple(file_hash(path) for path in configs)
+    cached = _COMPONENTS.get((kind, ctx))
+    if cached is None or cached[0] != hashes:
+        cached = _COMPONENTS[(kind, ctx)] = (hashes, factory())
+    return cached[1]
+
+
+def _storage_format(ctx: StageContext) -> str:
+    return load_typed(ctx.data_config, DataConfig).storage_format
+
+
+def fetch_stage(ticker: str, ctx: StageContext):
+    from src.data.fetcher import DataFetcher
+    fetcher = _component("fetcher", ctx, lambda: DataFetcher(ctx.data_config), ctx.data_config)
+    return fetcher.fetch_ticker(ticker, incremental=fetcher.settings.incremental)
+
+
+def preprocess_stage(ticker: str, ctx: StageContext):
+    from src.data.preprocess import DataPreprocessor
+    preprocessor = _component("preprocessor", ctx, lambda: DataPreprocessor(ctx.data_config), ctx.data_config)
+    return preprocessor.process_ticker(ticker)
+
+
+def features_stage(ticker: str, ctx: StageContext):
+    from src.features.builder import FeatureBuilder
+    builder = _component(
+        "builder", ctx, lambda: FeatureBuilder(ctx.feature_config, _storage_format(ctx)),
+        ctx.feature_config, ctx.data_config,
+    )
+    return builder.process_ticker(ticker)
+
+
+def dataset_stage(ticker: str, ctx: StageContext):
+    from src.pipeline.train_dataset import TrainingDatasetBuilder
+    builder = _component(
+        "dataset", ctx, lambda: TrainingDatasetBuilder(ctx.training_config, _storage_format(ctx)),
+        ctx.training_config, ctx.data_config,
+    )
+    return builder.build_for_ticker(ticker)
+
+
+def train_stage(ticker: str, ctx: StageContext):
+    from src.pipeline.train_pipeline import TrainPipeline
+    pipeline = _component("train", ctx, lambda: TrainPipeline(
+        model_dir=ctx.model_dir,
+        storage_format=_storage_format(ctx),
+        model_config=ctx.model_config,
+        n_jobs=ctx.n_jobs,
+    ), ctx.model_config, ctx.data_config)
+    return pipeline.run_for_ticker(ticker)
+
+
+def backtest_stage(ticker: str, ctx: StageContext):
+    from src.pipeline.backtest_pipeline import BacktestPipeline
+    pipeline = _component("backtest", ctx, lambda: BacktestPipeline(
+        model_dir=ctx.model_dir,
+        storage_format=_storage_format(ctx),
+    ), ctx.data_config)
+    try:
+        return pipeline.run_for_ticker(ticker)
+    finally:
+        # Pool workers exit without atexit hooks, so queued runs must be written now
+        pipeline.tracking.flush()
+
+
+DEFAULT_STAGES = (
+    Stage("fetch", fetch_stage),
+    Stage("preprocess", preprocess_stage, ("fetch",)),
+    Stage("features", features_stage, ("preprocess",)),
+    Stage("dataset", dataset_stage, ("features",)),
+    Stage("train", train_stage, ("dataset",)),
+    Stage("backtest", backtest_stage, ("train",)),
+)
+
+
+def topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    """Orders stages so each runs after its dependencies; deps outside `stages` are assumed done."""
+    by_name = {s.name: s for s in stages}
+    pending = {s.name: {d for d in s.deps if d in by_name} for s in stages}
+    ordered = []
+
+    while pending:
+        ready = [name for name in by_name if name in pending and not pending[name]]
+        if not ready:
+            raise ValueError(f"Stage dependencies contain a cycle: {sorted(pending)}")
+        for name in ready:
+            ordered.append(by_name[name])
+            del pending[name]
+            for deps in pending.values():
+                deps.discard(name)
+    return ordered
+
+
+def _run_ticker(ticker: str, stages: Sequence[Stage], ctx: StageContext) -> List[StageTiming]:
+    timings = []
+    failed = set()
+
+    for stage in stages:
+        if failed.intersection(stage.deps):
+            timings.append(StageTiming(ticker, stage.name, 0.0, error="skipped: upstream stage failed"))
+            failed.add(stage.name)
+            continue
+
+        started = time.perf_counter()
+        error = None
+        try:
+            stage.fn(ticker, ctx)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+            failed.add(stage.name)
+        timings.append(StageTiming(ticker, stage.name, time.perf_counter() - started, error))
+
+    return timings
+
+
+def _run_ticker_profiled(ticker: str, stages: Sequence[Stage], ctx: StageContext, settings: dict):
+    with profiling.profile_run(**settings) as profiler:
+        timings = _run_ticker(ticker, stages, ctx)
+    return timings, profiler.report()
+
+
+@dataclass
+class ExecutorReport:
+    timings: List[StageTiming] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    def failures(self) -> List[StageTiming]:
+        return [t for t in self.timings if t.error is not None]
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        for t in self.timings:
+            s = totals.setdefault(t.stage, {"tickers": 0, "total": 0.0, "max": 0.0})
+            s["tickers"] += 1
+            s["total"] += t.seconds
+            s["max"] = max(s["max"], t.seconds)
+        return totals
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<12}{'tickers':>8}{'total s':>10}{'mean s':>10}{'max s':>10}"]
+        for stage, s in self.stage_totals().items():
+            mean = s["total"] / s["tickers"] if s["tickers"] else 0.0
+            lines.append(f"{stage:<12}{s['tickers']:>8}{s['total']:>10.2f}{mean:>10.2f}{s['max']:>10.2f}")
+        lines.append(f"wall time: {self.wall_seconds:.2f}s, failures: {len(self.failures())}")
+        return "\n".join(lines)
+
+
+class PipelineExecutor:
+    def __init__(
+        self,
+        stages: Sequence[Stage] = DEFAULT_STAGES,
+        max_workers: Optional[int] = None,
+        context: Optional[StageContext] = None,
+        use_processes: bool = True,
+    ):
+        self.stages = topological_order(stages)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+
+        if context is None:
+            # Split the cores between workers so each forest does not grab all of them
+            context = StageContext(n_jobs=max(1, (os.cpu_count() or 1) // self.max_workers))
+        self.context = context
+
+    def run(self, tickers: Optional[Sequence[str]] = None, only: Optional[Sequence[str]] = None) -> ExecutorReport:
+        """
+        Runs the DAG for every ticker with at most `max_workers` tickers in flight.
+        `only` restricts the run to some stages; their upstream outputs must already exist.
+        """
+        if tickers is None:
+            tickers = list(load_typed(self.context.data_config, DataConfig).tickers)
+
+        stages = self.stages
+        if only is not None:
+            unknown = set(only) - {s.name for s in stages}
+            if unknown:
+                raise ValueError(f"Unknown stages: {sorted(unknown)}")
+            stages = [s for s in stages if s.name in only]
+
+        pool_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        # Worker processes cannot record into this process's profiler
+        profiler = profiling.active() if self.use_processes else None
+        report = ExecutorReport()
+        started = time.perf_counter()
+
+        with pool_cls(max_workers=self.max_workers) as pool:
+            if profiler is None:
+                futures = {pool.submit(_run_ticker, t, stages, self.context): t for t in tickers}
+            else:
+                futures = {
+                    pool.submit(_run_ticker_profiled, t, stages, self.context, profiler.settings()): t
+                    for t in tickers
+                }
+            for future in as_completed(futures):
+                ticker = futures[future]
+                timings = future.result()
+                if profiler is not None:
+                    timings, worker_report = timings
+                    profiler.merge(worker_report)
+                report.timings.extend(timings)
+                status = "ok" if all(t.error is None for t in timings) else "failed"
+                print(f"[{status}] {ticker}: " + ", ".join(f"{t.stage} {t.seconds:.2f}s" for t in timings))
+
+        report.wall_seconds = time.perf_counter() - started
+        print(report.summary())
+        return report
+
+
+if __name__ == "__main__":
+    PipelineExecutor().run()
@@ -0,0 +1,97 @@
+"""
+End-to-end in-process pipeline.
+
+Frames are handed directly from preprocessing to features, datasets and
+training, so a research sweep does not pay for serialization between
+stages. Persistence is opt-in: each name in `checkpoints` writes that
+stage's output through the same stores the file-based pipeline uses;
+feature checkpoints also refresh the incremental indicator state, so a
+later file-based run appends after them instead of repeating rows.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+
+from src.data.preprocess import DataPreprocessor
+from src.features.builder import FeatureBuilder
+from src.models.registry import ModelRegistry
+from src.pipeline.train_dataset import TrainingDatasetBuilder
+from src.pipeline.train_pipeline import TrainPipeline
+
+CHECKPOINTS = ("processed", "features", "datasets", "models")
+
+
+@dataclass
+class TickerFrames:
+    processed: pd.DataFrame
+    features: pd.DataFrame
+    dataset: pd.DataFrame
+    model: Any = None
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+class InMemoryPipeline:
+    def __init__(
+        self,
+        data_config: str = "config/data.yaml",
+        feature_config: str = "config/features.yaml",
+        training_config: str = "config/training.yaml",
+        model_config: str = "config/model.yaml",
+        model_dir: str = "models",
+        checkpoints: Iterable[str] = (),
+    ):
+        self.checkpoints = set(checkpoints)
+        unknown = self.checkpoints - set(CHECKPOINTS)
+        if unknown:
+            raise ValueError(f"Unknown checkpoints: {sorted(unknown)}")
+
+        self.preprocessor = DataPreprocessor(data_config)
+        storage_format = self.preprocessor.processed_store.fmt
+        self.builder = FeatureBuilder(feature_config, storage_format=storage_format)
+        self.dataset_builder = TrainingDatasetBuilder(training_config, storage_format=storage_format)
+        self.trainer = TrainPipeline(model_dir=model_dir, storage_format=storage_format, model_config=model_config)
+        self.model_dir = model_dir
+
+    def _sink(self, checkpoint: str, store, frames: Dict[str, pd.DataFrame], write=None):
+        if checkpoint not in self.checkpoints:
+            return
+        write = write or store.write
+        for ticker, df in frames.items():
+            write(ticker, df)
+        print(f"Checkpoint {checkpoint}: {len(frames)} tickers → {store.directory}")
+
+    def run(self, raw: Optional[Dict[str, pd.DataFrame]] = None, train: bool = True) -> Dict[str, TickerFrames]:
+        """
+        Runs preprocess → features → dataset (→ train) on raw frames keyed by
+        ticker. When `raw` is None the raw store is read once instead.
+        """
+        if raw is None:
+            store = self.preprocessor.raw_store
+            raw = {ticker: store.read(ticker) for ticker in store.names()}
+
+        # Shallow copies: clean() replaces the index, which must not leak to the caller
+        processed = {t: self.preprocessor.clean(df.copy(deep=False)) for t, df in raw.items()}
+        self._sink("processed", self.preprocessor.processed_store, processed)
+
+        features = self.builder.compute_features({t: df["Close"] for t, df in processed.items()})
+        self._sink("features", self.builder.features_store, features,
+                   write=lambda t, df: self.builder._save(t, processed[t], df))
+
+        datasets = {
+            t: self.dataset_builder.build(features[t], processed[t][["Close"]])
+            for t in processed
+        }
+        self._sink("datasets", self.dataset_builder.dataset_store, datasets)
+
+        results = {t: TickerFrames(processed[t], features[t], datasets[t]) for t in processed}
+        if not train:
+            return results
+
+        registry = ModelRegistry(self.model_dir, artifact_format=self.trainer.artifact_format) if "models" in self.checkpoints else None
+        for ticker, result in results.items():
+            result.model, result.metrics = self.trainer.train_frame(result.dataset)
+            if registry is not None:
+                registry.save_model(result.model, f"{ticker}.pkl", metrics=result.metrics, meta=self.trainer.meta())
+
+        return results
@@ -0,0 +1,321 @@
+"""
+Event-driven realtime pipeline.
+
+A source task streams bars into a bounded asyncio queue. The engine drains
+whatever has arrived (up to `max_batch` bars), advances each symbol's
+`IncrementalFeatureEngine` by one bar, scores every bar whose features are
+ready and turns the predictions into positions with the `Backtester`
+thresholds. Each symbol is scored by its own model (models are trained per
+ticker) resolved once from the shared model cache; bars that arrived
+together are batched into one `ModelPredictor` call per model, and a
+single predictor can also serve every symbol. Batching is what keeps the
+per-bar cost low with hundreds of symbols.
+
+Per-stage latencies (queue wait, features, inference, signal and total,
+per bar) are kept in `LatencyRecorder`s and reported as percentiles and
+histograms. Per-batch debug logging is rate limited and only built when
+DEBUG is enabled, so it stays off the per-bar path.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.backtester import BacktestConfig, positions
+from src.data.storage import FrameStore, DEFAULT_FORMAT
+from src.features.incremental import IncrementalFeatureEngine
+from src.models.predictor import ModelPredictor
+from src.utils.config_loader import FeatureConfig, load_config, load_typed
+from src.utils.latency import LatencyRecorder
+from src.utils.logger import RateLimiter
+
+log = logging.getLogger(__name__)
+
+STAGES = ("queue", "features", "inference", "signal", "total")
+
+
+@dataclass
+class Bar:
+    symbol: str
+    timestamp: pd.Timestamp
+    close: float
+    received_ns: int = 0  # set when the bar enters the engine's queue
+
+
+@dataclass
+class Signal:
+    symbol: str
+    timestamp: pd.Timestamp
+    pred: float
+    position: int
+
+
+class BarSource:
+    """Anything with an async `stream()` of bars; live feeds implement the same method."""
+
+    def stream(self) -> AsyncIterator[Bar]:
+        raise NotImplementedError
+
+
+class ReplaySource(BarSource):
+    """
+    Replays stored bars for many symbols in timestamp order. `speed` is a
+    multiple of real time between consecutive timestamps (e.g. 86400 plays
+    a daily bar per second); None replays as fast as the consumer keeps up.
+    """
+
+    def __init__(self, frames: Mapping[str, pd.DataFrame], speed: Optional[float] = None,
+                 start=None, end=None):
+        symbols, stamps, closes = [], [], []
+        for symbol, df in frames.items():
+            df = df.loc[start:end]
+            symbols.append(np.full(len(df), symbol, dtype=object))
+            stamps.append(df.index.to_numpy())
+            closes.append(pd.to_numeric(df["Close"], errors="coerce").to_numpy(dtype=float))
+
+        stamps = np.concatenate(stamps) if stamps else np.array([], dtype="datetime64[ns]")
+        order = np.argsort(stamps, kind="stable")
+        self.symbols = np.concatenate(symbols)[order] if symbols else np.array([], dtype=object)
+        self.timestamps = pd.DatetimeIndex(stamps[order])
+        self.closes = np.concatenate(closes)[order] if closes else np.array([])
+        self.speed = speed
+
+    @classmethod
+    def from_store(cls, store: FrameStore, symbols=None, **kwargs) -> "ReplaySource":
+        symbols = symbols or store.names()
+        return cls({s: store.read(s, columns=["Close"]) for s in symbols}, **kwargs)
+
+    def __len__(self):
+        return len(self.closes)
+
+    async def stream(self) -> AsyncIterator[Bar]:
+        previous = None
+        for symbol, timestamp, close in zip(self.symbols, self.timestamps, self.closes):
+            if self.speed and previous is not None and timestamp != previous:
+                await asyncio.sleep((timestamp - previous).total_seconds() / self.speed)
+            previous = timestamp
+            yield Bar(symbol, timestamp, float(close))
+
+
+Resolver = Callable[[str], Optional[ModelPredictor]]
+
+
+class RealtimeEngine:
+    """
+    `predictor` is either one `ModelPredictor` serving every symbol or a
+    callable returning the predictor for a symbol (None leaves the symbol
+    unscored); it is called once per symbol.
+    """
+
+    def __init__(
+        self,
+        predictor: Union[ModelPredictor, Resolver],
+        feature_config: dict,
+        thresholds: BacktestConfig | None = None,
+        max_batch: int = 256,
+        queue_size: int = 4096,
+    ):
+        self.feature_config = feature_config
+        self.thresholds = thresholds or BacktestConfig()
+        self.max_batch = max_batch
+        self.queue_size = queue_size
+        self.engines: Dict[str, IncrementalFeatureEngine] = {}
+        self.latency = {stage: LatencyRecorder() for stage in STAGES}
+        self.debug_limiter = RateLimiter(rate=1.0, burst=5)
+        self.bars = 0
+        self.batches = 0
+
+        self.columns = IncrementalFeatureEngine(feature_config).columns
+        self._models: Dict[str, Optional[Tuple[ModelPredictor, np.ndarray]]] = {}
+        if isinstance(predictor, ModelPredictor):
+            self._shared = self._bind(predictor)
+            self._resolve = None
+        else:
+            self._shared = None
+            self._resolve = predictor
+
+    def _bind(self, predictor: ModelPredictor) -> Tuple[ModelPredictor, np.ndarray]:
+        # Engine columns -> the order the model was trained with
+        names = predictor.feature_names
+        missing = [] if names is None else [n for n in names if n not in self.columns]
+        if missing:
+            raise ValueError(f"Model features not produced by the feature config: {missing}")
+        order = np.arange(len(self.columns)) if names is None else np.array([self.columns.index(n) for n in names])
+        return predictor, order
+
+    def _model(self, symbol: str) -> Optional[Tuple[ModelPredictor, np.ndarray]]:
+        if self._shared is not None:
+            return self._shared
+        if symbol not in self._models:
+            predictor = self._resolve(symbol)
+            self._models[symbol] = None if predictor is None else self._bind(predictor)
+        return self._models[symbol]
+
+    def _engine(self, symbol: str) -> IncrementalFeatureEngine:
+        engine = self.engines.get(symbol)
+        if engine is None:
+            engine = self.engines[symbol] = IncrementalFeatureEngine(self.feature_config)
+        return engine
+
+    def warm_up(self, symbol: str, history: pd.DataFrame):
+        """Runs a symbol's stored history through its feature state so its first live bar is scored."""
+        self._engine(symbol).update(history)
+
+    def process(self, bars: List[Bar]) -> List[Signal]:
+        started = time.perf_counter_ns()
+        n = len(bars)
+        for bar in bars:
+            if bar.received_ns:
+                self.latency["queue"].record_ns(started - bar.received_ns)
+
+        rows, ready = [], []
+        groups: Dict[str, Tuple[ModelPredictor, np.ndarray, List[int]]] = {}
+        for bar in bars:
+            row = self._engine(bar.symbol).step(bar.timestamp, bar.close)
+            # Bars still inside an indicator's warm-up window, or without a model, are not scored
+            if row is None or not np.isfinite(row).all():
+                continue
+            model = self._model(bar.symbol)
+            if model is None:
+                continue
+            # Symbols served by the same model version share one call
+            predictor, order = model
+            groups.setdefault(predictor.version, (predictor, order, []))[2].append(len(ready))
+            rows.append(row)
+            ready.append(bar)
+        featured = time.perf_counter_ns()
+        self.latency["features"].record_ns((featured - started) // n)
+
+        signals = []
+        if ready:
+            X = np.vstack(rows)
+            preds = np.empty(len(ready))
+            for predictor, order, index in groups.values():
+                preds[index] = predictor.predict(X[index][:, order])
+            inferred = time.perf_counter_ns()
+            self.latency["inference"].record_ns((inferred - featured) // len(ready))
+
+            held = positions(preds, self.thresholds.threshold_long, self.thresholds.threshold_short)
+            signals = [
+                Signal(bar.symbol, bar.timestamp, float(p), int(h)) for bar, p, h in zip(ready, preds, held)
+            ]
+            done = time.perf_counter_ns()
+            self.latency["signal"].record_ns((done - inferred) // len(ready))
+            for bar in ready:
+                if bar.received_ns:
+                    self.latency["total"].record_ns(done - bar.received_ns)
+
+        self.bars += n
+        self.batches += 1
+        if log.isEnabledFor(logging.DEBUG) and self.debug_limiter.allow("batch"):
+            log.debug("batch %d: %d bars, %d scored, %d signals (%d batches not logged)", self.batches, n,
+                      len(ready), len(signals), self.debug_limiter.take_suppressed("batch"))
+        return signals
+
+    async def _produce(self, source: BarSource, queue: asyncio.Queue):
+        try:
+            async for bar in source.stream():
+                bar.received_ns = time.perf_counter_ns()
+                await queue.put(bar)
+        finally:
+            # End of stream, or the source failed: let the consumer finish either way
+            if not asyncio.current_task().cancelling():
+                await queue.put(None)
+
+    async def run(self, source: BarSource, on_signal: Optional[Callable[[Signal], None]] = None) -> int:
+        """Consumes `source` until it ends; returns the number of signals emitted."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        producer = asyncio.create_task(self._produce(source, queue))
+        emitted = 0
+        finished = False
+        try:
+            while not finished:
+                bar = await queue.get()
+                if bar is None:
+                    break
+                batch = [bar]
+                while len(batch) < self.max_batch and not queue.empty():
+                    bar = queue.get_nowait()
+                    if bar is None:
+                        finished = True
+                        break
+                    batch.append(bar)
+
+                for signal in self.process(batch):
+                    emitted += 1
+                    if on_signal is not None:
+                        on_signal(signal)
+                # Let the producer refill the queue between batches
+                await asyncio.sleep(0)
+            # Re-raises a source failure
+            await producer
+        finally:
+            producer.cancel()
+        return emitted
+
+    def latency_report(self) -> Dict[str, Dict[str, float]]:
+        return {stage: recorder.percentiles() for stage, recorder in self.latency.items()}
+
+    def histograms(self, edges_ms=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)) -> Dict[str, Dict[str, int]]:
+        return {stage: recorder.histogram(edges_ms) for stage, recorder in self.latency.items()}
+
+    def summary(self) -> str:
+        lines = [f"{self.bars} bars in {self.batches} batches ({len(self.engines)} symbols)",
+                 f"{'stage':<10}{'count':>8}{'p50_ms':>10}{'p99_ms':>10}{'max_ms':>10}"]
+        for stage, stats in self.latency_report().items():
+            if stats["count"]:
+                lines.append(f"{stage:<10}{stats['count']:>8}{stats['p50_ms']:>10.4f}"
+                             f"{stats['p99_ms']:>10.4f}{stats['max_ms']:>10.4f}")
+        return "\n".join(lines)
+
+
+class RealtimePipeline:
+    """Replays stored bars through the realtime engine; live sources plug in via `run(source)`."""
+
+    def __init__(
+        self,
+        feature_config: str = "config/features.yaml",
+        model_dir: str = "models",
+        processed_dir: str = "data/processed",
+        storage_format: str = DEFAULT_FORMAT,
+        thresholds: BacktestConfig | None = None,
+        max_batch: int = 256,
+    ):
+        self.settings = load_typed(feature_config, FeatureConfig)
+        self.feature_config = load_config(feature_config)
+        self.processed_store = FrameStore(processed_dir, storage_format)
+        self.model_dir = model_dir
+        self.engine = RealtimeEngine(self._predictor, self.feature_config, thresholds, max_batch=max_batch)
+        self.signals: List[Signal] = []
+
+    def _predictor(self, symbol: str) -> Optional[ModelPredictor]:
+        # Warm model from the shared cache, tuned for small-batch latency
+        try:
+            return ModelPredictor(model_dir=self.model_dir, ticker=symbol, n_jobs=1)
+        except FileNotFoundError:
+            log.warning("no model for %s; its bars are not scored", symbol)
+            return None
+
+    def replay(self, symbols=None, start=None, end=None, speed: Optional[float] = None, warm_up: bool = True):
+        """Replays bars from `start` on; with `warm_up`, earlier bars only prime the feature state."""
+        symbols = symbols or self.processed_store.names()
+        frames = {s: self.processed_store.read(s, columns=["Close"]) for s in symbols}
+        if warm_up and start is not None:
+            for symbol, df in frames.items():
+                self.engine.warm_up(symbol, df[df.index < pd.Timestamp(start)])
+        return self.run(ReplaySource(frames, speed=speed, start=start, end=end))
+
+    def run(self, source: BarSource) -> List[Signal]:
+        self.signals = []
+        asyncio.run(self.engine.run(source, self.signals.append))
+        print(self.engine.summary())
+        log.info("replayed %d bars, %d signals", self.engine.bars, len(self.signals))
+        return self.signals
+
+
+if __name__ == "__main__":
+    RealtimePipeline().replay()
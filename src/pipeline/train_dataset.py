@@ -1,19 +1,29 @@
 import pandas as pd
 from pathlib import Path
-import yaml
+
+from src.data.storage import FrameStore, DEFAULT_FORMAT
+from src.utils.config_loader import TrainingConfig, load_config, load_typed
+from src.utils.profiling import stage
 
 class TrainingDatasetBuilder:
-    def __init__(self, config_path="config/training.yaml"):
-        with open(config_path, "r") as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config_path="config/training.yaml", storage_format=DEFAULT_FORMAT):
+        self.config = load_config(config_path)
+        self.settings = load_typed(config_path, TrainingConfig)
 
         self.features_dir = Path("data/features")
         self.processed_dir = Path("data/processed")
         self.dataset_dir = Path("data/datasets")
         self.dataset_dir.mkdir(parents=True, exist_ok=True)
 
+        self.features_store = FrameStore(self.features_dir, storage_format)
+        self.processed_store = FrameStore(self.processed_dir, storage_format)
+        self.dataset_store = FrameStore(self.dataset_dir, storage_format)
+
     def _ensure_numeric(self, df):
+        # Only CSV inputs lose dtypes; typed columnar files skip the string cleanup
         for col in df.columns:
+            if pd.api.types.is_numeric_dtype(df[col]):
+                continue
             df[col] = (
                 df[col]
                 .astype(str)
@@ -25,17 +35,19 @@ class TrainingDatasetBuilder:
         return df
 
     def load_data(self, ticker):
-        features = pd.read_csv(self.features_dir / f"{ticker}.csv", index_col=0, parse_dates=True)
-        prices = pd.read_csv(self.processed_dir / f"{ticker}.csv", index_col=0, parse_dates=True)
+        with stage("TrainingDatasetBuilder.load_data") as s:
+            features = self.features_store.read(ticker)
+            prices = self.processed_store.read(ticker, columns=["Close"])
 
-        features = self._ensure_numeric(features)
-        prices = self._ensure_numeric(prices)
+            features = self._ensure_numeric(features)
+            prices = self._ensure_numeric(prices)
+            s.count(features)
 
         return features, prices
 
     def create_target(self, prices):
-        horizon = self.config["target"]["horizon"]
-        method = self.config["target"]["type"]
+        horizon = self.settings.horizon
+        method = self.settings.target_type
 
         close = prices["Close"]
 
@@ -53,17 +65,22 @@ class TrainingDatasetBuilder:
 
         raise ValueError("Unknown target type")
 
+    def build(self, features, prices):
+        """Joins features with the target built from `prices` and drops incomplete rows."""
+        with stage("TrainingDatasetBuilder.build") as s:
+            target = self.create_target(prices)
+            dataset = features.join(target).dropna()
+            s.count(dataset)
+        return dataset
+
     def build_for_ticker(self, ticker):
         features, prices = self.load_data(ticker)
-        target = self.create_target(prices)
+        dataset = self.build(features, prices)
 
-        dataset = features.join(target).dropna()
-        output_path = self.dataset_dir / f"{ticker}.csv"
-        dataset.to_csv(output_path)
+        output_path = self.dataset_store.write(ticker, dataset)
 
         print(f"Training dataset saved: {output_path}")
 
     def build_all(self):
-        for file in self.features_dir.glob("*.csv"):
-            ticker = file.stem
+        for ticker in self.features_store.names():
             self.build_for_ticker(ticker)
\ No newline at end of file
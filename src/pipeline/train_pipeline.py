@@ -1,35 +1,111 @@
 from pathlib import Path
 import pandas as pd
 
+from src.data.storage import FrameStore, DEFAULT_FORMAT
 from src.models.trainer import ModelTrainer
+from src.models.pooled import POOLED_NAME, PanelEncoder, stack_panel
 from src.models.registry import ModelRegistry
+from src.models.tuning import load_best_params
+from src.models.walk_forward import WalkForwardConfig, WalkForwardTrainer
+from src.utils.config_loader import ModelConfig, load_typed
 
 class TrainPipeline:
-    def __init__(self, dataset_dir="data/datasets", model_dir="models"):
+    def __init__(self, dataset_dir="data/datasets", model_dir="models", storage_format=DEFAULT_FORMAT,
+                 model_config="config/model.yaml", n_jobs=None, predictions_dir="data/predictions",
+                 tuning_dir="models/tuning"):
         self.dataset_dir = Path(dataset_dir)
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(exist_ok=True)
+        self.dataset_store = FrameStore(self.dataset_dir, storage_format)
+        self.predictions_store = FrameStore(predictions_dir, storage_format)
+        self.tuning_dir = Path(tuning_dir)
+        self.model_config = model_config
+        self.n_jobs = n_jobs
 
-    def run_for_ticker(self, ticker):
-        dataset_path = self.dataset_dir / f"{ticker}.csv"
-        df = pd.read_csv(dataset_path, index_col=0, parse_dates=True)
+        self.settings = load_typed(model_config, ModelConfig)
+        self.artifact_format = self.settings.artifact_format
+        # Built once and shared by every ticker instead of rereading the config per ticker
+        self.trainer = ModelTrainer(model_config, n_jobs=n_jobs)
+
+        wf = self.settings.walk_forward
+        self.walk_forward = WalkForwardConfig.from_dict(wf) if wf.get("enabled", False) else None
+
+        # One model for the whole universe instead of one per ticker
+        self.pooled = self.settings.pooled
 
+    def meta(self) -> dict:
+        """Registry metadata tying a saved model to the model config that trained it."""
+        return {"config_hash": self.settings.hash}
+
+    def train_frame(self, df: pd.DataFrame, params=None):
+        """Fits a model on an in-memory dataset and returns `(model, metrics)`."""
         X = df.drop("target", axis=1)
         y = df["target"]
 
-        trainer = ModelTrainer()
-        model, metrics = trainer.train(X, y)
+        return self.trainer.train(X, y, params)
 
-        registry = ModelRegistry(self.model_dir)
-        saved_path = registry.save_model(model, f"{ticker}.pkl")
+    def walk_forward_frame(self, df: pd.DataFrame, config: WalkForwardConfig | None = None, params=None):
+        """Walk-forward trains on an in-memory dataset; returns a WalkForwardResult."""
+        X = df.drop("target", axis=1)
+        y = df["target"]
+
+        config = config or self.walk_forward or WalkForwardConfig()
+        return WalkForwardTrainer(self.trainer, config, params).run(X, y)
+
+    def run_for_ticker(self, ticker):
+        df = self.dataset_store.read(ticker)
+        # Parameters found by the tuner for this ticker, if it has been tuned
+        params = load_best_params(self.tuning_dir / f"{ticker}.json")
+
+        if self.walk_forward is not None:
+            result = self.walk_forward_frame(df, params=params)
+            model, metrics = result.model, result.metrics
+            # Out-of-sample predictions for the backtester
+            self.predictions_store.write(ticker, result.to_frame())
+            print(result.summary())
+        else:
+            model, metrics = self.train_frame(df, params)
+            # In-sample model: drop stale walk-forward predictions so the backtest uses the model
+            self.predictions_store.delete(ticker)
+
+        registry = ModelRegistry(self.model_dir, artifact_format=self.artifact_format)
+        saved_path = registry.save_model(model, f"{ticker}.pkl", metrics=metrics, meta=self.meta())
 
         print(f"\nModel trained for {ticker}")
         print("Saved to:", saved_path)
         print("Metrics:", metrics)
 
+    def run_pooled(self, tickers=None):
+        """Trains a single model on all tickers' datasets stacked into one panel."""
+        tickers = list(tickers or self.dataset_store.names())
+        encoder = PanelEncoder(
+            tickers,
+            sectors=dict(self.pooled.get("sectors") or {}),
+            encode_ticker=self.pooled.get("encode_ticker", True),
+            encode_sector=self.pooled.get("encode_sector", True),
+        )
+        panel = stack_panel({t: self.dataset_store.read(t) for t in tickers}, encoder)
+        params = load_best_params(self.tuning_dir / f"{POOLED_NAME}.json")
+
+        # A shuffled split would mix later dates of one ticker into training for earlier dates of another
+        model, metrics = self.trainer.train(panel.X, panel.y, params, shuffle=False)
+
+        registry = ModelRegistry(self.model_dir, artifact_format=self.artifact_format)
+        saved_path = registry.save_model(
+            model, f"{POOLED_NAME}.pkl", metrics=metrics, features=panel.columns,
+            meta={**encoder.to_meta(), **self.meta()},
+        )
+
+        print(f"\nPooled model trained on {len(tickers)} tickers ({panel.X.shape[0]} rows)")
+        print("Saved to:", saved_path)
+        print("Metrics:", metrics)
+        return model, metrics
+
     def run_all(self):
-        for file in self.dataset_dir.glob("*.csv"):
-            ticker = file.stem
+        if self.pooled.get("enabled", False):
+            self.run_pooled()
+            return
+        for ticker in self.dataset_store.names():
             self.run_for_ticker(ticker)
 
 
@@ -1,3 +1,376 @@
-import yaml
+"""
+Shared YAML config loading.
+
+Each file is parsed once per process and memoized; a cached entry is
+dropped when the file's mtime, size or inode changes, so edits are picked
+up without restarting. `load_config` returns a private copy of the parsed
+dict (callers may mutate it); `load_typed` validates the file into one of
+the frozen, slotted config classes below and shares the instance.
+
+Typed configs are shared by every caller, so their mapping fields are
+read-only views (`MappingProxyType`, lists become tuples). Every typed
+config has a `hash` that caches and the model registry use to tell which
+configuration produced an output; for a config loaded from a file it is
+the file's `file_hash`.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields, is_dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
+
+import yaml
+
+from src.data.storage import DEFAULT_FORMAT, SUFFIXES
+
+T = TypeVar("T")
+
+PROVIDERS = ("yfinance", "synthetic")
+TARGET_TYPES = ("future_return", "direction", "multi_class")
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def plain(value):
+    """Mutable dict/list copy of a typed config or one of its read-only fields."""
+    if is_dataclass(value):
+        return {f.name: plain(getattr(value, f.name)) for f in fields(value) if f.name != "source_hash"}
+    if isinstance(value, Mapping):
+        return {k: plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    return value
+
+
+def config_hash(config: Any) -> str:
+    """Order-independent digest of a config mapping or dataclass."""
+    raw = json.dumps(plain(config), sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _digest(config) -> str:
+    return config.source_hash or config_hash(config)
+
+
+def _rebuild(cls, state: dict):
+    return cls(**{k: _freeze(v) if isinstance(v, dict) else v for k, v in state.items()})
+
+
+class _Shared:
+    """Base of the typed configs returned by `load_typed`."""
+    __slots__ = ()
+
+    @property
+    def hash(self) -> str:
+        return _digest(self)
+
+    # Configs are pickled into worker processes (e.g. with a ModelTrainer);
+    # mapping fields travel as dicts and are frozen again on load
+    def __reduce__(self):
+        state = {f.name: getattr(self, f.name) for f in fields(self)}
+        return _rebuild, (type(self), {k: plain(v) if isinstance(v, Mapping) else v for k, v in state.items()})
+
+
+def _check(ok: bool, where: str, message: str):
+    if not ok:
+        raise ConfigError(f"{where}: {message}")
+
+
+def _int(raw: dict, key: str, default, where: str, minimum: Optional[int] = None, optional: bool = False):
+    value = raw.get(key, default)
+    if value is None and optional:
+        return None
+    _check(isinstance(value, int) and not isinstance(value, bool), where, f"{key} must be an integer, got {value!r}")
+    if minimum is not None:
+        _check(value >= minimum, where, f"{key} must be >= {minimum}, got {value}")
+    return value
+
+
+def _float(raw: dict, key: str, default, where: str, minimum: Optional[float] = None) -> float:
+    value = raw.get(key, default)
+    _check(isinstance(value, (int, float)) and not isinstance(value, bool), where,
+           f"{key} must be a number, got {value!r}")
+    if minimum is not None:
+        _check(value >= minimum, where, f"{key} must be >= {minimum}, got {value}")
+    return float(value)
+
+
+def _bool(raw: dict, key: str, default: bool, where: str) -> bool:
+    value = raw.get(key, default)
+    _check(isinstance(value, bool), where, f"{key} must be true or false, got {value!r}")
+    return value
+
+
+def _choice(raw: dict, key: str, default, choices, where: str):
+    value = raw.get(key, default)
+    _check(value in choices, where, f"{key} must be one of {list(choices)}, got {value!r}")
+    return value
+
+
+def _section(raw: dict, key: str, where: str) -> dict:
+    value = raw.get(key) or {}
+    _check(isinstance(value, dict), where, f"{key} must be a mapping")
+    return value
+
+
+def _frozen_section(raw: dict, key: str, where: str) -> Mapping:
+    # Read-only, so no caller can change the cached parse or another caller's config
+    return _freeze(_section(raw, key, where))
+
+
+def _windows(raw: dict, key: str, where: str) -> Tuple[int, ...]:
+    values = raw.get(key) or []
+    _check(isinstance(values, list), where, f"{key} must be a list of windows")
+    return tuple(_int({key: v}, key, None, where, minimum=1) for v in values)
+
+
+def _enabled_window(raw: dict, key: str, where: str) -> Optional[int]:
+    section = _section(raw, key, where)
+    if not section.get("enabled", False):
+        return None
+    return _int(section, "window", None, f"{where}.{key}", minimum=1)
+
+
+@dataclass(frozen=True, slots=True)
+class FetchConfig:
+    workers: int = 1
+    retries: int = 0
+    backoff: float = 1.0
+    batch_size: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CleaningConfig:
+    remove_duplicates: bool = True
+    dropna: bool = False
+    forward_fill: bool = False
+    float32: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class DataConfig(_Shared):
+    tickers: Tuple[str, ...] = ()
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    output_dir: str = "data/raw"
+    incremental: bool = False
+    provider: str = "yfinance"
+    storage_format: str = DEFAULT_FORMAT
+    fetch: FetchConfig = field(default_factory=FetchConfig)
+    cleaning: CleaningConfig = field(default_factory=CleaningConfig)
+    chunk_rows: Optional[int] = None
+    synthetic: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    # Digest of the mapping the config was parsed from (its file's `file_hash`)
+    source_hash: Optional[str] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, raw: dict, where: str = "data config") -> "DataConfig":
+        tickers = raw.get("tickers") or []
+        _check(isinstance(tickers, list) and all(isinstance(t, str) for t in tickers), where,
+               "tickers must be a list of symbols")
+        fetch = _section(raw, "fetch", where)
+        cleaning = _section(raw, "cleaning", where)
+        storage = _section(raw, "storage", where)
+        preprocess = _section(raw, "preprocess", where)
+        return cls(
+            tickers=tuple(tickers),
+            start_date=None if raw.get("start_date") is None else str(raw["start_date"]),
+            end_date=None if raw.get("end_date") is None else str(raw["end_date"]),
+            output_dir=str(raw.get("output_dir", "data/raw")),
+            incremental=_bool(raw, "incremental", False, where),
+            provider=_choice(raw, "provider", "yfinance", PROVIDERS, where),
+            storage_format=_choice(storage, "format", DEFAULT_FORMAT, SUFFIXES, f"{where}.storage"),
+            fetch=FetchConfig(
+                workers=_int(fetch, "workers", 1, f"{where}.fetch", minimum=1),
+                retries=_int(fetch, "retries", 0, f"{where}.fetch", minimum=0),
+                backoff=_float(fetch, "backoff", 1.0, f"{where}.fetch", minimum=0),
+                batch_size=_int(fetch, "batch_size", 1, f"{where}.fetch", minimum=1),
+            ),
+            cleaning=CleaningConfig(**{
+                f.name: _bool(cleaning, f.name, f.default, f"{where}.cleaning") for f in fields(CleaningConfig)
+            }),
+            chunk_rows=_int(preprocess, "chunk_rows", None, f"{where}.preprocess", minimum=1, optional=True),
+            synthetic=_frozen_section(raw, "synthetic", where),
+            source_hash=config_hash(raw),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FeatureConfig(_Shared):
+    sma: Tuple[int, ...] = ()
+    ema: Tuple[int, ...] = ()
+    rsi: Optional[int] = None
+    bollinger: Optional[Tuple[int, float]] = None
+    returns: bool = False
+    log_returns: bool = False
+    volatility: Optional[int] = None
+    jit: bool = True
+    panel: bool = False
+    incremental: bool = False
+    cache: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    # Digest of the mapping the config was parsed from (its file's `file_hash`)
+    source_hash: Optional[str] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, raw: dict, where: str = "features config") -> "FeatureConfig":
+        bollinger = _section(raw, "bollinger", where)
+        return cls(
+            sma=_windows(raw, "sma", where),
+            ema=_windows(raw, "ema", where),
+            rsi=_enabled_window(raw, "rsi", where),
+            bollinger=(
+                (_int(bollinger, "window", None, f"{where}.bollinger", minimum=1),
+                 _float(bollinger, "num_std", None, f"{where}.bollinger", minimum=0))
+                if bollinger.get("enabled", False) else None
+            ),
+            returns=bool(_section(raw, "returns", where).get("enabled", False)),
+            log_returns=bool(_section(raw, "log_returns", where).get("enabled", False)),
+            volatility=_enabled_window(raw, "rolling_volatility", where),
+            jit=_bool(raw, "jit", True, where),
+            panel=_bool(raw, "panel", False, where),
+            incremental=_bool(raw, "incremental", False, where),
+            cache=_frozen_section(raw, "cache", where),
+            source_hash=config_hash(raw),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TrainingConfig(_Shared):
+    target_type: str = "future_return"
+    horizon: int = 5
+    # Digest of the mapping the config was parsed from (its file's `file_hash`)
+    source_hash: Optional[str] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, raw: dict, where: str = "training config") -> "TrainingConfig":
+        target = _section(raw, "target", where)
+        _check(bool(target), where, "a target section is required")
+        return cls(
+            target_type=_choice(target, "type", None, TARGET_TYPES, f"{where}.target"),
+            horizon=_int(target, "horizon", None, f"{where}.target", minimum=1),
+            source_hash=config_hash(raw),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ModelConfig(_Shared):
+    model: str = "RandomForest"
+    task: str = "classification"
+    test_size: float = 0.2
+    shuffle: bool = True
+    random_state: int = 42
+    n_jobs: int = -1
+    n_estimators: int = 200
+    params: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    artifact_format: str = "pickle"
+    walk_forward: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    pooled: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    # Digest of the mapping the config was parsed from (its file's `file_hash`)
+    source_hash: Optional[str] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, raw: dict, where: str = "model config") -> "ModelConfig":
+        from src.models.registry import ARTIFACT_FORMATS
+        from src.models.trainer import ESTIMATORS
+
+        test_size = _float(raw, "test_size", 0.2, where)
+        _check(0 < test_size < 1, where, f"test_size must be between 0 and 1, got {test_size}")
+        return cls(
+            model=_choice(raw, "model", "RandomForest", sorted({m for m, _ in ESTIMATORS}), where),
+            task=_choice(raw, "task", "classification", sorted({t for _, t in ESTIMATORS}), where),
+            test_size=test_size,
+            shuffle=_bool(raw, "shuffle", True, where),
+            random_state=_int(raw, "random_state", 42, where),
+            n_jobs=_int(raw, "n_jobs", -1, where),
+            n_estimators=_int(raw, "n_estimators", 200, where, minimum=1),
+            params=_frozen_section(raw, "params", where),
+            artifact_format=_choice(raw, "artifact_format", "pickle", ARTIFACT_FORMATS, where),
+            walk_forward=_frozen_section(raw, "walk_forward", where),
+            pooled=_frozen_section(raw, "pooled", where),
+            source_hash=config_hash(raw),
+        )
+
+
+_lock = threading.Lock()
+_parsed: Dict[Path, Tuple[tuple, dict]] = {}
+_typed: Dict[Tuple[Path, type], Tuple[tuple, Any]] = {}
+_hashes: Dict[Path, Tuple[tuple, str]] = {}
+stats = {"parses": 0, "hits": 0}
+
+
+def _stamp(path: Path) -> tuple:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _load(path) -> Tuple[Path, tuple, dict]:
+    path = Path(path).resolve()
+    stamp = _stamp(path)
+    with _lock:
+        cached = _parsed.get(path)
+        if cached is not None and cached[0] == stamp:
+            stats["hits"] += 1
+            return path, stamp, cached[1]
+
+    with open(path, "r") as f:
+        config = yaml.safe_load(f) or {}
+    if not isinstance(config, dict):
+        raise ConfigError(f"{path}: expected a mapping at the top level")
+    with _lock:
+        stats["parses"] += 1
+        _parsed[path] = (stamp, config)
+    return path, stamp, config
+
+
+def load_config(path) -> dict:
+    """The parsed YAML mapping at `path`; a copy the caller is free to modify."""
+    return copy.deepcopy(_load(path)[2])
+
+
+def load_typed(path, cls: Type[T]) -> T:
+    """`path` validated into `cls` (e.g. `ModelConfig`); raises ConfigError naming the file and field."""
+    path, stamp, raw = _load(path)
+    key = (path, cls)
+    with _lock:
+        cached = _typed.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    config = cls.from_dict(raw, where=str(path))
+    with _lock:
+        _typed[key] = (stamp, config)
+    return config
+
+
+def file_hash(path) -> str:
+    """`config_hash` of the file's parsed contents, recomputed only when the file changes."""
+    path, stamp, raw = _load(path)
+    with _lock:
+        cached = _hashes.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    digest = config_hash(raw)
+    with _lock:
+        _hashes[path] = (stamp, digest)
+    return digest
+
 
+def clear_cache():
+    with _lock:
+        _parsed.clear()
+        _typed.clear()
+        _hashes.clear()
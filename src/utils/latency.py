@@ -0,0 +1,68 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class LatencyRecorder:
+    """
+    Records durations into a fixed-size ring buffer and reports percentiles.
+
+    Recording is one array store under a lock, so it is cheap enough to sit
+    on the per-request path. Only the most recent `capacity` samples are kept
+    (a few thousand resolve p99 well); the buffer is allocated on the first
+    sample, so recorders that are never used cost nothing.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.samples: Optional[np.ndarray] = None
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record_ns(self, ns: int):
+        with self._lock:
+            if self.samples is None:
+                self.samples = np.zeros(self.capacity, dtype=np.int64)
+            self.samples[self.count % self.capacity] = ns
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_ns(time.perf_counter_ns() - started)
+
+    def values_ms(self) -> np.ndarray:
+        with self._lock:
+            if self.samples is None:
+                return np.empty(0)
+            return self.samples[: min(self.count, self.capacity)] / 1e6
+
+    def percentiles(self) -> Dict[str, float]:
+        values = self.values_ms()
+        if not len(values):
+            return {"count": 0}
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        return {
+            "count": int(self.count),
+            "p50_ms": float(p50),
+            "p90_ms": float(p90),
+            "p99_ms": float(p99),
+            "max_ms": float(values.max()),
+        }
+
+    def histogram(self, edges_ms=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)) -> Dict[str, int]:
+        values = self.values_ms()
+        edges = [0.0, *edges_ms, np.inf]
+        counts, _ = np.histogram(values, bins=edges)
+        labels = [f"<={e}ms" for e in edges_ms] + [f">{edges_ms[-1]}ms"]
+        return dict(zip(labels, counts.astype(int).tolist()))
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
@@ -1,37 +1,190 @@
+"""
+Non-blocking logging.
+
+`get_logger(name)` configures a logger once: later calls with the same name
+return it unchanged instead of stacking another pair of handlers. The
+logger itself only has a `QueueHandler`, so a logging call on the caller's
+thread is a message format and a queue put; a `QueueListener` thread does
+the formatting, file and console writes. Library modules log to
+`logging.getLogger(__name__)`, so configuring a package prefix (e.g.
+`get_logger("src")`) captures everything below it.
+
+Per-tick debug events go through a `RateLimiter` (check `allow()` before
+building the message) or a `RateLimitFilter`, so a burst of identical
+records costs one token-bucket check each instead of a write.
+"""
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+CONSOLE_FORMAT = "%(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, any `extra` fields and the exception."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                out[key] = value
+        if record.exc_info:
+            out["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Only merges the message arguments on the caller's thread; exceptions
+    and the output format are rendered by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class RateLimiter:
+    """
+    Token bucket per key: `burst` events at once, refilled at `rate` per
+    second. `suppressed[key]` counts what was dropped since the key last
+    got through.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.suppressed: Dict[str, int] = {}
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
 
-def get_logger(name: str, log_dir: str = "logs") -> logging.Logger:
+    def allow(self, key: str = "") -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return True
+            self._buckets[key] = (tokens, now)
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False
+
+    def take_suppressed(self, key: str = "") -> int:
+        with self._lock:
+            return self.suppressed.pop(key, 0)
+
+
+class RateLimitFilter(logging.Filter):
     """
-    Creates a logger that writes to both console and a file.
+    Rate-limits records at or below `level` per message template; records
+    that get through note how many similar ones were dropped before them.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 5, level: int = logging.DEBUG):
+        super().__init__()
+        self.level = level
+        self.limiter = RateLimiter(rate, burst)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level:
+            return True
+        key = f"{record.name}:{record.msg}"
+        if not self.limiter.allow(key):
+            return False
+        dropped = self.limiter.take_suppressed(key)
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar suppressed)"
+        return True
+
+
+_lock = threading.Lock()
+_listeners: Dict[str, QueueListener] = {}
+
+
+def get_logger(
+    name: str,
+    log_dir: str = "logs",
+    json_format: bool = False,
+    level: int = logging.DEBUG,
+    console_level: int = logging.INFO,
+    debug_rate: Optional[float] = None,
+) -> logging.Logger:
+    """
+    Returns the logger `name`, writing to `{log_dir}/{name}.log` and the
+    console through a background listener. Only the first call for a name
+    configures it.
 
     Args:
         name (str): Name of the logger.
         log_dir (str): Directory where log files will be stored.
+        json_format (bool): Write one JSON object per line instead of text.
+        level (int): Level of the logger and its file output.
+        console_level (int): Level of the console output.
+        debug_rate (float): If set, at most this many DEBUG records per second per message template.
 
     Returns:
         logging.Logger: Configured logger instance.
     """
-    # Ensure log directory exists
-    Path(log_dir).mkdir(parents=True, exist_ok=True)
-
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+    with _lock:
+        if name in _listeners:
+            return logger
+
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+
+        file_handler = logging.FileHandler(f"{log_dir}/{name}.log")
+        file_handler.setLevel(level)
+        file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(console_level)
+        console_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(CONSOLE_FORMAT))
+
+        records: "queue.SimpleQueue" = queue.SimpleQueue()
+        listener = QueueListener(records, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+
+        handler = _DeferredQueueHandler(records)
+        if debug_rate is not None:
+            # On the handler rather than the logger, so records from child loggers are limited too
+            handler.addFilter(RateLimitFilter(rate=debug_rate, burst=max(1, int(debug_rate))))
+        logger.setLevel(level)
+        logger.addHandler(handler)
+        # Parent handlers would write every record a second time
+        logger.propagate = False
+        _listeners[name] = listener
+    return logger
 
-    # File handler
-    file_handler = logging.FileHandler(f"{log_dir}/{name}.log")
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(file_formatter)
 
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
-    console_handler.setFormatter(console_formatter)
+def shutdown_logging():
+    """Writes out everything still queued and closes the handlers; runs at exit."""
+    with _lock:
+        for name, listener in _listeners.items():
+            listener.stop()
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                if isinstance(handler, _DeferredQueueHandler):
+                    logger.removeHandler(handler)
+            for handler in listener.handlers:
+                handler.close()
+        _listeners.clear()
 
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
 
-    return logger
\ No newline at end of file
+atexit.register(shutdown_logging)
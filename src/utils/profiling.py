@@ -0,0 +1,403 @@
+"""
+Lightweight timing, counting and memory instrumentation for pipeline stages.
+
+Code is instrumented with `stage()`:
+
+    with stage("DataPreprocessor.clean") as s:
+        df = ...
+        s.count(df)  # rows and bytes processed
+
+Nothing is recorded until a `Profiler` is enabled (`enable()` or the
+`profile_run()` context manager). While disabled, `stage()` is one global
+lookup and returns a shared no-op object, so instrumentation can sit on hot
+paths such as `ModelPredictor.predict`.
+
+While enabled, each stage accumulates calls, wall time (total/min/max), rows
+and bytes, and the peak resident memory seen while it was open (sampled by a
+background thread and at stage boundaries). `Profiler.report()` returns the
+whole run as a JSON-serializable dict. One stage can additionally be run
+under cProfile (or pyinstrument, when installed), dumped once per call.
+
+The profiler is per process: a forked worker starts with profiling off.
+`PipelineExecutor` profiles each worker's tickers with the parent's
+settings and folds the reports back with `Profiler.merge()`. CLIs expose
+the switch with `add_arguments()` and `run_with_profile()`.
+"""
+import contextlib
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # pragma: no cover - non-POSIX
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to the process high-water mark where /proc is missing."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def size_of(obj) -> tuple:
+    """(rows, bytes) of a frame, series or array; (0, 0) for anything else."""
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(index=False).sum())
+    if isinstance(obj, pd.Series):
+        return len(obj), int(obj.memory_usage(index=False))
+    if isinstance(obj, np.ndarray):
+        return (obj.shape[0] if obj.ndim else 1), int(obj.nbytes)
+    return 0, 0
+
+
+class StageStats:
+    __slots__ = ("calls", "total_s", "min_s", "max_s", "rows", "bytes", "peak_rss")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_s = 0.0
+        self.min_s = float("inf")
+        self.max_s = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.peak_rss = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "calls": self.calls,
+            "total_s": self.total_s,
+            "mean_ms": self.total_s / self.calls * 1e3 if self.calls else 0.0,
+            "min_ms": self.min_s * 1e3 if self.calls else 0.0,
+            "max_ms": self.max_s * 1e3,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "peak_rss_mb": self.peak_rss / 2**20,
+        }
+        if self.rows and self.total_s > 0:
+            out["rows_per_s"] = self.rows / self.total_s
+        return out
+
+
+class _NullStage:
+    """What `stage()` returns while profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, obj=None, rows: int = 0, nbytes: int = 0):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "rows", "nbytes", "started", "_dump")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.rows = 0
+        self.nbytes = 0
+        self._dump = None
+
+    def count(self, obj=None, rows: int = 0, nbytes: int = 0):
+        """Adds `obj`'s size (see `size_of`) and/or explicit rows and bytes to the stage."""
+        if obj is not None:
+            r, b = size_of(obj)
+            rows, nbytes = rows + r, nbytes + b
+        self.rows += rows
+        self.nbytes += nbytes
+
+    def __enter__(self):
+        self.profiler._open(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        self.profiler._close(self, elapsed)
+        return False
+
+
+class Profiler:
+    def __init__(
+        self,
+        sample_interval: Optional[float] = 0.05,
+        profile_stage: Optional[str] = None,
+        profiler: str = "cprofile",
+        profile_dir: str = "logs/profiles",
+    ):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {profiler} (expected one of {PROFILERS})")
+        self.sample_interval = sample_interval
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.profile_dir = Path(profile_dir)
+
+        self.run_id = uuid.uuid4().hex[:12]
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, float] = {}
+        self.dumps = []
+        self.peak_rss = 0
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._stopped: Optional[float] = None
+        self._lock = threading.Lock()
+        self._open_stages: Dict[int, _Stage] = {}
+        self._profiling = False
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    # -- sampling -----------------------------------------------------------------
+
+    def _sample(self):
+        rss = rss_bytes()
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            for s in self._open_stages.values():
+                stats = self.stages[s.name]
+                stats.peak_rss = max(stats.peak_rss, rss)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self._sample()
+
+    def start(self):
+        if self.sample_interval and self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+        self._sample()
+        return self
+
+    def settings(self) -> Dict[str, Any]:
+        """Constructor arguments for an equivalent profiler, e.g. in a worker process."""
+        return {"sample_interval": self.sample_interval, "profile_stage": self.profile_stage,
+                "profiler": self.profiler, "profile_dir": str(self.profile_dir)}
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        self._sample()
+        self._stopped = time.perf_counter()
+
+    # -- stages -------------------------------------------------------------------
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _open(self, s: _Stage):
+        with self._lock:
+            if s.name not in self.stages:
+                self.stages[s.name] = StageStats()
+            self._open_stages[id(s)] = s
+            # cProfile is per thread; only one dump runs at a time
+            profile = s.name == self.profile_stage and not self._profiling
+            if profile:
+                self._profiling = True
+        if profile:
+            s._dump = self._start_dump()
+
+    def _close(self, s: _Stage, elapsed: float):
+        if s._dump is not None:
+            self._finish_dump(s)
+        self._sample()
+        with self._lock:
+            del self._open_stages[id(s)]
+            stats = self.stages[s.name]
+            stats.calls += 1
+            stats.total_s += elapsed
+            stats.min_s = min(stats.min_s, elapsed)
+            stats.max_s = max(stats.max_s, elapsed)
+            stats.rows += s.rows
+            stats.bytes += s.nbytes
+
+    def _start_dump(self):
+        if self.profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler as Instrument
+            except ImportError:
+                raise RuntimeError("profiler='pyinstrument' requires the pyinstrument package")
+            dump = Instrument()
+            dump.start()
+        else:
+            import cProfile
+
+            dump = cProfile.Profile()
+            dump.enable()
+        return dump
+
+    def _finish_dump(self, s: _Stage):
+        dump, s._dump = s._dump, None
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.run_id}_{s.name.replace('/', '_')}_{len(self.dumps)}"
+        if self.profiler == "pyinstrument":
+            dump.stop()
+            path = self.profile_dir / f"{stem}.html"
+            path.write_text(dump.output_html())
+        else:
+            dump.disable()
+            path = self.profile_dir / f"{stem}.prof"
+            dump.dump_stats(str(path))
+        with self._lock:
+            self.dumps.append(str(path))
+            self._profiling = False
+
+    def merge(self, report: Dict[str, Any]):
+        """
+        Folds another profiler's `report()` (e.g. a worker process's) into
+        this one. Peak RSS stays a per-process figure: the largest seen.
+        """
+        with self._lock:
+            for name, other in report["stages"].items():
+                stats = self.stages.setdefault(name, StageStats())
+                stats.calls += other["calls"]
+                stats.total_s += other["total_s"]
+                if other["calls"]:
+                    stats.min_s = min(stats.min_s, other["min_ms"] / 1e3)
+                stats.max_s = max(stats.max_s, other["max_ms"] / 1e3)
+                stats.rows += other["rows"]
+                stats.bytes += other["bytes"]
+                stats.peak_rss = max(stats.peak_rss, int(other["peak_rss_mb"] * 2**20))
+            for name, value in report["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            self.dumps.extend(report["profiles"])
+            self.peak_rss = max(self.peak_rss, int(report["peak_rss_mb"] * 2**20))
+
+    # -- reporting ----------------------------------------------------------------
+
+    def report(self) -> Dict[str, Any]:
+        end = self._stopped if self._stopped is not None else time.perf_counter()
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "wall_s": end - self._started,
+                "peak_rss_mb": self.peak_rss / 2**20,
+                "stages": {name: stats.to_dict() for name, stats in sorted(self.stages.items())},
+                "counters": dict(self.counters),
+                "profiles": list(self.dumps),
+            }
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = [f"run {report['run_id']}: {report['wall_s']:.2f}s, peak RSS {report['peak_rss_mb']:.0f} MB",
+                 f"{'stage':<40}{'calls':>7}{'total_s':>10}{'mean_ms':>10}{'rows':>12}"]
+        for name, s in sorted(report["stages"].items(), key=lambda kv: -kv[1]["total_s"]):
+            lines.append(f"{name:<40}{s['calls']:>7}{s['total_s']:>10.3f}{s['mean_ms']:>10.3f}{s['rows']:>12}")
+        return "\n".join(lines)
+
+
+_active: Optional[Profiler] = None
+
+
+def active() -> Optional[Profiler]:
+    return _active
+
+
+def _forget_inherited():
+    # A forked child gets a copy of the parent's profiler without its sampler
+    # thread (and possibly with its lock held); what it recorded would be lost
+    global _active
+    _active = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_inherited)
+
+
+def stage(name: str):
+    """Times the enclosed block as `name` on the active profiler; a no-op when none is enabled."""
+    profiler = _active
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name)
+
+
+def count(name: str, value: float = 1):
+    """Adds `value` to a run-level counter when profiling is enabled."""
+    profiler = _active
+    if profiler is not None:
+        profiler.count(name, value)
+
+
+def enable(**kwargs) -> Profiler:
+    global _active
+    if _active is not None:
+        _active.stop()
+    _active = Profiler(**kwargs).start()
+    return _active
+
+
+def disable() -> Optional[Profiler]:
+    """Stops and returns the active profiler."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+@contextlib.contextmanager
+def profile_run(report_path=None, **kwargs):
+    """Enables profiling for the block; writes the JSON report to `report_path` afterwards."""
+    profiler = enable(**kwargs)
+    try:
+        yield profiler
+    finally:
+        disable()
+        if report_path is not None:
+            path = profiler.save(report_path)
+            print(f"Profile report saved: {path}")
+
+
+def add_arguments(parser):
+    """The `--profile` / `--profile-stage` switches shared by the pipeline CLIs."""
+    parser.add_argument("--profile", default=None, metavar="REPORT.json", help="write a per-stage timing report")
+    parser.add_argument("--profile-stage", default=None,
+                        help="also dump a cProfile of this stage, e.g. ModelPredictor.predict")
+
+
+def run_with_profile(args, fn: Callable[[], Any]):
+    """Runs `fn()`, profiled when `--profile` or `--profile-stage` was given."""
+    if args.profile is None and args.profile_stage is None:
+        return fn()
+    with profile_run(args.profile, profile_stage=args.profile_stage) as profiler:
+        result = fn()
+    print(profiler.summary())
+    return result
@@ -0,0 +1,234 @@
+"""
+Experiment tracking sinks.
+
+Runs are logged through a sink instead of the fluent `mlflow` API:
+
+- `off`: nothing is recorded.
+- `sync`: each run is written when it is logged.
+- `async`: runs are queued and written in batches by a background thread,
+  so the caller never waits on the tracking store; `flush()` blocks until
+  everything queued so far has been written.
+
+A run's params, metrics and tags go out in a single `log_batch` call.
+Artifact frames are written as compressed Parquet (gzip CSV without
+pyarrow) to a temporary directory that is uploaded in one call and then
+removed, so nothing is left in the working directory.
+"""
+import atexit
+import queue
+import tempfile
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pyarrow = None
+
+MODES = ("off", "sync", "async")
+
+
+@dataclass
+class RunRecord:
+    name: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    metrics: Dict[str, float] = field(default_factory=dict)
+    artifacts: Dict[str, pd.DataFrame] = field(default_factory=dict)  # file stem -> frame
+    tags: Dict[str, str] = field(default_factory=dict)
+
+
+def write_artifact(frame: pd.DataFrame, directory: Path, stem: str) -> Path:
+    if pyarrow is not None:
+        path = directory / f"{stem}.parquet"
+        frame.to_parquet(path, compression="zstd")
+    else:
+        path = directory / f"{stem}.csv.gz"
+        frame.to_csv(path, compression="gzip")
+    return path
+
+
+class TrackingSink:
+    """Base sink: records nothing. Subclasses write `RunRecord`s to MLflow."""
+
+    mode = "off"
+
+    def __init__(self, client=None, experiment: Optional[str] = None):
+        self._client = client
+        self.experiment = experiment
+        self._experiment_id: Optional[str] = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from mlflow.tracking import MlflowClient
+
+            self._client = MlflowClient()
+        return self._client
+
+    def log_run(self, name: str, params: Optional[Dict[str, Any]] = None,
+                metrics: Optional[Dict[str, float]] = None,
+                artifacts: Optional[Dict[str, pd.DataFrame]] = None,
+                tags: Optional[Dict[str, str]] = None):
+        self._submit(RunRecord(
+            name, dict(params or {}), dict(metrics or {}), dict(artifacts or {}), dict(tags or {})
+        ))
+
+    def _submit(self, record: RunRecord):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _resolve_experiment(self) -> str:
+        if self._experiment_id is None:
+            if self.experiment is None:
+                self._experiment_id = "0"  # MLflow's default experiment
+            else:
+                found = self.client.get_experiment_by_name(self.experiment)
+                self._experiment_id = (
+                    found.experiment_id if found is not None else self.client.create_experiment(self.experiment)
+                )
+        return self._experiment_id
+
+    def _write(self, records: List[RunRecord]):
+        from mlflow.entities import Metric, Param, RunTag
+
+        client = self.client
+        experiment_id = self._resolve_experiment()
+        for record in records:
+            run_id = client.create_run(experiment_id, run_name=record.name).info.run_id
+            timestamp = int(time.time() * 1000)
+            client.log_batch(
+                run_id,
+                metrics=[Metric(k, float(v), timestamp, 0) for k, v in record.metrics.items()],
+                params=[Param(k, str(v)) for k, v in record.params.items()],
+                tags=[RunTag(k, str(v)) for k, v in record.tags.items()],
+            )
+            try:
+                if record.artifacts:
+                    with tempfile.TemporaryDirectory(prefix="tracking_") as tmp:
+                        for stem, frame in record.artifacts.items():
+                            write_artifact(frame, Path(tmp), stem)
+                        client.log_artifacts(run_id, tmp)
+            except Exception:
+                client.set_terminated(run_id, status="FAILED")
+                raise
+            client.set_terminated(run_id)
+
+
+class SyncSink(TrackingSink):
+    mode = "sync"
+
+    def _submit(self, record: RunRecord):
+        self._write([record])
+
+
+# Async sinks with a running writer; one exit hook writes out whatever they still hold
+_open_sinks: "weakref.WeakSet[AsyncBatchSink]" = weakref.WeakSet()
+
+
+def _close_open_sinks():
+    for sink in list(_open_sinks):
+        sink.close()
+
+
+atexit.register(_close_open_sinks)
+
+
+class AsyncBatchSink(TrackingSink):
+    """
+    Queues runs for a background writer thread, which writes them
+    `batch_size` at a time (bounding the artifacts held in memory) and on
+    `flush()`/`close()`. Write errors are kept in `errors` and reported
+    instead of interrupting the caller. Runs still queued at interpreter
+    exit are written, but process-pool workers exit without running exit
+    hooks: code running in one must `flush()` before returning.
+    """
+
+    mode = "async"
+    _STOP = object()
+
+    def __init__(self, client=None, experiment: Optional[str] = None, batch_size: int = 64):
+        super().__init__(client, experiment)
+        self.batch_size = batch_size
+        self.errors: List[Exception] = []
+        self.written = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                _open_sinks.add(self)
+                self._thread = threading.Thread(target=self._worker, name="tracking-sink", daemon=True)
+                self._thread.start()
+
+    def _submit(self, record: RunRecord):
+        self._ensure_thread()
+        self._queue.put(record)
+
+    def _drain(self, pending: List[RunRecord]):
+        if not pending:
+            return
+        for record in pending:
+            try:
+                self._write([record])
+                self.written += 1
+            except Exception as exc:  # tracking must not take the compute loop down
+                self.errors.append(exc)
+                print(f"[tracking] failed to write run {record.name}: {exc}")
+        pending.clear()
+
+    def _worker(self):
+        pending: List[RunRecord] = []
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._drain(pending)
+                return
+            if isinstance(item, threading.Event):
+                self._drain(pending)
+                item.set()
+                continue
+            pending.append(item)
+            if len(pending) >= self.batch_size:
+                self._drain(pending)
+
+    def flush(self):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        _open_sinks.discard(self)
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+
+def tracking_sink(mode: str = "sync", client=None, experiment: Optional[str] = None, **kwargs) -> TrackingSink:
+    if mode == "off":
+        return TrackingSink()
+    if mode == "sync":
+        return SyncSink(client, experiment)
+    if mode == "async":
+        return AsyncBatchSink(client, experiment, **kwargs)
+    raise ValueError(f"Unknown tracking mode: {mode} (expected one of {MODES})")
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import pytest
+
+from src.data.synthetic import generate_ohlcv
+
+CONFIG_DIR = Path(__file__).resolve().parents[1] / "config"
+
+
+def make_ohlcv(n_bars=300, seed=0, start="2020-01-01"):
+    return generate_ohlcv(n_bars, seed=seed, start=start)
+
+
+@pytest.fixture
+def ohlcv():
+    return make_ohlcv()
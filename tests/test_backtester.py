@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.backtester import METRICS, BacktestConfig, Backtester, config_grid
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2021-01-01", periods=250)
+    df = pd.DataFrame({"f": rng.normal(size=250), "target": rng.normal(0, 0.01, size=250)}, index=index)
+    preds = pd.Series(df["target"].to_numpy() + rng.normal(0, 0.01, size=250), index=index)
+    preds.iloc[[3, 40]] = np.nan
+    return df, preds
+
+
+def test_config_grid_is_cartesian():
+    grid = config_grid(BacktestConfig(max_leverage=2.0), cost_bps=[5, 10], threshold_long=[0.0, 1e-3, 2e-3])
+
+    assert len(grid) == 6
+    assert {(c.cost_bps, c.threshold_long) for c in grid} == {(c, t) for c in (5, 10) for t in (0.0, 1e-3, 2e-3)}
+    assert all(c.max_leverage == 2.0 and c.threshold_short == 0.0 for c in grid)
+
+
+@pytest.mark.parametrize("nan_target", [False, True])
+def test_grid_matches_single_runs(frame, nan_target):
+    df, preds = frame
+    if nan_target:
+        df.iloc[[10, 100], df.columns.get_loc("target")] = np.nan
+
+    grid = {"threshold_long": [-1e-3, 0.0, 5e-3], "threshold_short": [-5e-3, 0.0, 1e-3], "cost_bps": [0.0, 10.0]}
+    table = Backtester().run_grid(df, preds, grid, chunk_size=5)
+    assert len(table) == 18
+
+    for _, row in table.iterrows():
+        config = BacktestConfig(**row[["threshold_long", "threshold_short", "cost_bps", "max_leverage"]].to_dict())
+        backtester = Backtester(config)
+        expected = backtester._compute_metrics(backtester.simulate(df, preds))
+        np.testing.assert_allclose(row[list(METRICS)].to_numpy(dtype=float),
+                                   [expected[m] for m in METRICS], rtol=1e-10, atol=1e-15)
+
+
+def test_grid_accepts_config_list(frame):
+    df, preds = frame
+    configs = [BacktestConfig(cost_bps=5.0), BacktestConfig(threshold_long=1.0, threshold_short=-1.0)]
+
+    table = Backtester().run_grid(df, preds, configs)
+    assert table["cost_bps"].tolist() == [5.0, 10.0]
+    # Thresholds no prediction crosses: always flat
+    assert table.loc[1, "total_return"] == 0.0 and table.loc[1, "win_rate"] == 0.0
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from src.models import compiled
+from src.models.compiled import compile_model, fold_thresholds
+from src.models.predictor import ModelPredictor
+from src.models.registry import ModelRegistry
+from src.models.serving import ModelCache
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    # Mixed feature scales make the float32 rounding behind the scaler matter
+    X = pd.DataFrame(
+        rng.normal(size=(400, 6)) * [1e-3, 1.0, 50.0, 1e4, 0.3, 7.0] + [0.0, 5.0, -20.0, 1e5, 0.0, 1.0],
+        columns=[f"f{i}" for i in range(6)],
+    )
+    y = X["f0"] * 1e3 + X["f2"] / 50 + rng.normal(scale=0.1, size=len(X))
+    return X, y
+
+
+def _pipeline(estimator):
+    return Pipeline([("scaler", StandardScaler()), ("model", estimator)])
+
+
+def _inputs(X, model):
+    """Held-out rows, NaNs, and rows sitting exactly on (and just past) each folded split."""
+    rng = np.random.default_rng(1)
+    rows = X.sample(100, random_state=1).to_numpy() * rng.uniform(0.9, 1.1, size=(100, X.shape[1]))
+    rows[::5, 2] = np.nan
+
+    forest = compile_model(model)
+    internal = np.flatnonzero(forest.left != np.arange(len(forest.left)))
+    picked = rng.choice(internal, size=200, replace=False)
+    edges = np.repeat(X.median().to_numpy()[None, :], 400, axis=0)
+    edges[np.arange(200), forest.feature[picked]] = forest.threshold[picked]
+    edges[200 + np.arange(200), forest.feature[picked]] = np.nextafter(forest.threshold[picked], np.inf)
+    return np.vstack([rows, edges])
+
+
+@pytest.mark.parametrize("use_numba", [False, pytest.param(True, marks=pytest.mark.skipif(
+    compiled.numba is None, reason="numba not installed"))])
+def test_regressor_is_bit_identical(frame, use_numba):
+    X, y = frame
+    model = _pipeline(RandomForestRegressor(n_estimators=25, random_state=0, n_jobs=1)).fit(X, y)
+    inputs = _inputs(X, model)
+
+    forest = compile_model(model, use_numba=use_numba)
+    np.testing.assert_array_equal(forest.predict(inputs), model.predict(pd.DataFrame(inputs, columns=X.columns)))
+
+
+@pytest.mark.parametrize("use_numba", [False, pytest.param(True, marks=pytest.mark.skipif(
+    compiled.numba is None, reason="numba not installed"))])
+def test_classifier_is_bit_identical(frame, use_numba):
+    X, y = frame
+    labels = np.digitize(y, np.quantile(y, [0.33, 0.66]))
+    model = _pipeline(RandomForestClassifier(n_estimators=25, random_state=0, n_jobs=1)).fit(X, labels)
+    inputs = pd.DataFrame(_inputs(X, model), columns=X.columns)
+
+    forest = compile_model(model, use_numba=use_numba)
+    np.testing.assert_array_equal(forest.predict_proba(inputs.to_numpy()), model.predict_proba(inputs))
+    np.testing.assert_array_equal(forest.predict(inputs.to_numpy()), model.predict(inputs))
+
+
+def test_bare_forest_and_unsupported_steps(frame):
+    X, y = frame
+    forest = RandomForestRegressor(n_estimators=5, random_state=0, n_jobs=1).fit(X.to_numpy(), y)
+    np.testing.assert_array_equal(compile_model(forest).predict(X.to_numpy()), forest.predict(X.to_numpy()))
+
+    minmax = Pipeline([("scaler", MinMaxScaler()), ("model", RandomForestRegressor(n_estimators=2))]).fit(X, y)
+    with pytest.raises(ValueError):
+        compile_model(minmax)
+
+
+def test_bare_forest_matches_on_float32_split_boundaries(frame):
+    X, y = frame
+    forest = RandomForestRegressor(n_estimators=10, random_state=0, n_jobs=1).fit(X.to_numpy(), y)
+    trees = [e.tree_ for e in forest.estimators_]
+    splits = np.concatenate([np.c_[t.feature, t.threshold][t.children_left != -1] for t in trees])
+    feature, threshold = splits[:, 0].astype(int), splits[:, 1]
+
+    # The split value itself, its float64 neighbours and the float32 values around it
+    near32 = threshold.astype(np.float32)
+    candidates = [
+        threshold,
+        np.nextafter(threshold, -np.inf),
+        np.nextafter(threshold, np.inf),
+        near32.astype(np.float64),
+        np.nextafter(near32, np.float32(np.inf)).astype(np.float64),
+        (near32.astype(np.float64) + np.nextafter(near32, np.float32(np.inf)).astype(np.float64)) / 2,
+    ]
+    rows = []
+    for values in candidates:
+        block = np.repeat(X.median().to_numpy()[None, :], len(values), axis=0)
+        block[np.arange(len(values)), feature] = values
+        rows.append(block)
+    inputs = np.vstack(rows)
+
+    np.testing.assert_array_equal(compile_model(forest).predict(inputs), forest.predict(inputs))
+
+
+def test_fold_thresholds_is_tight():
+    mean = np.array([3.0, -1e5, 0.0])
+    scale = np.array([0.7, 3e4, 1e-6])
+    threshold = np.array([0.25, -1.5, 12.0])
+
+    folded = fold_thresholds(threshold, mean, scale)
+    scaled = lambda x: ((x - mean) / scale).astype(np.float32)
+    assert np.all(scaled(folded) <= threshold)
+    assert np.all(scaled(np.nextafter(folded, np.inf)) > threshold)
+
+
+def test_compiled_artifact_serves_from_registry(tmp_path, frame):
+    X, y = frame
+    model = _pipeline(RandomForestRegressor(n_estimators=10, random_state=0, n_jobs=1)).fit(X, y)
+    ModelRegistry(tmp_path, artifact_format="compiled").save_model(model, "AAPL.pkl")
+
+    predictor = ModelPredictor(str(tmp_path), ticker="AAPL", cache=ModelCache())
+    assert isinstance(predictor.model.threshold, np.memmap)
+    np.testing.assert_array_equal(predictor.predict(X[X.columns[::-1]]), model.predict(X))
@@ -0,0 +1,137 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.models.registry import ModelRegistry
+from src.models.trainer import ModelTrainer
+from src.pipeline.train_pipeline import TrainPipeline
+from src.utils import config_loader
+from src.utils.config_loader import (
+    ConfigError,
+    DataConfig,
+    FeatureConfig,
+    ModelConfig,
+    TrainingConfig,
+    config_hash,
+    file_hash,
+    load_config,
+    load_typed,
+)
+
+
+@pytest.fixture
+def model_yaml(tmp_path):
+    path = tmp_path / "model.yaml"
+    path.write_text(yaml.safe_dump({"model": "RandomForest", "task": "regression",
+                                    "n_estimators": 10, "n_jobs": 1, "random_state": 0}))
+    return path
+
+
+def rewrite(path, config):
+    stamp = os.stat(path).st_mtime_ns
+    path.write_text(yaml.safe_dump(config))
+    # Coarse filesystem clocks can leave the mtime unchanged within one test
+    os.utime(path, ns=(stamp + 1_000_000, stamp + 1_000_000))
+
+
+def test_file_is_parsed_once_and_callers_get_copies(model_yaml):
+    parses = config_loader.stats["parses"]
+    first = load_config(model_yaml)
+    first["n_estimators"] = 999
+    second = load_config(model_yaml)
+
+    assert second["n_estimators"] == 10
+    assert config_loader.stats["parses"] == parses + 1
+    assert load_typed(model_yaml, ModelConfig) is load_typed(model_yaml, ModelConfig)
+
+
+def test_edits_are_picked_up_without_a_restart(model_yaml):
+    before = load_typed(model_yaml, ModelConfig)
+    digest = file_hash(model_yaml)
+    rewrite(model_yaml, {**load_config(model_yaml), "n_estimators": 20})
+
+    after = load_typed(model_yaml, ModelConfig)
+    assert after.n_estimators == 20
+    assert after.hash != before.hash
+    assert file_hash(model_yaml) != digest
+
+
+def test_invalid_values_name_the_file_and_field(tmp_path, model_yaml):
+    rewrite(model_yaml, {**load_config(model_yaml), "n_estimators": 0})
+    with pytest.raises(ConfigError, match=r"model\.yaml: n_estimators must be >= 1"):
+        load_typed(model_yaml, ModelConfig)
+
+    data = tmp_path / "data.yaml"
+    data.write_text(yaml.safe_dump({"tickers": ["AAA"], "storage": {"format": "xlsx"}}))
+    with pytest.raises(ConfigError, match=r"storage: format must be one of"):
+        load_typed(data, DataConfig)
+
+
+def test_repo_configs_validate():
+    data = load_typed("config/data.yaml", DataConfig)
+    assert data.tickers and data.fetch.workers >= 1
+    assert load_typed("config/features.yaml", FeatureConfig).sma
+    assert load_typed("config/training.yaml", TrainingConfig).horizon >= 1
+    assert load_typed("config/model.yaml", ModelConfig).n_estimators >= 1
+
+
+def test_hash_ignores_key_order():
+    assert config_hash({"a": 1, "b": {"c": 2, "d": 3}}) == config_hash({"b": {"d": 3, "c": 2}, "a": 1})
+    assert config_hash({"a": 1}) != config_hash({"a": 2})
+    assert DataConfig().hash == DataConfig().hash
+
+
+def test_shared_typed_configs_are_read_only(model_yaml):
+    rewrite(model_yaml, {**load_config(model_yaml), "params": {"max_depth": 4, "extra": [1, 2]},
+                         "pooled": {"enabled": False, "sectors": {"AAA": "Tech"}}})
+    config = load_typed(model_yaml, ModelConfig)
+    digest = config.hash
+
+    with pytest.raises(TypeError):
+        config.params["max_depth"] = 8
+    with pytest.raises(TypeError):
+        config.pooled["sectors"]["BBB"] = "Energy"
+    assert config.params["extra"] == (1, 2)
+    assert load_typed(model_yaml, ModelConfig).hash == digest
+
+    copied = pickle.loads(pickle.dumps(config))
+    assert copied == config and copied.hash == digest
+
+
+def test_typed_hash_matches_file_hash(model_yaml):
+    assert load_typed(model_yaml, ModelConfig).hash == file_hash(model_yaml)
+    assert load_typed("config/data.yaml", DataConfig).hash == file_hash("config/data.yaml")
+
+
+def test_train_pipeline_reuses_one_trainer_and_records_the_config(tmp_path, model_yaml):
+    pipeline = TrainPipeline(dataset_dir=tmp_path / "datasets", model_dir=tmp_path / "models",
+                             model_config=str(model_yaml))
+    rng = np.random.default_rng(0)
+    for ticker in ("AAA", "BBB"):
+        X = pd.DataFrame(rng.normal(size=(80, 3)), columns=["f1", "f2", "f3"],
+                         index=pd.date_range("2020-01-01", periods=80, freq="B"))
+        pipeline.dataset_store.write(ticker, X.assign(target=X["f1"] * 0.5))
+
+    trainer = pipeline.trainer
+    pipeline.run_for_ticker("AAA")
+    pipeline.run_for_ticker("BBB")
+
+    assert pipeline.trainer is trainer
+    record = ModelRegistry(tmp_path / "models").latest(ticker="BBB")
+    assert record.meta["config_hash"] == load_typed(model_yaml, ModelConfig).hash
+
+
+def test_nested_params_reach_the_estimator_as_plain_values(model_yaml):
+    rewrite(model_yaml, {**load_config(model_yaml), "task": "classification",
+                         "params": {"class_weight": {0: 1, 1: 5}, "max_depth": 3}})
+    trainer = pickle.loads(pickle.dumps(ModelTrainer(str(model_yaml))))
+    assert trainer.config.params == {"class_weight": {0: 1, 1: 5}, "max_depth": 3}
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(60, 2)), columns=["f1", "f2"])
+    model, _ = trainer.train(X, (X["f1"] > 0).astype(int), shuffle=False)
+    assert model.named_steps["model"].class_weight == {0: 1, 1: 5}
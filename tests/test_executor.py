@@ -0,0 +1,125 @@
+import shutil
+import threading
+import time
+
+import pytest
+from mlflow.tracking import MlflowClient
+
+from src.data.storage import FrameStore
+from src.pipeline.executor import PipelineExecutor, Stage, StageContext, topological_order
+from src.utils import profiling
+from conftest import CONFIG_DIR, make_ohlcv
+
+EVENTS = []
+LOCK = threading.Lock()
+
+
+def record(ticker, stage):
+    with LOCK:
+        EVENTS.append((time.perf_counter(), ticker, stage))
+
+
+def slow_prepare(ticker, ctx):
+    time.sleep(0.3 if ticker == "SLOW" else 0.01)
+    record(ticker, "prepare")
+
+
+def quick_train(ticker, ctx):
+    record(ticker, "train")
+
+
+def failing(ticker, ctx):
+    raise RuntimeError(f"boom {ticker}")
+
+
+def test_topological_order_and_cycles():
+    a = Stage("a", quick_train)
+    b = Stage("b", quick_train, ("a",))
+    c = Stage("c", quick_train, ("b", "a"))
+    assert [s.name for s in topological_order([c, b, a])] == ["a", "b", "c"]
+
+    with pytest.raises(ValueError):
+        topological_order([Stage("x", quick_train, ("y",)), Stage("y", quick_train, ("x",))])
+
+
+def test_ticker_trains_without_waiting_for_universe():
+    EVENTS.clear()
+    stages = [Stage("prepare", slow_prepare), Stage("train", quick_train, ("prepare",))]
+    executor = PipelineExecutor(stages, max_workers=2, context=StageContext(), use_processes=False)
+
+    report = executor.run(["SLOW", "FAST"])
+
+    when = {(ticker, stage): t for t, ticker, stage in EVENTS}
+    assert when[("FAST", "train")] < when[("SLOW", "prepare")]
+    assert not report.failures()
+    assert report.stage_totals()["prepare"]["tickers"] == 2
+
+
+def test_failed_stage_skips_downstream():
+    stages = [Stage("prepare", failing), Stage("train", quick_train, ("prepare",))]
+    report = PipelineExecutor(stages, max_workers=1, context=StageContext(), use_processes=False).run(["A"])
+
+    errors = {t.stage: t.error for t in report.timings}
+    assert "boom A" in errors["prepare"]
+    assert errors["train"].startswith("skipped")
+
+
+def real_context(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("data.yaml", "features.yaml", "training.yaml", "model.yaml"):
+        shutil.copy(CONFIG_DIR / name, tmp_path / name)
+
+    raw = FrameStore(tmp_path / "data" / "raw")
+    tickers = ["AAA", "BBB", "CCC"]
+    for i, ticker in enumerate(tickers):
+        raw.write(ticker, make_ohlcv(150, seed=i))
+
+    return tickers, StageContext(
+        data_config=str(tmp_path / "data.yaml"),
+        feature_config=str(tmp_path / "features.yaml"),
+        training_config=str(tmp_path / "training.yaml"),
+        model_config=str(tmp_path / "model.yaml"),
+        model_dir=str(tmp_path / "models"),
+        n_jobs=1,
+    )
+
+
+def test_process_pool_runs_real_stages(tmp_path, monkeypatch):
+    tickers, ctx = real_context(tmp_path, monkeypatch)
+    executor = PipelineExecutor(max_workers=2, context=ctx)
+    report = executor.run(tickers, only=["preprocess", "features", "dataset", "train"])
+
+    assert not report.failures()
+    assert set(report.stage_totals()) == {"preprocess", "features", "dataset", "train"}
+    assert FrameStore(tmp_path / "data" / "datasets").names() == tickers
+    assert len(list((tmp_path / "models").glob("*.pkl"))) == 3
+
+
+def test_worker_profiles_are_merged_into_the_parent(tmp_path, monkeypatch):
+    tickers, ctx = real_context(tmp_path, monkeypatch)
+    executor = PipelineExecutor(max_workers=2, context=ctx)
+
+    with profiling.profile_run(sample_interval=None) as profiler:
+        executor.run(tickers, only=["preprocess", "features"])
+
+    stages = profiler.report()["stages"]
+    assert stages["DataPreprocessor.clean"]["calls"] == len(tickers)
+    assert stages["DataPreprocessor.clean"]["rows"] == 450
+    assert stages["FeatureBuilder.compute"]["calls"] == len(tickers)
+
+
+def test_backtest_runs_from_workers_reach_the_tracking_store(tmp_path, monkeypatch):
+    tickers, ctx = real_context(tmp_path, monkeypatch)
+    uri = f"sqlite:///{tmp_path / 'mlflow.db'}"
+    # Inherited by the pool's workers; the store is created here so they do not race to migrate it
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", uri)
+    client = MlflowClient(uri)
+    client.search_experiments()
+
+    report = PipelineExecutor(max_workers=2, context=ctx).run(
+        tickers, only=["preprocess", "features", "dataset", "train", "backtest"]
+    )
+
+    assert not report.failures()
+    runs = client.search_runs(["0"])
+    assert sorted(run.info.run_name for run in runs) == sorted(f"backtest_{t}" for t in tickers)
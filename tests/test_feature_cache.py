@@ -0,0 +1,109 @@
+import numpy as np
+import yaml
+
+from src.features import cache as cache_module
+from src.features.builder import FeatureBuilder
+from src.features.cache import FeatureCache
+from conftest import CONFIG_DIR, make_ohlcv
+
+
+def make_builder(tmp_path, **overrides):
+    cfg = yaml.safe_load(open(CONFIG_DIR / "features.yaml"))
+    cfg.update(incremental=False, **overrides)
+    cfg["cache"] = {"enabled": True, "dir": str(tmp_path / "cache")}
+    path = tmp_path / "features.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    return FeatureBuilder(str(path))
+
+
+def seed_universe(builder, n=3):
+    frames = {f"T{i}": make_ohlcv(200, seed=i) for i in range(n)}
+    for ticker, df in frames.items():
+        builder.processed_store.write(ticker, df)
+    return frames
+
+
+def test_unchanged_tickers_are_skipped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    builder = make_builder(tmp_path)
+    seed_universe(builder)
+    builder.process_all()
+
+    written = {t: builder.features_store.path(t).stat().st_mtime_ns for t in builder.features_store.names()}
+
+    builder = make_builder(tmp_path)
+    builder.process_all()
+
+    assert builder.cache.stats["skipped"] == 3
+    assert builder.cache.stats["misses"] == 0
+    for ticker, mtime in written.items():
+        assert builder.features_store.path(ticker).stat().st_mtime_ns == mtime
+
+
+def test_only_changed_ticker_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    builder = make_builder(tmp_path)
+    frames = seed_universe(builder)
+    builder.process_all()
+
+    builder.processed_store.write("T1", make_ohlcv(210, seed=99))
+    builder.processed_store.write("T9", make_ohlcv(50, seed=9))
+
+    builder = make_builder(tmp_path)
+    builder.process_all()
+
+    assert builder.cache.stats["skipped"] == 2
+    assert builder.features_store.names() == sorted(list(frames) + ["T9"])
+    assert len(builder.features_store.read("T1")) == 210
+
+
+def test_config_change_recomputes_only_new_columns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    builder = make_builder(tmp_path)
+    frames = seed_universe(builder)
+    builder.process_all()
+    n_specs = len(builder.cache.store.names()) // len(frames)
+
+    cfg = yaml.safe_load(open(tmp_path / "features.yaml"))
+    builder = make_builder(tmp_path, sma=cfg["sma"] + [5])
+    builder.process_all()
+
+    assert builder.cache.stats["hits"] == n_specs * len(frames)
+    assert builder.cache.stats["misses"] == len(frames)
+
+    for ticker, df in frames.items():
+        actual = builder.features_store.read(ticker)
+        expected = builder.build_features(df.copy())
+        assert list(actual.columns) == list(expected.columns)
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_code_version_change_invalidates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    builder = make_builder(tmp_path)
+    seed_universe(builder, n=1)
+    builder.process_all()
+
+    monkeypatch.setattr(cache_module, "INDICATOR_VERSION", "changed")
+    builder = make_builder(tmp_path)
+    builder.process_all()
+
+    assert builder.cache.stats["skipped"] == 0
+    assert builder.cache.stats["hits"] == 0
+
+
+def test_eviction_bounds_cache_size(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    builder = make_builder(tmp_path)
+    seed_universe(builder)
+    builder.process_all()
+
+    cache = FeatureCache(tmp_path / "cache", max_bytes=0)
+    cache.evict()
+    assert cache.store.names() == []
+    assert cache.stats["evicted"] > 0
+
+    cache = FeatureCache(tmp_path / "cache", max_age_days=0)
+    builder.cache.put("k", make_ohlcv(5))
+    cache.evict()
+    assert cache.store.names() == []
@@ -0,0 +1,237 @@
+import json
+import time
+
+import pandas as pd
+import yaml
+
+from src.data.fetcher import DataFetcher
+from conftest import make_ohlcv
+
+
+class FakeProvider:
+    """Serves bars from in-memory frames the way yfinance serves a date range."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def download(self, ticker, start=None, end=None):
+        self.calls.append((ticker, start, end))
+        df = self.frames[ticker]
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        return df
+
+
+def write_config(tmp_path, tickers, fmt="parquet", **extra):
+    cfg = {
+        "tickers": tickers,
+        "start_date": "2020-01-01",
+        "end_date": None,
+        "output_dir": str(tmp_path / "raw"),
+        "storage": {"format": fmt},
+        **extra,
+    }
+    path = tmp_path / "data.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    return str(path)
+
+
+def test_incremental_fetch_appends_only_new_bars(tmp_path):
+    full = make_ohlcv(120)
+    provider = FakeProvider({"AAPL": full.iloc[:100]})
+    config_path = write_config(tmp_path, ["AAPL"])
+
+    fetcher = DataFetcher(config_path, provider=provider)
+    fetcher.fetch_data(incremental=True)
+    assert len(fetcher.store.read("AAPL")) == 100
+
+    # New bars arrive; a fresh fetcher picks up coverage from the manifest
+    provider.frames["AAPL"] = full
+    fetcher = DataFetcher(config_path, provider=provider)
+    fetcher.fetch_data(incremental=True)
+
+    _, start, _ = provider.calls[-1]
+    assert pd.Timestamp(start) > full.index[99]
+
+    stored = fetcher.store.read("AAPL")
+    pd.testing.assert_frame_equal(stored, full, check_freq=False)
+
+    manifest = json.loads((tmp_path / "raw" / "_manifest.json").read_text())
+    assert manifest["AAPL"]["rows"] == 120
+    assert pd.Timestamp(manifest["AAPL"]["last"]) == full.index[-1]
+
+
+def test_incremental_fetch_is_noop_when_up_to_date(tmp_path):
+    full = make_ohlcv(50)
+    provider = FakeProvider({"MSFT": full})
+    fetcher = DataFetcher(write_config(tmp_path, ["MSFT"], fmt="csv"), provider=provider)
+
+    fetcher.fetch_data(incremental=True)
+    assert fetcher.fetch_ticker("MSFT", incremental=True) == 0
+    assert len(fetcher.store.read("MSFT")) == 50
+
+
+def test_full_fetch_overwrites(tmp_path):
+    provider = FakeProvider({"TSLA": make_ohlcv(30)})
+    fetcher = DataFetcher(write_config(tmp_path, ["TSLA"]), provider=provider)
+
+    fetcher.fetch_data(incremental=False)
+    fetcher.fetch_data(incremental=False)
+
+    assert len(fetcher.store.read("TSLA")) == 30
+    assert provider.calls[-1][1] == "2020-01-01"
+
+
+def test_manifest_entry_for_a_legacy_file_covers_its_history(tmp_path):
+    full = make_ohlcv(120)
+    config_path = write_config(tmp_path, ["AAPL"])
+    fetcher = DataFetcher(config_path, provider=FakeProvider({"AAPL": full}))
+    # Written by an older full download, before manifests existed
+    fetcher.store.write("AAPL", full.iloc[:100])
+
+    fetcher.fetch_data(incremental=True)
+
+    entry = json.loads((tmp_path / "raw" / "_manifest.json").read_text())["AAPL"]
+    assert entry["rows"] == 120
+    assert pd.Timestamp(entry["first"]) == full.index[0]
+    assert pd.Timestamp(entry["last"]) == full.index[-1]
+
+
+class SlowProvider(FakeProvider):
+    """Adds artificial latency and optional transient failures per call."""
+
+    def __init__(self, frames, latency=0.05, failures=0):
+        super().__init__(frames)
+        self.latency = latency
+        self.failures = failures
+
+    def download(self, ticker, start=None, end=None):
+        time.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("transient provider error")
+        return super().download(ticker, start, end)
+
+
+class BatchProvider(FakeProvider):
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.batches = []
+
+    def download_many(self, tickers, start=None, end=None):
+        self.batches.append(list(tickers))
+        return {t: self.download(t, start, end) for t in tickers}
+
+
+def test_concurrent_fetch_overlaps_provider_latency(tmp_path):
+    tickers = [f"T{i}" for i in range(8)]
+    provider = SlowProvider({t: make_ohlcv(20, seed=i) for i, t in enumerate(tickers)}, latency=0.1)
+    fetcher = DataFetcher(write_config(tmp_path, tickers), provider=provider)
+
+    started = time.perf_counter()
+    results = fetcher.fetch_data(incremental=False, workers=8)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.1 * len(tickers) / 2
+    assert [r.ticker for r in results] == tickers
+    assert all(r.rows == 20 and r.error is None for r in results)
+    assert all(r.seconds >= 0.1 for r in results)
+
+
+def test_retry_with_backoff_recovers_from_transient_errors(tmp_path):
+    provider = SlowProvider({"AAPL": make_ohlcv(10)}, latency=0.0, failures=2)
+    fetcher = DataFetcher(
+        write_config(tmp_path, ["AAPL"], fetch={"retries": 3, "backoff": 0.01}),
+        provider=provider,
+    )
+
+    [result] = fetcher.fetch_data(incremental=False)
+    assert result.error is None
+    assert result.attempts == 3
+    assert result.rows == 10
+
+
+def test_failures_are_reported_after_retries_exhausted(tmp_path):
+    provider = SlowProvider({"AAPL": make_ohlcv(10)}, latency=0.0, failures=5)
+    fetcher = DataFetcher(
+        write_config(tmp_path, ["AAPL"], fetch={"retries": 1, "backoff": 0.0}),
+        provider=provider,
+    )
+
+    [result] = fetcher.fetch_data(incremental=False)
+    assert result.attempts == 2
+    assert "transient" in result.error
+    assert not fetcher.store.exists("AAPL")
+
+
+def test_batched_provider_calls(tmp_path):
+    tickers = ["A", "B", "C", "D", "E"]
+    provider = BatchProvider({t: make_ohlcv(15, seed=i) for i, t in enumerate(tickers)})
+    fetcher = DataFetcher(
+        write_config(tmp_path, tickers, fetch={"workers": 2, "batch_size": 2}),
+        provider=provider,
+    )
+
+    results = fetcher.fetch_data(incremental=False)
+    assert sorted(len(b) for b in provider.batches) == [2, 2]
+    assert len(provider.calls) == 5
+    assert sum(r.rows for r in results) == 75
+
+
+class GappyBatchProvider(BatchProvider):
+    """Leaves `dropped` out of its first `misses` batch responses, like a partial multi-ticker download."""
+
+    def __init__(self, frames, dropped, misses):
+        super().__init__(frames)
+        self.dropped = dropped
+        self.misses = misses
+
+    def download_many(self, tickers, start=None, end=None):
+        frames = super().download_many(tickers, start, end)
+        if self.misses > 0:
+            self.misses -= 1
+            frames.pop(self.dropped, None)
+        return frames
+
+
+def test_tickers_missing_from_a_batch_are_retried(tmp_path):
+    tickers = ["A", "B", "C"]
+    provider = GappyBatchProvider({t: make_ohlcv(15, seed=i) for i, t in enumerate(tickers)}, "B", misses=1)
+    fetcher = DataFetcher(
+        write_config(tmp_path, tickers, fetch={"batch_size": 3, "retries": 1, "backoff": 0.0}),
+        provider=provider,
+    )
+
+    results = fetcher.fetch_data(incremental=False)
+    assert [r.error for r in results] == [None, None, None]
+    assert [r.rows for r in results] == [15, 15, 15]
+    # Only the missing ticker is requested again
+    assert provider.calls[-1][0] == "B" and len(provider.calls) == 4
+
+
+def test_tickers_missing_from_a_batch_are_reported(tmp_path):
+    tickers = ["A", "B", "C"]
+    provider = GappyBatchProvider({t: make_ohlcv(15, seed=i) for i, t in enumerate(tickers)}, "B", misses=1)
+    fetcher = DataFetcher(write_config(tmp_path, tickers, fetch={"batch_size": 3}), provider=provider)
+
+    results = {r.ticker: r for r in fetcher.fetch_data(incremental=False)}
+    assert results["B"].error == "missing from batch response"
+    assert results["A"].error is None and results["C"].error is None
+    assert not fetcher.store.exists("B")
+
+
+def test_separate_fetchers_merge_manifest_entries(tmp_path):
+    frames = {"AAA": make_ohlcv(10), "BBB": make_ohlcv(12)}
+    config_path = write_config(tmp_path, list(frames))
+
+    # Two fetchers loaded before either wrote, like two worker processes
+    first = DataFetcher(config_path, provider=FakeProvider(frames))
+    second = DataFetcher(config_path, provider=FakeProvider(frames))
+    first.fetch_ticker("AAA")
+    second.fetch_ticker("BBB")
+
+    manifest = json.loads((tmp_path / "raw" / "_manifest.json").read_text())
+    assert set(manifest) == {"AAA", "BBB"}
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.features import kernels
+from src.features.fused import FeaturePlan
+from src.features.indicators import (
+    sma, ema, rsi, bollinger_bands,
+    returns, log_returns, rolling_volatility
+)
+from conftest import make_ohlcv
+
+CONFIG = {
+    "sma": [10, 20, 50],
+    "ema": [12, 26],
+    "rsi": {"enabled": True, "window": 14},
+    "bollinger": {"enabled": True, "window": 20, "num_std": 2},
+    "returns": {"enabled": True},
+    "log_returns": {"enabled": True},
+    "rolling_volatility": {"enabled": True, "window": 20},
+}
+
+BACKENDS = [False] + ([True] if kernels.numba is not None else [])
+
+
+def reference(df):
+    bb = bollinger_bands(df, 20, 2)
+    return {
+        "SMA_10": sma(df, 10),
+        "SMA_20": sma(df, 20),
+        "SMA_50": sma(df, 50),
+        "EMA_12": ema(df, 12),
+        "EMA_26": ema(df, 26),
+        "RSI_14": rsi(df, 14),
+        "BB_upper_20": bb["BB_upper_20"],
+        "BB_lower_20": bb["BB_lower_20"],
+        "returns": returns(df),
+        "log_returns": log_returns(df),
+        "volatility_20": rolling_volatility(df, 20),
+    }
+
+
+def test_plan_shares_rolling_windows():
+    plan = FeaturePlan.from_config(CONFIG)
+    # SMA_20 and the Bollinger band share one window of sums and squares
+    assert plan.roll_windows == [10, 20, 50]
+    assert plan.roll_squares == [False, True, False]
+    assert plan.columns == list(reference(make_ohlcv(60)))
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+def test_fused_matches_indicators(use_numba):
+    df = make_ohlcv(1500, seed=7)
+    df.iloc[300:305, df.columns.get_loc("Close")] = np.nan
+
+    plan = FeaturePlan.from_config(CONFIG, use_numba=use_numba)
+    out = plan.compute(df["Close"].to_numpy())
+
+    for name, expected in reference(df).items():
+        np.testing.assert_allclose(out[name][:, 0], expected.to_numpy(), rtol=1e-9, atol=1e-12, err_msg=name)
+
+
+@pytest.mark.parametrize("use_numba", BACKENDS)
+def test_fused_panel_columns_are_independent(use_numba):
+    frames = [make_ohlcv(200, seed=s) for s in range(4)]
+    close = np.column_stack([df["Close"].to_numpy() for df in frames])
+
+    out = FeaturePlan.from_config(CONFIG, use_numba=use_numba).compute(close)
+
+    for j, df in enumerate(frames):
+        for name, expected in reference(df).items():
+            np.testing.assert_allclose(out[name][:, j], expected.to_numpy(), rtol=1e-9, atol=1e-12)
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.features.builder import FeatureBuilder
+from src.features import kernels
+from src.features.incremental import IncrementalFeatureEngine, RollingWindow
+from src.features.indicators import (
+    sma, ema, rsi, bollinger_bands,
+    returns, log_returns, rolling_volatility
+)
+from conftest import CONFIG_DIR, make_ohlcv
+
+ALL_ENABLED = {
+    "sma": [5, 20],
+    "ema": [12, 26],
+    "rsi": {"enabled": True, "window": 14},
+    "bollinger": {"enabled": True, "window": 20, "num_std": 2},
+    "returns": {"enabled": True},
+    "log_returns": {"enabled": True},
+    "rolling_volatility": {"enabled": True, "window": 20},
+}
+
+INDICATORS = {
+    "SMA_5": lambda df: sma(df, 5),
+    "SMA_20": lambda df: sma(df, 20),
+    "EMA_12": lambda df: ema(df, 12),
+    "EMA_26": lambda df: ema(df, 26),
+    "RSI_14": lambda df: rsi(df, 14),
+    "BB_upper_20": lambda df: bollinger_bands(df, 20, 2)["BB_upper_20"],
+    "BB_lower_20": lambda df: bollinger_bands(df, 20, 2)["BB_lower_20"],
+    "returns": returns,
+    "log_returns": log_returns,
+    "volatility_20": lambda df: rolling_volatility(df, 20),
+}
+
+
+def assert_matches(actual, expected):
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("column", sorted(INDICATORS))
+def test_streaming_matches_full_recompute(column):
+    df = make_ohlcv(400)
+    df.iloc[100:103, df.columns.get_loc("Close")] = np.nan
+
+    engine = IncrementalFeatureEngine(ALL_ENABLED)
+    parts = [engine.update(df.iloc[i:i + 37]) for i in range(0, len(df), 37)]
+    streamed = pd.concat(parts)
+
+    assert_matches(streamed[column], INDICATORS[column](df))
+
+
+@pytest.mark.parametrize("column", sorted(INDICATORS))
+def test_primed_engine_matches_full_recompute(column):
+    df = make_ohlcv(400, seed=3)
+    history, tail = df.iloc[:350], df.iloc[350:]
+
+    engine = IncrementalFeatureEngine(ALL_ENABLED)
+    engine.prime(history, pd.DataFrame({c: f(history) for c, f in INDICATORS.items()}))
+    appended = engine.update(tail)
+
+    assert_matches(appended[column], INDICATORS[column](df).iloc[350:])
+
+
+@pytest.mark.parametrize("level,step", [(6e5, 1.0), (3e4, 0.01), (5e4, 1e-4)])
+def test_rolling_std_keeps_precision_at_high_price_levels(level, step):
+    rng = np.random.default_rng(0)
+    close = level + np.cumsum(rng.normal(scale=step, size=2000))
+    exact = np.lib.stride_tricks.sliding_window_view(close, 20).std(axis=1, ddof=1)
+
+    window = RollingWindow(20)
+    streamed = []
+    for x in close:
+        window.push(x)
+        streamed.append(window.std())
+    streamed = np.array(streamed[19:])
+
+    np.testing.assert_allclose(streamed, exact, rtol=1e-12)
+    # Same band width as the full recompute
+    _, full = kernels.rolling_mean_std(close[:, None], 20)
+    np.testing.assert_allclose(streamed, full[19:, 0], rtol=1e-8)
+
+
+def test_update_skips_bars_already_seen(tmp_path):
+    df = make_ohlcv(60)
+    engine = IncrementalFeatureEngine(ALL_ENABLED)
+    engine.update(df.iloc[:50])
+
+    engine.save(tmp_path / "state.pkl")
+    engine = IncrementalFeatureEngine.load(tmp_path / "state.pkl")
+
+    new = engine.update(df)
+    assert list(new.index) == list(df.index[50:])
+
+
+def test_builder_incremental_append_matches_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cfg = yaml.safe_load(open(CONFIG_DIR / "features.yaml"))
+    cfg["incremental"] = True
+    (tmp_path / "features.yaml").write_text(yaml.safe_dump(cfg))
+
+    builder = FeatureBuilder(str(tmp_path / "features.yaml"))
+    df = make_ohlcv(300)
+
+    builder.processed_store.write("AAPL", df.iloc[:280])
+    builder.process_all()
+    builder.processed_store.write("AAPL", df)
+    builder.process_all()
+
+    appended = builder.features_store.read("AAPL")
+    assert_matches(appended, builder.build_features(df))
+    assert builder.update_ticker("AAPL", df) is None
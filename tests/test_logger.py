@@ -0,0 +1,92 @@
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from src.utils import logger as log_module
+from src.utils.logger import RateLimiter, get_logger, shutdown_logging
+
+
+@pytest.fixture(autouse=True)
+def stop_listeners():
+    yield
+    shutdown_logging()
+
+
+def lines(path):
+    return path.read_text().splitlines()
+
+
+def test_repeated_calls_do_not_stack_handlers(tmp_path):
+    first = get_logger("repeat", log_dir=str(tmp_path))
+    second = get_logger("repeat", log_dir=str(tmp_path))
+    assert first is second
+    assert len(first.handlers) == 1
+
+    first.info("hello %s", "world")
+    shutdown_logging()
+    assert len(lines(tmp_path / "repeat.log")) == 1
+    assert lines(tmp_path / "repeat.log")[0].endswith("hello world")
+    assert first.handlers == []
+
+
+def test_slow_handler_does_not_block_the_caller(tmp_path):
+    logger = get_logger("slow", log_dir=str(tmp_path))
+    release = threading.Event()
+    written = []
+
+    class Blocked(logging.Handler):
+        def emit(self, record):
+            release.wait()
+            written.append(record.getMessage())
+
+    log_module._listeners["slow"].handlers = (Blocked(),)
+    started = time.perf_counter()
+    for i in range(200):
+        logger.info("tick %d", i)
+    assert time.perf_counter() - started < 0.5
+    assert written == []
+
+    release.set()
+    shutdown_logging()
+    assert written == [f"tick {i}" for i in range(200)]
+
+
+def test_json_lines_carry_extra_fields_and_exceptions(tmp_path):
+    logger = get_logger("structured", log_dir=str(tmp_path), json_format=True, console_level=logging.CRITICAL)
+    logger.info("filled %d", 3, extra={"ticker": "AAPL"})
+    try:
+        raise ValueError("bad bar")
+    except ValueError:
+        logger.exception("failed")
+    shutdown_logging()
+
+    first, second = (json.loads(line) for line in lines(tmp_path / "structured.log"))
+    assert first["message"] == "filled 3" and first["ticker"] == "AAPL" and first["level"] == "INFO"
+    assert first["logger"] == "structured"
+    assert second["level"] == "ERROR" and "ValueError: bad bar" in second["exc_info"]
+
+
+def test_debug_from_child_loggers_is_rate_limited(tmp_path):
+    get_logger("limited", log_dir=str(tmp_path), debug_rate=2, console_level=logging.CRITICAL)
+    child = logging.getLogger("limited.engine")
+    for i in range(100):
+        child.debug("tick %d", i)
+    child.info("done")
+    shutdown_logging()
+
+    written = lines(tmp_path / "limited.log")
+    assert 2 <= sum("tick" in line for line in written) < 10
+    assert written[-1].endswith("done")
+
+
+def test_rate_limiter_refills_and_counts_suppressed():
+    limiter = RateLimiter(rate=1000.0, burst=2)
+    assert [limiter.allow("k") for _ in range(4)] == [True, True, False, False]
+    assert limiter.take_suppressed("k") == 2
+    assert limiter.take_suppressed("k") == 0
+    time.sleep(0.01)
+    assert limiter.allow("k")
+    assert limiter.allow("other")
@@ -0,0 +1,93 @@
+import shutil
+
+import numpy as np
+
+from src.data.preprocess import DataPreprocessor
+from src.data.storage import FrameStore
+from src.features.builder import FeatureBuilder
+from src.pipeline.memory_pipeline import InMemoryPipeline
+from src.pipeline.train_dataset import TrainingDatasetBuilder
+from conftest import CONFIG_DIR, make_ohlcv
+
+
+def setup_configs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("data.yaml", "features.yaml", "training.yaml", "model.yaml"):
+        shutil.copy(CONFIG_DIR / name, tmp_path / name)
+    return {
+        "data_config": "data.yaml",
+        "feature_config": "features.yaml",
+        "training_config": "training.yaml",
+        "model_config": "model.yaml",
+    }
+
+
+def universe():
+    return {"AAA": make_ohlcv(220, seed=1), "BBB": make_ohlcv(180, seed=2)}
+
+
+def test_in_memory_datasets_match_file_pipeline(tmp_path, monkeypatch):
+    configs = setup_configs(tmp_path, monkeypatch)
+    raw = universe()
+
+    results = InMemoryPipeline(**configs).run(raw, train=False)
+    assert FrameStore(tmp_path / "data" / "datasets").names() == []
+
+    raw_store = FrameStore(tmp_path / "data" / "raw")
+    for ticker, df in raw.items():
+        raw_store.write(ticker, df)
+    DataPreprocessor("data.yaml").process_all()
+    FeatureBuilder("features.yaml").process_all()
+    builder = TrainingDatasetBuilder("training.yaml")
+    builder.build_all()
+
+    for ticker in raw:
+        expected = builder.dataset_store.read(ticker)
+        actual = results[ticker].dataset
+        assert list(actual.columns) == list(expected.columns)
+        assert (actual.index == expected.index).all()
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_checkpoints_persist_selected_stages(tmp_path, monkeypatch):
+    configs = setup_configs(tmp_path, monkeypatch)
+
+    pipeline = InMemoryPipeline(**configs, model_dir=str(tmp_path / "models"), checkpoints=["features", "models"])
+    results = pipeline.run(universe())
+
+    assert FrameStore(tmp_path / "data" / "features").names() == ["AAA", "BBB"]
+    assert FrameStore(tmp_path / "data" / "datasets").names() == []
+    assert len(list((tmp_path / "models").glob("*.pkl"))) == 2
+    assert all("rmse" in r.metrics for r in results.values())
+
+
+def test_raw_frames_are_not_mutated(tmp_path, monkeypatch):
+    configs = setup_configs(tmp_path, monkeypatch)
+    raw = universe()
+    raw["AAA"] = raw["AAA"].iloc[::-1]
+    before = raw["AAA"].index.copy()
+
+    InMemoryPipeline(**configs).run(raw, train=False)
+    assert raw["AAA"].index.equals(before)
+
+
+def test_feature_checkpoint_keeps_incremental_state_current(tmp_path, monkeypatch):
+    configs = setup_configs(tmp_path, monkeypatch)
+    raw = universe()
+
+    # A file-based run on older bars leaves indicator state behind
+    raw_store = FrameStore(tmp_path / "data" / "raw")
+    for ticker, df in raw.items():
+        raw_store.write(ticker, df.iloc[:-30])
+    DataPreprocessor("data.yaml").process_all()
+    FeatureBuilder("features.yaml").process_all()
+
+    InMemoryPipeline(**configs, checkpoints=["processed", "features"]).run(raw, train=False)
+    FeatureBuilder("features.yaml").process_all()
+
+    features = FrameStore(tmp_path / "data" / "features")
+    processed = FrameStore(tmp_path / "data" / "processed")
+    for ticker in raw:
+        index = features.read(ticker).index
+        assert index.is_unique
+        assert index.equals(processed.read(ticker).index)
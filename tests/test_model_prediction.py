@@ -1,6 +1,7 @@
 from pathlib import Path
 import pandas as pd
 
+from src.data.storage import FrameStore
 from src.models.predictor import ModelPredictor
 
 def test_model_prediction():
@@ -8,10 +9,10 @@ def test_model_prediction():
     predictor = ModelPredictor(model_dir="models")
 
     # Load a dataset row to test prediction
-    dataset_path = Path("data/datasets/AAPL.csv")
-    assert dataset_path.exists(), "Dataset file not found. Run training first."
+    store = FrameStore(Path("data/datasets"))
+    assert store.exists("AAPL"), "Dataset file not found. Run training first."
 
-    df = pd.read_csv(dataset_path, index_col=0, parse_dates=True)
+    df = store.read("AAPL")
 
     # Use the last row for prediction
     X = df.drop("target", axis=1).iloc[-1]
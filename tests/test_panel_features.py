@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.features.builder import FeatureBuilder
+from src.features.panel import build_panel_features
+from conftest import CONFIG_DIR, make_ohlcv
+
+CONFIG = {
+    "sma": [10, 20],
+    "ema": [12],
+    "rsi": {"enabled": True, "window": 14},
+    "bollinger": {"enabled": True, "window": 20, "num_std": 2},
+    "returns": {"enabled": True},
+    "log_returns": {"enabled": True},
+    "rolling_volatility": {"enabled": True, "window": 20},
+}
+
+
+def per_ticker(df):
+    builder = FeatureBuilder.__new__(FeatureBuilder)
+    builder.config = CONFIG
+    return builder.build_features(df.copy())
+
+
+def universe():
+    # Different listing dates, so tickers have histories of different lengths
+    return {
+        "AAA": make_ohlcv(300, seed=1),
+        "BBB": make_ohlcv(250, seed=2, start="2020-03-02"),
+        "CCC": make_ohlcv(40, seed=3, start="2021-01-04"),
+    }
+
+
+def test_long_panel_matches_per_ticker_features():
+    frames = universe()
+    long = pd.concat({t: df for t, df in frames.items()}, names=["ticker"]).swaplevel(0, 1)
+
+    panel = build_panel_features(long, CONFIG)
+
+    for ticker, df in frames.items():
+        expected = per_ticker(df)
+        actual = panel.xs(ticker, level="ticker")
+        assert list(actual.columns) == list(expected.columns)
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_wide_panel_matches_per_ticker_features():
+    frames = universe()
+    wide = pd.DataFrame({t: df["Close"] for t, df in frames.items()})
+
+    panel = build_panel_features(wide, CONFIG)
+
+    for ticker, df in frames.items():
+        actual = panel.xs(ticker, level="ticker")
+        assert len(actual) == len(df)
+        np.testing.assert_allclose(actual.to_numpy(), per_ticker(df).to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_wide_panel_skips_date_gaps_within_a_ticker():
+    frames = universe()
+    # A halt: AAA misses dates the other tickers trade on
+    frames["AAA"] = frames["AAA"].drop(frames["AAA"].index[100:104])
+    wide = pd.DataFrame({t: df["Close"] for t, df in frames.items()})
+
+    panel = build_panel_features(wide, CONFIG)
+
+    actual = panel.xs("AAA", level="ticker")
+    expected = per_ticker(frames["AAA"])
+    pd.testing.assert_index_equal(actual.index, expected.index, check_names=False)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_builder_panel_mode_writes_every_ticker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cfg = yaml.safe_load(open(CONFIG_DIR / "features.yaml"))
+    cfg.update(panel=True, incremental=False)
+    (tmp_path / "features.yaml").write_text(yaml.safe_dump(cfg))
+
+    builder = FeatureBuilder(str(tmp_path / "features.yaml"))
+    frames = universe()
+    for ticker, df in frames.items():
+        builder.processed_store.write(ticker, df)
+
+    builder.process_all()
+
+    assert builder.features_store.names() == sorted(frames)
+    for ticker, df in frames.items():
+        expected = builder.build_features(df.copy())
+        actual = builder.features_store.read(ticker)
+        pd.testing.assert_index_equal(actual.index, expected.index, check_names=False)
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
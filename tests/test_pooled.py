@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.data.storage import FrameStore
+from src.models import trainer as trainer_module
+from src.models.pooled import POOLED_NAME, PanelEncoder, PooledPredictor, stack_panel
+from src.models.registry import ModelRegistry
+from src.models.serving import ModelCache
+from src.pipeline.backtest_pipeline import BacktestPipeline
+from src.pipeline.train_pipeline import TrainPipeline
+
+
+def _dataset(seed, periods, start="2021-01-01"):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(periods, 3)), columns=list("abc"),
+                     index=pd.bdate_range(start, periods=periods))
+    return X.assign(target=X["a"] * 0.01 + rng.normal(scale=0.001, size=periods))
+
+
+@pytest.fixture
+def frames():
+    # Different lengths and start dates, columns in a different order
+    return {
+        "AAPL": _dataset(0, 120),
+        "MSFT": _dataset(1, 80, start="2021-03-01")[["c", "a", "b", "target"]],
+        "XOM": _dataset(2, 100),
+    }
+
+
+def test_stack_panel_is_date_ordered_float32(frames):
+    encoder = PanelEncoder(list(frames), sectors={"AAPL": "Tech", "MSFT": "Tech", "XOM": "Energy"})
+    panel = stack_panel(frames, encoder)
+
+    assert panel.X.dtype == np.float32
+    assert panel.X.shape == (300, 5)
+    assert panel.columns == ["a", "b", "c", "ticker_code", "sector_code"]
+    assert panel.index.get_level_values("date").is_monotonic_increasing
+
+    frame = panel.to_frame()
+    msft = frame.xs("MSFT", level="ticker")
+    np.testing.assert_array_equal(msft[["a", "b", "c"]].to_numpy(), frames["MSFT"][["a", "b", "c"]].to_numpy(np.float32))
+    np.testing.assert_array_equal(msft["target"].to_numpy(), frames["MSFT"]["target"].to_numpy())
+    assert set(msft["ticker_code"]) == {1} and set(msft["sector_code"]) == {1}
+    assert set(frame.xs("XOM", level="ticker")["sector_code"]) == {0}
+
+
+def test_encoder_handles_unknown_and_disabled_codes():
+    encoder = PanelEncoder(["AAPL"], sectors={"AAPL": "Tech"})
+    np.testing.assert_array_equal(encoder.codes(["AAPL", "ZZZ"]), [[0, 0], [-1, -1]])
+
+    bare = PanelEncoder(["AAPL"], encode_ticker=False, encode_sector=False)
+    assert bare.columns == [] and bare.codes(["AAPL"]).shape == (1, 0)
+    assert PanelEncoder.from_meta(encoder.to_meta()).codes(["AAPL"]).tolist() == [[0, 0]]
+
+
+def test_missing_feature_is_rejected(frames):
+    frames["XOM"] = frames["XOM"].drop(columns="b")
+    with pytest.raises(ValueError, match="XOM"):
+        stack_panel(frames)
+
+
+def test_pooled_train_and_batched_prediction(tmp_path, frames):
+    config = tmp_path / "model.yaml"
+    config.write_text(yaml.safe_dump({
+        "model": "RandomForest",
+        "task": "regression",
+        "shuffle": False,
+        "random_state": 0,
+        "n_estimators": 10,
+        "n_jobs": 1,
+        "pooled": {"enabled": True, "sectors": {"AAPL": "Tech", "MSFT": "Tech"}},
+    }))
+    store = FrameStore(tmp_path / "datasets")
+    for ticker, df in frames.items():
+        store.write(ticker, df)
+
+    TrainPipeline(dataset_dir=tmp_path / "datasets", model_dir=tmp_path / "models",
+                  model_config=str(config)).run_all()
+    record = ModelRegistry(tmp_path / "models").latest(POOLED_NAME)
+    assert record.meta["tickers"] == ["AAPL", "MSFT", "XOM"]
+    assert record.features[-2:] == ["ticker_code", "sector_code"]
+
+    predictor = PooledPredictor(str(tmp_path / "models"), cache=ModelCache())
+    day = pd.Timestamp("2021-04-01")
+    section = pd.DataFrame({t: df.drop(columns="target").loc[day] for t, df in frames.items()}).T
+    preds = predictor.predict_cross_section(section[["c", "b", "a"]])
+
+    model = ModelRegistry(tmp_path / "models").load_model(ticker=POOLED_NAME)
+    panel = stack_panel(frames, PanelEncoder.from_meta(record.meta))
+    expected = model.predict(panel.X[panel.index.get_locs([day])])
+    np.testing.assert_array_equal(preds.to_numpy(), expected)
+    assert list(preds.index) == ["AAPL", "MSFT", "XOM"]
+
+    backtests = BacktestPipeline(dataset_dir=tmp_path / "datasets", model_dir=tmp_path / "models",
+                                 backtest_dir=tmp_path / "backtests", pooled=True)
+    scored = {}
+    backtests.run_for_ticker = lambda ticker, df, preds: scored.setdefault(ticker, preds)
+    backtests.run_all()
+    assert scored["MSFT"].index.equals(frames["MSFT"].index)
+    assert scored["MSFT"].loc[day] == preds["MSFT"]
+
+
+def test_pooled_split_is_a_time_split_even_when_config_shuffles(tmp_path, frames, monkeypatch):
+    config = tmp_path / "model.yaml"
+    config.write_text(yaml.safe_dump({
+        "model": "RandomForest", "task": "regression", "shuffle": True,
+        "random_state": 0, "n_estimators": 5, "n_jobs": 1, "pooled": {"enabled": True},
+    }))
+    store = FrameStore(tmp_path / "datasets")
+    for ticker, df in frames.items():
+        store.write(ticker, df)
+
+    split = trainer_module.train_test_split
+    seen = []
+    monkeypatch.setattr(trainer_module, "train_test_split",
+                        lambda *a, **kw: seen.append(kw["shuffle"]) or split(*a, **kw))
+
+    TrainPipeline(dataset_dir=tmp_path / "datasets", model_dir=tmp_path / "models",
+                  model_config=str(config)).run_all()
+    assert seen == [False]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.backtester import Backtester, BacktestConfig
+from src.backtest.portfolio import PortfolioBacktester, PortfolioConfig, align, target_weights
+
+
+def _series(seed, periods, start="2021-01-01"):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=periods)
+    returns = pd.Series(rng.normal(0, 0.01, periods), index=index)
+    preds = returns + rng.normal(0, 0.01, periods)
+    return preds, returns
+
+
+def test_align_fills_missing_dates():
+    a = pd.Series([1.0, 2.0], index=pd.to_datetime(["2021-01-01", "2021-01-03"]))
+    b = pd.Series([3.0], index=pd.to_datetime(["2021-01-02"]))
+
+    dates, assets, matrix = align({"A": a, "B": b})
+    assert assets == ["A", "B"] and len(dates) == 3 and matrix.dtype == np.float32
+    np.testing.assert_array_equal(matrix, [[1, np.nan], [np.nan, 3], [2, np.nan]])
+
+    _, _, subset = align({"A": a}, dates=dates[1:])
+    np.testing.assert_array_equal(subset, [[np.nan], [2]])
+
+
+def test_sizing_spends_the_leverage_budget():
+    preds = np.array([[0.02, -0.01, np.nan, 0.0], [0.0, 0.0, 0.0, 0.0]])
+
+    equal = target_weights(preds, PortfolioConfig(max_leverage=2.0))
+    np.testing.assert_allclose(equal, [[1.0, -1.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0]])
+
+    signal = target_weights(preds, PortfolioConfig(max_leverage=1.5, sizing="signal"))
+    np.testing.assert_allclose(signal[0], [1.0, -0.5, 0.0, 0.0])
+
+    with pytest.raises(ValueError):
+        target_weights(preds, PortfolioConfig(sizing="kelly"))
+
+
+@pytest.mark.parametrize("chunk_size", [7, 512])
+def test_single_asset_matches_backtester(chunk_size):
+    preds, returns = _series(0, 200)
+    config = BacktestConfig(threshold_long=2e-3, threshold_short=-2e-3, cost_bps=10.0)
+
+    expected = Backtester(config).simulate(returns.rename("target").to_frame(), preds)
+    frame = PortfolioBacktester(PortfolioConfig(**vars(config), chunk_size=chunk_size)).simulate(
+        {"A": preds}, {"A": returns}
+    )
+
+    np.testing.assert_allclose(frame["strategy_net"], expected["strategy_net"], rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(frame["equity"], expected["equity"], rtol=1e-6)
+
+
+def test_chunking_does_not_change_results():
+    preds, returns = {}, {}
+    for i, (periods, start) in enumerate([(300, "2021-01-01"), (250, "2021-02-01"), (120, "2021-06-01")]):
+        preds[f"T{i}"], returns[f"T{i}"] = _series(i, periods, start)
+
+    whole = PortfolioBacktester(PortfolioConfig(chunk_size=10_000, sizing="signal")).simulate(preds, returns)
+    chunked = PortfolioBacktester(PortfolioConfig(chunk_size=16, sizing="signal")).simulate(preds, returns)
+
+    pd.testing.assert_frame_equal(whole, chunked)
+    assert whole["gross_exposure"].max() <= 1.0 + 1e-12
+    assert whole["n_positions"].max() == 3
+    assert (whole["turnover"] > 0).any()
+
+    metrics = PortfolioBacktester().compute_metrics(whole)
+    assert {"sharpe", "max_drawdown", "avg_turnover", "avg_gross_exposure"} <= set(metrics)
+
+
+def test_missing_returns_are_rejected():
+    preds, returns = _series(0, 10)
+    with pytest.raises(ValueError, match="B"):
+        PortfolioBacktester().simulate({"A": preds, "B": preds}, {"A": returns})
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.data.preprocess import ChunkCleaner, DataPreprocessor
+from src.data.storage import FrameStore
+from conftest import make_ohlcv
+
+RULES = {"remove_duplicates": True, "dropna": False, "forward_fill": True}
+
+
+def _messy(n=500, seed=0):
+    """Minute bars with gaps and duplicated timestamps."""
+    rng = np.random.default_rng(seed)
+    df = make_ohlcv(n, seed=seed)
+    df.index = pd.date_range("2024-01-02 09:30", periods=n, freq="min", name="Date")
+    df = df.mask(rng.random(df.shape) < 0.1)
+    df = pd.concat([df, df.iloc[rng.choice(n, 40, replace=False)] * 1.5])
+    return df.sort_index(kind="mergesort")
+
+
+def _preprocessor(tmp_path, monkeypatch, **cleaning):
+    monkeypatch.chdir(tmp_path)
+    config = {"storage": {"format": "parquet"}, "cleaning": {**RULES, **cleaning}}
+    (tmp_path / "data.yaml").write_text(yaml.safe_dump(config))
+    return DataPreprocessor("data.yaml")
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64, 10_000])
+@pytest.mark.parametrize("dropna", [False, True])
+def test_chunks_match_whole_file(tmp_path, monkeypatch, chunk, dropna):
+    pre = _preprocessor(tmp_path, monkeypatch, dropna=dropna)
+    df = _messy()
+
+    expected = pre.clean(df.copy())
+    streamed = pd.concat(pre.clean_chunks(df.iloc[i:i + chunk].copy() for i in range(0, len(df), chunk)))
+
+    pd.testing.assert_frame_equal(streamed, expected)
+    assert streamed.index.is_unique and streamed.index.is_monotonic_increasing
+
+
+def test_clean_fast_path_and_float32(tmp_path, monkeypatch):
+    pre = _preprocessor(tmp_path, monkeypatch, float32=True)
+    df = make_ohlcv(50)
+
+    out = pre.clean(df)
+    assert out["Close"].dtype == np.float32 and out["Volume"].dtype == df["Volume"].dtype
+    np.testing.assert_array_equal(out["Close"], df["Close"].astype(np.float32))
+
+    shuffled = df.iloc[::-1]
+    pd.testing.assert_frame_equal(pre.clean(shuffled.copy()), out)
+
+
+def test_out_of_order_chunk_is_rejected():
+    df = make_ohlcv(20)
+    cleaner = ChunkCleaner(RULES)
+    cleaner.push(df.iloc[10:])
+    with pytest.raises(ValueError, match="time order"):
+        cleaner.push(df.iloc[:10])
+
+
+def test_process_ticker_streams_raw_file(tmp_path, monkeypatch):
+    pre = _preprocessor(tmp_path, monkeypatch)
+    df = _messy(300, seed=1)
+    pre.raw_store.write("AAPL", df)
+
+    expected = pre.clean(df.copy())
+    pre.chunk_rows = 32
+    pre.process_all()
+
+    pd.testing.assert_frame_equal(FrameStore(tmp_path / "data" / "processed").read("AAPL"), expected,
+                                  check_freq=False)
+
+
+def test_unparseable_dates_are_handled_alike_whole_and_streamed(tmp_path, monkeypatch):
+    pre = _preprocessor(tmp_path, monkeypatch)
+    df = make_ohlcv(40, seed=2)
+    df.index = df.index.strftime("%Y-%m-%d")
+    df = df.rename(index={df.index[5]: "not a date", df.index[30]: "2024-13-45"})
+    df.iloc[6:9, 0] = np.nan
+    pre.raw_store.write("AAPL", df)
+    processed = FrameStore(tmp_path / "data" / "processed")
+
+    pre.process_ticker("AAPL")
+    whole = processed.read("AAPL")
+    pre.chunk_rows = 8
+    pre.process_ticker("AAPL")
+    streamed = processed.read("AAPL")
+
+    pd.testing.assert_frame_equal(streamed, whole)
+    assert len(whole) == 38 and whole.index.notna().all()
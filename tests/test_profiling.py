@@ -0,0 +1,101 @@
+import json
+import pstats
+import threading
+
+import numpy as np
+import pytest
+import yaml
+
+from conftest import CONFIG_DIR, make_ohlcv
+from src.backtest.backtester import Backtester
+from src.features.builder import FeatureBuilder
+from src.utils import profiling
+from src.utils.tracking import tracking_sink
+
+
+@pytest.fixture(autouse=True)
+def no_leaked_profiler():
+    yield
+    profiling.disable()
+
+
+def test_disabled_stage_is_a_shared_no_op():
+    assert profiling.active() is None
+    with profiling.stage("anything") as s:
+        s.count(np.zeros(10))
+    assert profiling.stage("other") is s
+    profiling.count("rows", 5)  # nothing to record into
+
+
+def test_report_covers_instrumented_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = yaml.safe_load((CONFIG_DIR / "features.yaml").read_text())
+    config.update(jit=False, cache={"enabled": False})
+    (tmp_path / "features.yaml").write_text(yaml.safe_dump(config))
+    df = make_ohlcv(200)
+
+    with profiling.profile_run(tmp_path / "report.json", sample_interval=0.001) as profiler:
+        features = FeatureBuilder(str(tmp_path / "features.yaml")).build_features(df)
+        frame = df.assign(target=df["Close"].pct_change().shift(-1)).fillna(0.0)
+        Backtester(tracking=tracking_sink("off")).run(frame, frame["target"], "AAPL")
+        Backtester(tracking=tracking_sink("off")).run(frame, frame["target"], "MSFT")
+        profiling.count("tickers", 2)
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report == json.loads(json.dumps(profiler.report()))
+    stages = report["stages"]
+    assert stages["FeatureBuilder.build_features"]["calls"] == 1
+    assert stages["FeatureBuilder.build_features"]["rows"] == len(df)
+    assert stages["FeatureBuilder.build_features"]["bytes"] > 0
+    # Per-indicator kernels are timed on the NumPy path
+    assert any(name.startswith("features.ema_") for name in stages)
+    assert stages["Backtester.run"]["calls"] == 2
+    assert stages["Backtester.run"]["rows"] == 2 * len(frame)
+    assert stages["Backtester.run"]["min_ms"] <= stages["Backtester.run"]["max_ms"]
+    assert report["counters"] == {"tickers": 2}
+    assert report["peak_rss_mb"] > 0
+    assert len(features) == len(df)
+
+    # Nothing is recorded once the run is over
+    with profiling.stage("Backtester.run"):
+        pass
+    assert profiler.report()["stages"]["Backtester.run"]["calls"] == 2
+
+
+def test_selected_stage_is_dumped_with_cprofile(tmp_path):
+    with profiling.profile_run(profile_stage="outer", profile_dir=str(tmp_path), sample_interval=None) as profiler:
+        for _ in range(2):
+            with profiling.stage("outer"):
+                with profiling.stage("outer"):  # nested calls share the outer dump
+                    sorted(range(1000), key=lambda x: -x)
+        with profiling.stage("other"):
+            pass
+
+    dumps = profiler.report()["profiles"]
+    assert len(dumps) == 2
+    assert any("sorted" in func[2] for func in pstats.Stats(dumps[0]).stats)
+    assert profiler.report()["stages"]["outer"]["calls"] == 4
+
+
+def test_stages_from_threads_are_merged():
+    profiler = profiling.enable(sample_interval=None)
+
+    def work():
+        for _ in range(50):
+            with profiling.stage("worker") as s:
+                s.count(rows=1)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    profiling.disable()
+
+    assert profiler.report()["stages"]["worker"]["calls"] == 200
+    assert profiler.report()["stages"]["worker"]["rows"] == 200
+
+
+def test_unknown_profiler_is_rejected():
+    with pytest.raises(ValueError):
+        profiling.Profiler(profiler="perf")
@@ -0,0 +1,131 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.backtest.backtester import BacktestConfig
+from src.features.incremental import IncrementalFeatureEngine
+from src.models.predictor import ModelPredictor
+from src.models.registry import ModelRegistry
+from src.models.serving import ModelCache
+from src.data.storage import FrameStore
+from src.pipeline.realtime_pipeline import Bar, BarSource, RealtimeEngine, RealtimePipeline, ReplaySource
+
+from conftest import make_ohlcv
+
+CONFIG = {"sma": [5], "ema": [3], "rsi": {"enabled": True, "window": 4}, "returns": {"enabled": True}}
+
+
+@pytest.fixture
+def frames():
+    return {f"S{i}": make_ohlcv(n_bars=60, seed=i)[["Close"]] for i in range(5)}
+
+
+@pytest.fixture
+def predictor(tmp_path, frames):
+    features = pd.concat([IncrementalFeatureEngine(CONFIG).update(df) for df in frames.values()]).dropna()
+    target = features["returns"].shift(-1).fillna(0.0)
+    # Trained with the columns in a different order than the engine produces them
+    X = features[features.columns[::-1]]
+    model = Pipeline([("scaler", StandardScaler()),
+                      ("model", RandomForestRegressor(n_estimators=5, random_state=0, n_jobs=1))]).fit(X, target)
+    ModelRegistry(tmp_path, artifact_format="compiled").save_model(model, "S.pkl")
+    return ModelPredictor(str(tmp_path), ticker="S", cache=ModelCache()), model
+
+
+def test_replay_source_orders_bars_by_time(frames):
+    source = ReplaySource(frames, start="2020-01-10")
+
+    async def collect():
+        return [bar async for bar in source.stream()]
+
+    bars = asyncio.run(collect())
+    assert len(bars) == len(source) == sum(len(df.loc["2020-01-10":]) for df in frames.values())
+    assert all(a.timestamp <= b.timestamp for a, b in zip(bars, bars[1:]))
+    assert [b.symbol for b in bars[:5]] == list(frames)
+
+
+def test_engine_matches_offline_features_and_model(frames, predictor):
+    predictor, model = predictor
+    thresholds = BacktestConfig(threshold_long=1e-3, threshold_short=-1e-3)
+    engine = RealtimeEngine(predictor, CONFIG, thresholds, max_batch=7)
+
+    signals = []
+    emitted = asyncio.run(engine.run(ReplaySource(frames), signals.append))
+
+    offline = {s: IncrementalFeatureEngine(CONFIG).update(df).dropna() for s, df in frames.items()}
+    assert emitted == len(signals) == sum(len(f) for f in offline.values())
+
+    got = pd.DataFrame([vars(s) for s in signals]).set_index(["symbol", "timestamp"]).sort_index()
+    features = pd.concat(offline, names=["symbol", "timestamp"]).sort_index()
+    expected = model.predict(features[features.columns[::-1]])
+    np.testing.assert_allclose(got["pred"].to_numpy(), expected)
+    position = np.where(expected < -1e-3, -1, np.where(expected > 1e-3, 1, 0))
+    np.testing.assert_array_equal(got["position"].to_numpy(), position)
+
+    report = engine.latency_report()
+    assert engine.bars == 300 and engine.batches >= 300 / 7
+    assert report["features"]["count"] == engine.batches
+    assert report["total"]["count"] == emitted
+    assert sum(engine.histograms()["inference"].values()) == report["inference"]["count"]
+
+
+def test_each_symbol_is_scored_by_its_own_model(tmp_path, frames):
+    config = tmp_path / "features.yaml"
+    config.write_text(yaml.safe_dump(CONFIG))
+    store = FrameStore(tmp_path / "processed")
+    registry = ModelRegistry(tmp_path / "models")
+    models = {}
+    for i, symbol in enumerate(["S0", "S1"]):
+        features = IncrementalFeatureEngine(CONFIG).update(frames[symbol]).dropna()
+        # Opposite targets, so a model scoring the other symbol's bars is caught
+        target = features["returns"].shift(-1).fillna(0.0) * (1 if i == 0 else -1)
+        models[symbol] = RandomForestRegressor(n_estimators=5, random_state=i, n_jobs=1).fit(features, target)
+        registry.save_model(models[symbol], f"{symbol}.pkl")
+    for symbol in ("S0", "S1", "S2"):
+        store.write(symbol, frames[symbol])
+
+    pipeline = RealtimePipeline(str(config), str(tmp_path / "models"), str(tmp_path / "processed"),
+                                storage_format=store.fmt)
+    signals = pipeline.replay(["S0", "S1", "S2"])
+
+    got = pd.DataFrame([vars(s) for s in signals])
+    # S2 has no model, so its bars are not scored
+    assert set(got["symbol"]) == {"S0", "S1"}
+    for symbol, model in models.items():
+        features = IncrementalFeatureEngine(CONFIG).update(frames[symbol]).dropna()
+        mine = got[got["symbol"] == symbol].set_index("timestamp").sort_index()
+        np.testing.assert_allclose(mine["pred"].to_numpy(), model.predict(features))
+
+
+def test_warm_up_scores_the_first_live_bar(frames, predictor):
+    predictor, _ = predictor
+    engine = RealtimeEngine(predictor, CONFIG)
+    df = frames["S0"]
+    engine.warm_up("S0", df.iloc[:30])
+
+    signals = engine.process([Bar("S0", df.index[30], float(df["Close"].iloc[30]))])
+    assert [s.timestamp for s in signals] == [df.index[30]]
+    # Replayed or out-of-order bars are ignored
+    assert engine.process([Bar("S0", df.index[30], 1.0)]) == []
+
+
+def test_source_failure_propagates(predictor):
+    class Broken(BarSource):
+        async def stream(self):
+            yield Bar("X", pd.Timestamp("2020-01-01"), 1.0)
+            raise ConnectionError("feed dropped")
+
+    engine = RealtimeEngine(predictor[0], CONFIG)
+    with pytest.raises(ConnectionError):
+        asyncio.run(engine.run(Broken()))
+
+
+def test_unknown_model_features_are_rejected(predictor):
+    with pytest.raises(ValueError, match="SMA_5"):
+        RealtimeEngine(predictor[0], {"sma": [10]})
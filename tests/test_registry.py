@@ -0,0 +1,118 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.models.predictor import ModelPredictor
+from src.models.registry import ModelRegistry
+from src.models.serving import ModelCache
+
+
+def _model(slope: float):
+    X = pd.DataFrame({"x": np.arange(10.0)})
+    return LinearRegression().fit(X, slope * X["x"])
+
+
+def test_latest_is_per_ticker(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    registry.save_model(_model(1), "AAPL.pkl", with_timestamp=False)
+    registry.save_model(_model(2), "MSFT.pkl", with_timestamp=False)
+    registry.save_model(_model(3), "AAPL_v2.pkl", with_timestamp=False)
+
+    assert registry.latest("MSFT").path.name == "MSFT.pkl"
+    assert registry.latest().path.name == "AAPL_v2.pkl"
+    assert registry.load_model(ticker="MSFT").coef_[0] == pytest.approx(2)
+    with pytest.raises(FileNotFoundError):
+        registry.latest("GOOG")
+
+
+def test_record_holds_metadata(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    path = registry.save_model(_model(1), "AAPL.pkl", metrics={"r2": 0.5})
+
+    record = registry.latest("AAPL")
+    assert record.path == path
+    assert record.metrics == {"r2": 0.5}
+    assert record.features == ["x"]
+    assert record.size == path.stat().st_size
+    assert len(record.checksum) == 64
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_republish_replaces_row_and_version(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    registry.save_model(_model(1), "AAPL.pkl", with_timestamp=False)
+    registry.save_model(_model(2), "MSFT.pkl", with_timestamp=False)
+    first = registry.version(tmp_path / "AAPL.pkl")
+
+    registry.save_model(_model(5), "AAPL.pkl", with_timestamp=False)
+
+    assert len(registry.records("AAPL")) == 1
+    assert registry.latest().ticker == "AAPL"
+    assert registry.version(tmp_path / "AAPL.pkl") != first
+
+
+def test_existing_artifacts_are_indexed(tmp_path):
+    joblib.dump(_model(1), tmp_path / "AAPL_20240101_000000.pkl")
+    joblib.dump(_model(2), tmp_path / "AAPL_20240301_000000.pkl")
+    joblib.dump(_model(3), tmp_path / "MSFT_20240201_000000.pkl")
+
+    registry = ModelRegistry(tmp_path)
+    assert [r.ticker for r in registry.records()] == ["AAPL", "MSFT", "AAPL"]
+    assert registry.latest("AAPL").created_at == "20240301_000000"
+
+    (tmp_path / "MSFT_20240201_000000.pkl").unlink()
+    joblib.dump(_model(4), tmp_path / "GOOG_20240401_000000.pkl")
+    assert registry.reindex() == 1
+    assert sorted(r.ticker for r in registry.records()) == ["AAPL", "AAPL", "GOOG"]
+
+
+def test_predictor_loads_ticker_model(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    registry.save_model(_model(1), "AAPL.pkl")
+    registry.save_model(_model(2), "MSFT.pkl")
+
+    predictor = ModelPredictor(str(tmp_path), ticker="AAPL", cache=ModelCache())
+    assert predictor.predict(np.array([3.0]))[0] == pytest.approx(3.0)
+
+
+def test_explicit_path_wins_over_ticker(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    aapl = registry.save_model(_model(1), "AAPL.pkl")
+    registry.save_model(_model(2), "MSFT.pkl")
+
+    assert registry.resolve(str(aapl), ticker="MSFT") == aapl
+    predictor = ModelPredictor(str(tmp_path), str(aapl), ModelCache(), 1, ticker="MSFT")
+    assert predictor.predict(np.array([3.0]))[0] == pytest.approx(3.0)
+
+
+@pytest.mark.parametrize("fmt", ["pickle", "mmap", "compressed"])
+def test_artifact_formats_round_trip(tmp_path, fmt):
+    registry = ModelRegistry(tmp_path, artifact_format=fmt)
+    registry.save_model(_model(2), "AAPL.pkl")
+
+    record = registry.latest("AAPL")
+    model = registry.load_model(ticker="AAPL")
+    assert record.format == fmt
+    assert model.predict(pd.DataFrame({"x": [4.0]}))[0] == pytest.approx(8.0)
+    assert isinstance(model.coef_, np.memmap) == (fmt == "mmap")
+
+
+def test_unknown_artifact_format(tmp_path):
+    with pytest.raises(ValueError):
+        ModelRegistry(tmp_path, artifact_format="onnx")
+
+
+def test_index_without_format_column_is_migrated(tmp_path):
+    import sqlite3
+
+    with sqlite3.connect(tmp_path / "registry.db") as conn:
+        conn.execute(
+            "CREATE TABLE models (id INTEGER PRIMARY KEY AUTOINCREMENT, ticker TEXT NOT NULL,"
+            " path TEXT NOT NULL UNIQUE, created_at TEXT NOT NULL, metrics TEXT, features TEXT,"
+            " size INTEGER NOT NULL, checksum TEXT NOT NULL)"
+        )
+    registry = ModelRegistry(tmp_path)
+    registry.save_model(_model(1), "AAPL.pkl", artifact_format="mmap")
+    assert registry.latest("AAPL").format == "mmap"
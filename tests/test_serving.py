@@ -0,0 +1,149 @@
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.models.predictor import ModelPredictor
+from src.models.registry import ModelRegistry
+from src.models.serving import MicroBatcher, ModelCache
+from src.utils.latency import LatencyRecorder
+
+
+@pytest.fixture
+def training_frame():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 5)), columns=[f"f{i}" for i in range(5)])
+    y = X["f0"] * 2 + rng.normal(scale=0.1, size=200)
+    return X, y
+
+
+def _fit(X, y, seed=0):
+    model = Pipeline([
+        ("scaler", StandardScaler()),
+        ("model", RandomForestRegressor(n_estimators=10, random_state=seed, n_jobs=-1)),
+    ])
+    return model.fit(X, y)
+
+
+@pytest.fixture
+def saved_model(tmp_path, training_frame):
+    X, y = training_frame
+    model = _fit(X, y)
+    path = ModelRegistry(tmp_path).save_model(model, "AAPL.pkl", with_timestamp=False)
+    return tmp_path, path, model
+
+
+def test_predictor_reuses_warm_model(saved_model):
+    model_dir, path, _ = saved_model
+    cache = ModelCache()
+
+    first = ModelPredictor(str(model_dir), cache=cache)
+    second = ModelPredictor(str(model_dir), cache=cache)
+
+    assert first.model is second.model
+    assert cache.stats == {"hits": 1, "misses": 1, "evicted": 0}
+    assert first.model.named_steps["model"].n_jobs == 1
+
+
+def test_new_registry_version_reloads(saved_model, training_frame):
+    model_dir, path, _ = saved_model
+    cache = ModelCache()
+    first = ModelPredictor(str(model_dir), cache=cache)
+
+    X, y = training_frame
+    ModelRegistry(model_dir).save_model(_fit(X, y, seed=1), "AAPL.pkl", with_timestamp=False)
+    second = ModelPredictor(str(model_dir), cache=cache)
+
+    assert second.version != first.version
+    assert second.model is not first.model
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ModelCache(max_models=2)
+    for key in "abc":
+        cache.get(key, lambda: key)
+    assert "a" not in cache and len(cache) == 2
+
+    cache = ModelCache(max_models=None, max_bytes=100)
+    cache.get("a", lambda: 1, nbytes=60)
+    cache.get("b", lambda: 2, nbytes=30)
+    cache.get("a", lambda: 1)
+    cache.get("c", lambda: 3, nbytes=30)
+    assert "b" not in cache and "a" in cache and cache.total_bytes == 90
+
+
+def test_array_series_and_frame_inputs_match(saved_model, training_frame):
+    model_dir, _, model = saved_model
+    X, _ = training_frame
+    expected = model.predict(X)
+    predictor = ModelPredictor(str(model_dir), cache=ModelCache())
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        np.testing.assert_array_equal(predictor.predict(X.to_numpy()), expected)
+        np.testing.assert_array_equal(predictor.predict(X[X.columns[::-1]]), expected)
+        np.testing.assert_array_equal(predictor.predict(X.iloc[3]), expected[3:4])
+        np.testing.assert_array_equal(predictor.predict(X.iloc[3].to_numpy()), expected[3:4])
+
+    assert predictor.latency.count == 4
+
+
+def test_micro_batcher_coalesces_concurrent_rows(saved_model, training_frame):
+    model_dir, _, model = saved_model
+    X, _ = training_frame
+    predictor = ModelPredictor(str(model_dir), cache=ModelCache())
+    rows = X.to_numpy()
+    results = [None] * len(rows)
+
+    with predictor.batcher(max_batch=32, max_wait_ms=5) as batcher:
+        def worker(start):
+            futures = [(i, batcher.submit(rows[i])) for i in range(start, len(rows), 8)]
+            for i, future in futures:
+                results[i] = future.result(timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(s,)) for s in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    np.testing.assert_array_equal(np.array(results), model.predict(X))
+    assert batcher.batches < len(rows)
+    with pytest.raises(RuntimeError):
+        batcher.submit(rows[0])
+
+
+def test_micro_batcher_propagates_errors():
+    def fail(rows):
+        raise ValueError("bad input")
+
+    with MicroBatcher(fail) as batcher:
+        with pytest.raises(ValueError, match="bad input"):
+            batcher.predict([1.0, 2.0], timeout=5)
+
+
+def test_latency_percentiles():
+    recorder = LatencyRecorder(capacity=1000)
+    for ms in range(1, 101):
+        recorder.record_ns(ms * 1_000_000)
+
+    stats = recorder.percentiles()
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == pytest.approx(50.5)
+    assert stats["p99_ms"] == pytest.approx(99.01)
+    assert sum(recorder.histogram().values()) == 100
+
+
+def test_latency_buffer_is_allocated_on_first_sample():
+    recorder = LatencyRecorder(capacity=4)
+    assert recorder.samples is None and recorder.percentiles() == {"count": 0}
+    for ms in range(1, 7):
+        recorder.record_ns(ms * 1_000_000)
+    # Only the newest `capacity` samples are kept
+    assert sorted(recorder.values_ms()) == [3.0, 4.0, 5.0, 6.0]
+    assert recorder.percentiles()["count"] == 6
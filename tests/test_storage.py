@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from src.data import storage
+from src.data.storage import FrameStore
+from conftest import make_ohlcv
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather", "csv"])
+def test_round_trip_keeps_index_and_dtypes(tmp_path, fmt):
+    store = FrameStore(tmp_path, fmt)
+    df = make_ohlcv(50)
+
+    path = store.write("AAPL", df)
+    assert path.suffix == f".{fmt}"
+    assert store.names() == ["AAPL"]
+
+    loaded = store.read("AAPL")
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False, check_index_type=fmt != "csv")
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather", "csv"])
+def test_column_subset_keeps_index(tmp_path, fmt):
+    store = FrameStore(tmp_path, fmt)
+    df = make_ohlcv(20)
+    store.write("MSFT", df)
+
+    close = store.read("MSFT", columns=["Close"])
+    assert list(close.columns) == ["Close"]
+    assert isinstance(close.index, pd.DatetimeIndex)
+    assert (close.index == df.index).all()
+
+
+def test_legacy_csv_is_readable_from_columnar_store(tmp_path):
+    df = make_ohlcv(10)
+    df.to_csv(tmp_path / "TSLA.csv")
+
+    store = FrameStore(tmp_path, "parquet")
+    assert store.exists("TSLA")
+    assert store.names() == ["TSLA"]
+    assert len(store.read("TSLA")) == 10
+
+
+def test_unknown_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        FrameStore(tmp_path, "hdf5")
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather", "csv"])
+def test_chunked_write_and_read(tmp_path, fmt):
+    store = FrameStore(tmp_path, fmt)
+    df = make_ohlcv(100)
+
+    with store.chunk_writer("AAPL") as write:
+        for start in range(0, 100, 30):
+            write(df.iloc[start:start + 30])
+
+    chunks = list(store.iter_chunks("AAPL", 25, columns=["Close"]))
+    assert [len(c) for c in chunks] in ([25, 5, 25, 5, 25, 5, 10], [25] * 4)
+    pd.testing.assert_frame_equal(pd.concat(chunks), df[["Close"]], check_freq=False,
+                                  check_index_type=fmt != "csv")
+
+
+def test_failed_chunked_write_keeps_previous_file(tmp_path):
+    store = FrameStore(tmp_path)
+    store.write("AAPL", make_ohlcv(10))
+
+    with pytest.raises(RuntimeError):
+        with store.chunk_writer("AAPL") as write:
+            write(make_ohlcv(5))
+            raise RuntimeError("interrupted")
+
+    assert len(store.read("AAPL")) == 10
+    assert list(tmp_path.iterdir()) == [store.path("AAPL")]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_columnar_append_leaves_the_stored_file_alone(tmp_path, fmt):
+    store = FrameStore(tmp_path, fmt)
+    df = make_ohlcv(30)
+    store.write("AAPL", df.iloc[:10])
+    before = store.path("AAPL").stat()
+
+    store.append("AAPL", df.iloc[10:20])
+    store.append("AAPL", df.iloc[20:])
+
+    after = store.path("AAPL").stat()
+    assert (after.st_mtime_ns, after.st_size) == (before.st_mtime_ns, before.st_size)
+    assert store.names() == ["AAPL"]
+    pd.testing.assert_frame_equal(store.read("AAPL"), df, check_freq=False)
+    pd.testing.assert_frame_equal(store.read("AAPL", columns=["Close"]), df[["Close"]], check_freq=False)
+    pd.testing.assert_frame_equal(pd.concat(store.iter_chunks("AAPL", 7, columns=["Close"])), df[["Close"]],
+                                  check_freq=False)
+
+    store.write("AAPL", df.iloc[:5])
+    assert len(store.read("AAPL")) == 5
+    store.delete("AAPL")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_appended_parts_are_merged_past_the_limit_or_on_new_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "MAX_PARTS", 2)
+    store = FrameStore(tmp_path)
+    df = make_ohlcv(40)
+    store.write("AAPL", df.iloc[:10])
+
+    for start in (10, 20, 30):
+        store.append("AAPL", df.iloc[start:start + 10])
+    assert not (tmp_path / "AAPL.parts").exists()
+    pd.testing.assert_frame_equal(store.read("AAPL"), df, check_freq=False)
+
+    store.append("AAPL", make_ohlcv(45).iloc[40:].assign(Extra=1.0))
+    loaded = store.read("AAPL")
+    assert len(loaded) == 45 and loaded["Extra"].notna().sum() == 5
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from benchmarks.run import BenchSettings, compare, run_suite
+from src.data.fetcher import DataFetcher
+from src.data.synthetic import SyntheticConfig, SyntheticProvider, generate_ohlcv, generate_universe
+
+
+def test_bars_are_consistent_and_reproducible():
+    df = generate_ohlcv(500, seed=1, freq="1min", start="2024-01-02 09:30")
+    assert df.index.is_monotonic_increasing and df.index.is_unique
+    assert (df.index[1] - df.index[0]) == pd.Timedelta(minutes=1)
+    assert (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+    assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+    pd.testing.assert_frame_equal(df, generate_ohlcv(500, seed=1, freq="1min", start="2024-01-02 09:30"))
+
+
+def test_ticker_history_does_not_depend_on_the_universe():
+    config = SyntheticConfig(n_tickers=3, n_bars=50)
+    alone = generate_universe(config, ["SYN0001"])["SYN0001"]
+    pd.testing.assert_frame_equal(generate_universe(config)["SYN0001"], alone)
+    assert not generate_universe(config)["SYN0000"].equals(alone)
+
+
+def test_dirty_bars_for_the_preprocessor():
+    df = generate_ohlcv(2000, seed=2, nan_rate=0.05, duplicate_rate=0.05)
+    assert df["Close"].isna().any()
+    assert not df.index.is_unique
+    assert df.index.is_monotonic_increasing
+
+
+def test_fetcher_runs_offline_on_the_synthetic_provider(tmp_path):
+    cfg = {
+        "tickers": ["AAA", "BBB"],
+        "start_date": "2016-01-01",
+        "end_date": "2016-07-01",
+        "output_dir": str(tmp_path / "raw"),
+        "provider": "synthetic",
+        "synthetic": {"n_bars": 400, "start": "2015-06-01"},
+    }
+    path = tmp_path / "data.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+
+    fetcher = DataFetcher(str(path))
+    assert isinstance(fetcher.provider, SyntheticProvider)
+    results = fetcher.fetch_data(incremental=False)
+    assert [r.error for r in results] == [None, None]
+
+    stored = fetcher.store.read("AAA")
+    assert stored.index.min() >= pd.Timestamp("2016-01-01")
+    assert stored.index.max() < pd.Timestamp("2016-07-01")
+    np.testing.assert_allclose(stored["Close"], fetcher.provider.history("AAA").loc[stored.index, "Close"])
+
+
+def test_benchmark_suite_and_regression_check(tmp_path):
+    settings = BenchSettings(tickers=2, bars=300, repeat=1, n_estimators=5, single_rows=5)
+    report = run_suite(settings)
+
+    stages = report["results"]
+    for name in ("ingestion", "preprocess", "indicators.fused", "features.build", "dataset.build",
+                 "train", "predict.single", "predict.batch", "backtest"):
+        assert stages[name]["seconds"] > 0
+    assert any(name.startswith("indicator.RSI") for name in stages)
+
+    assert compare(report, report) == []
+    slower = {**report, "results": {k: {**v, "seconds": v["seconds"] * 2 + 1} for k, v in stages.items()}}
+    flagged = {r["stage"] for r in compare(slower, report, threshold=0.5)}
+    assert flagged == set(stages)
+    # Small absolute differences are noise, not regressions
+    assert compare(slower, report, threshold=0.5, min_delta=10) == []
+
+    with pytest.raises(ValueError):
+        compare({**report, "settings": {**report["settings"], "bars": 301}}, report)
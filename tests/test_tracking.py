@@ -0,0 +1,118 @@
+import gc
+import threading
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.backtester import Backtester
+from src.utils import tracking
+from src.utils.tracking import AsyncBatchSink, SyncSink, TrackingSink, tracking_sink
+
+
+class RecordingClient:
+    """In-memory stand-in for MlflowClient that keeps what each run received."""
+
+    def __init__(self, fail_artifacts=False, delay=None):
+        self.runs = {}
+        self.fail_artifacts = fail_artifacts
+        self.delay = delay
+        self.threads = set()
+
+    def create_run(self, experiment_id, run_name=None):
+        if self.delay is not None:
+            self.delay.wait()
+        self.threads.add(threading.current_thread().name)
+        run_id = f"run{len(self.runs)}"
+        self.runs[run_id] = {"name": run_name, "experiment": experiment_id, "status": "RUNNING", "files": {}}
+        return type("Run", (), {"info": type("Info", (), {"run_id": run_id})})()
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        self.runs[run_id]["metrics"] = {m.key: m.value for m in metrics}
+        self.runs[run_id]["params"] = {p.key: p.value for p in params}
+
+    def log_artifacts(self, run_id, local_dir):
+        if self.fail_artifacts:
+            raise OSError("artifact store unavailable")
+        for path in Path(local_dir).iterdir():
+            self.runs[run_id]["files"][path.name] = pd.read_parquet(path)
+
+    def set_terminated(self, run_id, status="FINISHED"):
+        self.runs[run_id]["status"] = status
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2021-01-01", periods=50)
+    df = pd.DataFrame({"target": rng.normal(0, 0.01, 50)}, index=index)
+    return df, pd.Series(rng.normal(0, 0.01, 50), index=index)
+
+
+def test_modes():
+    assert type(tracking_sink("off")) is TrackingSink
+    assert isinstance(tracking_sink("sync"), SyncSink)
+    assert isinstance(tracking_sink("async"), AsyncBatchSink)
+    with pytest.raises(ValueError):
+        tracking_sink("eventually")
+
+
+def test_sync_backtest_logs_parquet_artifacts(tmp_path, monkeypatch, frame):
+    monkeypatch.chdir(tmp_path)
+    client = RecordingClient()
+    df, preds = frame
+
+    results, metrics = Backtester(tracking=tracking_sink("sync", client)).run(df, preds, "AAPL")
+
+    (run,) = client.runs.values()
+    assert run["name"] == "backtest_AAPL" and run["status"] == "FINISHED"
+    assert run["metrics"] == metrics and run["params"]["cost_bps"] == "10.0"
+    assert set(run["files"]) == {"equity_AAPL.parquet", "backtest_full_AAPL.parquet"}
+    pd.testing.assert_frame_equal(run["files"]["backtest_full_AAPL.parquet"], results, check_freq=False)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_async_sink_defers_writes_until_flush(frame):
+    gate = threading.Event()
+    client = RecordingClient(delay=gate)
+    df, preds = frame
+
+    with tracking_sink("async", client, batch_size=100) as sink:
+        backtester = Backtester(tracking=sink)
+        for ticker in ["A", "B", "C"]:
+            backtester.run(df, preds, ticker)
+        # The compute loop has finished while the writer is still blocked
+        assert client.runs == {}
+        gate.set()
+        sink.flush()
+        assert [r["name"] for r in client.runs.values()] == ["backtest_A", "backtest_B", "backtest_C"]
+        assert sink.written == 3
+
+    assert client.threads == {"tracking-sink"}
+
+
+def test_async_sink_keeps_going_after_a_failed_write(frame):
+    client = RecordingClient(fail_artifacts=True)
+    sink = AsyncBatchSink(client, batch_size=1)
+    sink.log_run("bad", metrics={"x": 1.0}, artifacts={"equity": frame[0]})
+    sink.log_run("good", metrics={"x": 2.0})
+    sink.close()
+
+    assert [r["status"] for r in client.runs.values()] == ["FAILED", "FINISHED"]
+    assert len(sink.errors) == 1 and sink.written == 1
+
+
+def test_closed_async_sinks_are_released(frame):
+    df, preds = frame
+    sink = AsyncBatchSink(RecordingClient())
+    Backtester(tracking=sink).run(df, preds, "A")
+    assert sink in tracking._open_sinks
+
+    sink.close()
+    assert sink not in tracking._open_sinks
+    ref = weakref.ref(sink)
+    del sink
+    gc.collect()
+    assert ref() is None
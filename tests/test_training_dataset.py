@@ -8,7 +8,7 @@ def test_training_dataset_builder():
     output_dir = Path("data/datasets")
     assert output_dir.exists(), "Dataset directory was not created."
 
-    files = list(output_dir.glob("*.csv"))
+    files = builder.dataset_store.names()
     assert len(files) > 0, "No training datasets were generated."
 
     print("Training dataset test passed. Files generated:")
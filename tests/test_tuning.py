@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.data.storage import FrameStore
+from src.models.registry import ModelRegistry
+from src.models.tuning import HyperparameterTuner, SearchConfig, SharedArrays, sample_params
+from src.pipeline.train_pipeline import TrainPipeline
+
+
+@pytest.fixture
+def configs(tmp_path):
+    model = tmp_path / "model.yaml"
+    model.write_text(yaml.safe_dump({
+        "model": "RandomForest",
+        "task": "regression",
+        "random_state": 0,
+        "n_estimators": 10,
+        "n_jobs": 1,
+    }))
+    tuning = tmp_path / "tuning.yaml"
+    tuning.write_text(yaml.safe_dump({
+        "search": {
+            "method": "halving",
+            "n_trials": 9,
+            "min_resource": 4,
+            "max_resource": 16,
+            "eta": 3,
+            "cv_folds": 2,
+            "gap": 2,
+            "max_workers": 2,
+            "log_mlflow": False,
+        },
+        "space": {
+            "max_depth": {"type": "choice", "values": [2, 4, None]},
+            "min_samples_leaf": {"type": "int", "low": 1, "high": 30, "log": True},
+        },
+    }))
+    return str(model), str(tuning)
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 3)), columns=list("abc"),
+                     index=pd.bdate_range("2020-01-01", periods=300))
+    return X.assign(target=X["a"] + rng.normal(scale=0.1, size=300))
+
+
+def test_budgets_and_sampling():
+    assert SearchConfig(min_resource=25, max_resource=200, eta=3).budgets() == [25, 75, 200]
+    assert SearchConfig(method="random", max_resource=50).budgets() == [50]
+
+    space = {
+        "depth": {"type": "choice", "values": [None, 3]},
+        "leaf": {"type": "int", "low": 1, "high": 100, "log": True},
+        "frac": {"type": "float", "low": 0.1, "high": 0.9},
+    }
+    rng = np.random.default_rng(0)
+    draws = [sample_params(space, rng) for _ in range(50)]
+    assert all(d["depth"] in (None, 3) and 1 <= d["leaf"] <= 100 and 0.1 <= d["frac"] <= 0.9 for d in draws)
+    rng = np.random.default_rng(0)
+    assert draws == [sample_params(space, rng) for _ in range(50)]
+
+
+def test_shared_arrays_round_trip():
+    from multiprocessing import shared_memory
+
+    X = np.arange(12, dtype=np.float64).reshape(4, 3)
+    with SharedArrays(X=X) as shared:
+        name, shape, dtype = shared.spec["X"]
+        block = shared_memory.SharedMemory(name=name)
+        np.testing.assert_array_equal(np.ndarray(shape, np.dtype(dtype), buffer=block.buf), X)
+        block.close()
+
+
+def test_halving_prunes_and_pipeline_uses_best_params(tmp_path, configs, dataset):
+    model_config, tuning_config = configs
+    FrameStore(tmp_path / "datasets").write("AAPL", dataset)
+
+    tuner = HyperparameterTuner(tuning_config, model_config, dataset_dir=tmp_path / "datasets",
+                                output_dir=tmp_path / "tuning")
+    result = tuner.tune_ticker("AAPL")
+
+    assert [t.pruned_at for t in result.trials].count(4) == 6
+    assert [t.pruned_at for t in result.trials].count(12) == 2
+    assert result.best.pruned_at is None and set(result.best.scores) == {4, 12, 16}
+    assert result.best_params["n_estimators"] == 16
+    assert result.best.scores[16] == max(t.scores[16] for t in result.trials if 16 in t.scores)
+    assert len(result.to_frame()) == 9
+
+    saved = json.loads((tmp_path / "tuning" / "AAPL.json").read_text())
+    assert saved["best_params"] == result.best_params
+
+    pipeline = TrainPipeline(dataset_dir=tmp_path / "datasets", model_dir=tmp_path / "models",
+                             model_config=model_config, tuning_dir=tmp_path / "tuning")
+    pipeline.run_for_ticker("AAPL")
+    forest = ModelRegistry(tmp_path / "models").load_model(ticker="AAPL").named_steps["model"]
+    assert forest.n_estimators == 16
+    assert forest.min_samples_leaf == result.best_params["min_samples_leaf"]
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.data.storage import FrameStore
+from src.models.registry import ModelRegistry
+from src.models.trainer import ModelTrainer
+from src.models.walk_forward import WalkForwardConfig, WalkForwardTrainer, walk_forward_folds
+from src.pipeline.train_pipeline import TrainPipeline
+
+
+@pytest.fixture
+def model_config(tmp_path):
+    path = tmp_path / "model.yaml"
+    path.write_text(yaml.safe_dump({
+        "model": "RandomForest",
+        "task": "regression",
+        "random_state": 0,
+        "n_estimators": 20,
+        "n_jobs": 1,
+    }))
+    return str(path)
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2020-01-01", periods=400)
+    X = pd.DataFrame(rng.normal(size=(400, 4)), index=index, columns=list("abcd"))
+    df = X.assign(target=X["a"] * 0.5 + rng.normal(scale=0.1, size=400))
+    return df
+
+
+def test_rolling_folds_respect_gap():
+    folds = walk_forward_folds(100, WalkForwardConfig(train_window=40, test_window=20, gap=5))
+
+    assert [(f.train.start, f.train.stop, f.test.start, f.test.stop) for f in folds] == [
+        (0, 40, 45, 65),
+        (20, 60, 65, 85),
+        (40, 80, 85, 100),
+    ]
+
+
+def test_expanding_folds_with_short_step():
+    folds = walk_forward_folds(60, WalkForwardConfig(train_window=30, test_window=20, step=10, expanding=True))
+
+    assert all(f.train.start == 0 for f in folds)
+    assert [f.test.start for f in folds] == [30, 40, 50]
+    assert walk_forward_folds(30, WalkForwardConfig(train_window=30)) == []
+
+
+def test_parallel_folds_match_serial(model_config, dataset):
+    X, y = dataset.drop(columns="target"), dataset["target"]
+    config = dict(train_window=200, test_window=50, gap=5, warm_start=False)
+
+    serial = WalkForwardTrainer(ModelTrainer(model_config), WalkForwardConfig(max_workers=1, **config)).run(X, y)
+    parallel = WalkForwardTrainer(ModelTrainer(model_config), WalkForwardConfig(max_workers=2, **config)).run(X, y)
+
+    pd.testing.assert_series_equal(serial.predictions, parallel.predictions)
+    assert serial.predictions.index[0] == X.index[205]
+    assert list(serial.fold_ids.unique()) == [0, 1, 2, 3]
+    assert len(serial.folds) == 4 and not any(f.warm for f in serial.folds)
+    assert set(serial.metrics) == {"mse", "rmse", "r2"}
+
+
+def test_warm_start_keeps_forest_size(model_config, dataset):
+    X, y = dataset.drop(columns="target"), dataset["target"]
+    config = WalkForwardConfig(train_window=200, test_window=50, trees_per_refit=5)
+
+    result = WalkForwardTrainer(ModelTrainer(model_config), config).run(X, y)
+    forest = result.model.named_steps["model"]
+
+    assert [f.warm for f in result.folds] == [False, True, True, True]
+    assert len(forest.estimators_) == forest.n_estimators == 20
+    assert not forest.warm_start
+    assert result.predictions.notna().all()
+
+
+def test_partial_fit_learner_is_updated(model_config, dataset, monkeypatch):
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    trainer = ModelTrainer(model_config)
+    monkeypatch.setattr(trainer, "_build_model", lambda params=None: Pipeline([
+        ("scaler", StandardScaler()), ("model", SGDRegressor(random_state=0)),
+    ]))
+    X, y = dataset.drop(columns="target"), dataset["target"]
+
+    result = WalkForwardTrainer(trainer, WalkForwardConfig(train_window=200, test_window=50)).run(X, y)
+    assert result.folds[-1].warm
+    assert result.model.named_steps["model"].t_ > 200
+
+
+def test_train_pipeline_stores_out_of_sample_predictions(tmp_path, model_config, dataset):
+    cfg = yaml.safe_load(open(model_config))
+    cfg["walk_forward"] = {"enabled": True, "train_window": 200, "test_window": 50, "gap": 5}
+    with open(model_config, "w") as f:
+        yaml.safe_dump(cfg, f)
+
+    FrameStore(tmp_path / "datasets").write("AAPL", dataset)
+    pipeline = TrainPipeline(
+        dataset_dir=tmp_path / "datasets",
+        model_dir=tmp_path / "models",
+        model_config=model_config,
+        predictions_dir=tmp_path / "predictions",
+    )
+    pipeline.run_for_ticker("AAPL")
+
+    predictions = pipeline.predictions_store.read("AAPL")
+    assert list(predictions.columns) == ["pred", "fold"]
+    assert predictions.index[0] == dataset.index[205]
+    assert ModelRegistry(tmp_path / "models").latest("AAPL").metrics.keys() == {"mse", "rmse", "r2"}
+
+    pipeline.walk_forward = None
+    pipeline.run_for_ticker("AAPL")
+    assert not pipeline.predictions_store.exists("AAPL")